@@ -0,0 +1,223 @@
+"""
+End-to-end `find_offers` against the local mock server (`benchmarks.mock_server`): throughput, latency of offer
+requests, peak RSS and CPU time per offer. Every size is crawled in a fresh process, so peak RSS isn't carried over.
+Results are appended to `benchmarks/results/crawl.jsonl` with the git revision and compared with the previous run of
+the same configuration.
+
+    python -m benchmarks.bench_crawl
+    python -m benchmarks.bench_crawl --offers 100 1000 --latency 0.05 --error-rate 0.02 --retry-after 1
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import multiprocessing.forkserver
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from aiohttp import web
+from yarl import URL
+
+from benchmarks.mock_server import MockServerConfig, create_app
+from src.constants import CONNECTION_LIMIT_PER_HOST, RATE_LIMIT_FAST_RESPONSE
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.jjit_api_client import JJITAPIClient
+from src.jjit_board_parser import JJITBoardParser
+from src.metrics import HTTP_REQUEST_SECONDS, HTTP_RETRIES_TOTAL, REGISTRY
+from src.models import ProgrammingLanguage
+from src.rate_limiter import AdaptiveRateLimiter
+
+OFFERS_COUNTS = (100, 1_000, 10_000)
+RESULTS_PATH = Path(__file__).parent / "results" / "crawl.jsonl"
+# every sample offer is hybrid, so all offers are fully parsed
+LOCATION_CRITERIA = [LocationCriteria(keywords=[LocationKeyword(form="hybrid")], rule=LocationRule.ALL)]
+SERVER_START_TIMEOUT = 10.0  # seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, nargs="+", default=OFFERS_COUNTS)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds, every response gets +/- 50%%")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of offer requests failing with 429/503")
+    parser.add_argument("--retry-after", type=int, default=None, help="seconds, sent with the errors")
+    parser.add_argument(
+        "--max-rate", type=float, default=1000.0, help="requests per second allowed by the client's rate limiter"
+    )
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(asyncio.run(_measure_crawl(args.offers[0], args.port, args.max_rate))))
+        return
+
+    previous_results = _load_results()
+    revision = _git_revision()
+    for offers_count in args.offers:
+        config = MockServerConfig(
+            offers_count=offers_count, latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after
+        )
+        measurements = _run_against_mock_server(config, args.max_rate)
+        result = {
+            "revision": revision,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "config": {
+                "offers": offers_count,
+                "latency": args.latency,
+                "error_rate": args.error_rate,
+                "retry_after": args.retry_after,
+                "max_rate": args.max_rate,
+            },
+            **measurements,
+        }
+        _print_result(result, previous_results.get(json.dumps(result["config"], sort_keys=True)))
+        _save_result(result)
+
+
+async def _measure_crawl(offers_count: int, port: int, max_rate: float) -> dict:
+    REGISTRY.reset()
+    rate_limiter = AdaptiveRateLimiter(
+        initial_rate=max_rate,
+        max_rate=max_rate,
+        initial_concurrency=CONNECTION_LIMIT_PER_HOST,
+        max_concurrency=CONNECTION_LIMIT_PER_HOST,
+        fast_response_threshold=RATE_LIMIT_FAST_RESPONSE,
+    )
+    started_at = time.perf_counter()
+    async with JJITAPIClient(base_url=URL(f"http://127.0.0.1:{port}"), rate_limiter=rate_limiter) as client:
+        parser = JJITBoardParser(client)
+        try:
+            offers = await parser.find_offers(["Python"], LOCATION_CRITERIA, ProgrammingLanguage.PYTHON)
+        finally:
+            parser.close()
+    elapsed = time.perf_counter() - started_at
+    # parsing workers are children of the fork server, stopping it makes their CPU time part of this process' children
+    multiprocessing.forkserver._forkserver._stop()  # type: ignore[attr-defined]
+
+    latency = HTTP_REQUEST_SECONDS.series(kind="offer")
+    return {
+        "matched_offers": len(offers),
+        "elapsed_s": elapsed,
+        "offers_per_s": offers_count / elapsed,
+        "latency_p50_ms": latency.quantile(0.5) * 1000 if latency else None,
+        "latency_p99_ms": latency.quantile(0.99) * 1000 if latency else None,
+        "retries": sum(r["value"] for r in HTTP_RETRIES_TOTAL.summary()),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run_against_mock_server(config: MockServerConfig, max_rate: float) -> dict:
+    port = _find_free_port()
+    server = multiprocessing.get_context("spawn").Process(target=_serve, args=(config, port), daemon=True)
+    server.start()
+    try:
+        _wait_for_port(port)
+        crawl = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_crawl",
+                "--measure",
+                "--offers",
+                str(config.offers_count),
+                "--port",
+                str(port),
+                "--max-rate",
+                str(max_rate),
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        output = crawl.stdout.read()  # type: ignore[union-attr]
+        # unlike RUSAGE_CHILDREN, includes only the crawl and the parsing workers, which it waited for
+        _, exit_status, usage = os.wait4(crawl.pid, 0)
+        crawl.returncode = os.waitstatus_to_exitcode(exit_status)
+    finally:
+        server.terminate()
+        server.join()
+    if crawl.returncode:
+        raise subprocess.CalledProcessError(crawl.returncode, crawl.args)
+    measurements = json.loads(output.splitlines()[-1])
+    measurements["cpu_ms_per_offer"] = (usage.ru_utime + usage.ru_stime) / config.offers_count * 1000
+    return measurements
+
+
+def _serve(config: MockServerConfig, port: int) -> None:
+    web.run_app(create_app(config), host="127.0.0.1", port=port, print=None, access_log=None)
+
+
+def _find_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int) -> None:
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _git_revision() -> str | None:
+    """
+    Stored results don't make the revision dirty, the benchmark writes them itself.
+    """
+    repository = Path(__file__).parent.parent
+    revision = subprocess.run(["git", "describe", "--always"], capture_output=True, text=True, cwd=repository)
+    if not revision.stdout.strip():
+        return None
+    changes = subprocess.run(
+        ["git", "status", "--porcelain", "--", ".", f":(exclude){RESULTS_PATH.parent.relative_to(repository)}"],
+        capture_output=True,
+        text=True,
+        cwd=repository,
+    )
+    return f"{revision.stdout.strip()}-dirty" if changes.stdout.strip() else revision.stdout.strip()
+
+
+def _load_results() -> dict[str, dict]:
+    """
+    The latest result of every configuration.
+    """
+    if not RESULTS_PATH.exists():
+        return {}
+    with open(RESULTS_PATH) as results_file:
+        results = [json.loads(line) for line in results_file if line.strip()]
+    return {json.dumps(r["config"], sort_keys=True): r for r in results}
+
+
+def _save_result(result: dict) -> None:
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_PATH, "a") as results_file:
+        results_file.write(json.dumps(result) + "\n")
+
+
+def _print_result(result: dict, previous: dict | None) -> None:
+    def change(key: str) -> str:
+        if not previous or not previous.get(key) or result[key] is None:
+            return ""
+        return f" ({(result[key] / previous[key] - 1) * 100:+.0f}% vs {previous['revision']})"
+
+    print(f"{result['config']['offers']} offers, {result['matched_offers']} matched, {result['retries']:g} retries")
+    print(f"  throughput:   {result['offers_per_s']:8.1f} offers/s{change('offers_per_s')}")
+    print(f"  latency p50:  {result['latency_p50_ms']:8.1f} ms{change('latency_p50_ms')}")
+    print(f"  latency p99:  {result['latency_p99_ms']:8.1f} ms{change('latency_p99_ms')}")
+    print(f"  peak RSS:     {result['peak_rss_mb']:8.1f} MB{change('peak_rss_mb')}")
+    print(f"  CPU:          {result['cpu_ms_per_offer']:8.2f} ms/offer{change('cpu_ms_per_offer')}")
+
+
+if __name__ == "__main__":
+    main()
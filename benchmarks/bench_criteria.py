@@ -0,0 +1,48 @@
+"""
+Location criteria evaluated the original way and compiled, over synthetic offers.
+
+    python -m benchmarks.bench_criteria
+"""
+
+import random
+import time
+
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+
+OFFERS_COUNT = 20_000
+CITIES = ["Warszawa", "Kraków", "Wrocław", "Gdańsk", "Poznań", "Łódź", "Katowice", "Gdynia", "Lublin", "Szczecin"]
+REMOTE_OPTIONS = ["Hybrid", "Remote", "Office", "Fully remote"]
+LOCATION_CRITERIA = [
+    LocationCriteria(
+        keywords=[
+            LocationKeyword(form="hybrid", city="wroclaw"),
+            LocationKeyword(form="hybrid", city="warszawa"),
+            LocationKeyword(form="remote"),
+        ],
+        rule=LocationRule.AT_LEAST_ONE,
+    ),
+    LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="gdansk")], rule=LocationRule.AT_LEAST_ONE),
+]
+
+
+def main() -> None:
+    random.seed(0)
+    offers = [(random.choice(REMOTE_OPTIONS), random.choice(CITIES)) for _ in range(OFFERS_COUNT)]
+
+    start = time.perf_counter()
+    original = [all(c.is_satisfied(*offer) for c in LOCATION_CRITERIA) for offer in offers]
+    original_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_criteria = [c.compile() for c in LOCATION_CRITERIA]
+    compiled = [all(c.is_satisfied(*offer) for c in compiled_criteria) for offer in offers]
+    compiled_elapsed = time.perf_counter() - start
+
+    assert original == compiled
+    print(f"distinct (remote options, city) pairs: {len(set(offers))}")
+    print(f"original: {original_elapsed * 1000:8.1f} ms for {OFFERS_COUNT} offers")
+    print(f"compiled: {compiled_elapsed * 1000:8.1f} ms for {OFFERS_COUNT} offers")
+
+
+if __name__ == "__main__":
+    main()
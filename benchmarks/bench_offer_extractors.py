@@ -0,0 +1,28 @@
+"""
+Pages per second of every parser backend over the offer pages from `sample_responses/`.
+
+    python -m benchmarks.bench_offer_extractors
+"""
+
+import time
+
+from src.jjit_board_parser import JJITBoardParser
+from src.offer_extractors import ParserBackend
+from src.utils import get_offers_html
+
+ROUNDS = 20
+
+
+def main() -> None:
+    offers = get_offers_html()
+    for backend in ParserBackend:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for offer in offers:
+                JJITBoardParser._parse_offer(offer, backend)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:>15}: {ROUNDS * len(offers) / elapsed:8.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
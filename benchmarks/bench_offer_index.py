@@ -0,0 +1,65 @@
+"""
+Queries over the offer index filled with synthetic offers derived from the sample offers.
+
+    python -m benchmarks.bench_offer_index
+"""
+
+import dataclasses
+import random
+import statistics
+import time
+import typing
+
+from yarl import URL
+
+from src.jjit_board_parser import JJITBoardParser
+from src.models import TechStackEntry
+from src.offer_index import OfferIndex
+from src.utils import get_offers_html
+
+OFFERS_COUNT = 30_000
+REPEATS = 200
+TECHNOLOGIES = ["Python", "Docker", "Rust", "Go", "AWS", "Kubernetes", "Django", "FastAPI", "PostgreSQL", "React"]
+LEVELS = ["nice to have", "junior", "regular", "advanced", "master"]
+QUERIES: dict[str, dict[str, typing.Any]] = {
+    "keyword": {"keywords": ["airlines"]},
+    "two keywords": {"keywords": ["platform", "gemini"]},
+    "all technologies": {"all_technologies": ["Python", "Docker", "AWS"]},
+    "any technology": {"any_technologies": ["Rust", "Go"]},
+    "level >= advanced": {"all_technologies": ["Python"], "min_level": "advanced"},
+    "combined": {"keywords": ["platform"], "all_technologies": ["Kubernetes"], "min_level": "advanced"},
+}
+
+
+def main() -> None:
+    random.seed(0)
+    samples = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+    offers = [
+        dataclasses.replace(
+            random.choice(samples),
+            url=URL(f"https://justjoin.it/job-offer/offer-{i}-python"),
+            tech_stack=tuple(
+                TechStackEntry(technology, random.choice(LEVELS))
+                for technology in random.sample(TECHNOLOGIES, random.randint(2, 6))
+            ),
+        )
+        for i in range(OFFERS_COUNT)
+    ]
+
+    index = OfferIndex()
+    start = time.perf_counter()
+    for offer in offers:
+        index.add(offer)
+    print(f"indexing: {(time.perf_counter() - start) * 1000:8.1f} ms for {OFFERS_COUNT} offers")
+
+    for name, query in QUERIES.items():
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            matched = index.search(**query)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>20}: {statistics.median(timings) * 1_000_000:8.1f} us median, {len(matched)} offers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Memory per offer in a 10k-offer run: the parsed offers as they arrive from the parsing workers, and the dicts which
+`as_dict` builds for JSON responses. Descriptions are reported separately, they are unique to every offer.
+
+    python -m benchmarks.bench_offer_memory
+"""
+
+import gc
+import pickle
+import sys
+import tracemalloc
+
+from src.jjit_board_parser import JJITBoardParser
+from src.utils import get_offers_html
+
+OFFERS_COUNT = 10_000
+
+
+def main() -> None:
+    parsed = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+    pickled = [pickle.dumps(offer) for offer in parsed]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # every offer is unpickled on its own, like offers sent back by the parsing workers
+    offers = [pickle.loads(pickled[i % len(pickled)]) for i in range(OFFERS_COUNT)]
+    after_offers = tracemalloc.get_traced_memory()[0]
+    rows = [offer.as_dict() for offer in offers]
+    after_rows = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    text_bytes = sum(sys.getsizeof(offer.text) for offer in offers) / OFFERS_COUNT
+    print(
+        f"offers:            {(after_offers - before) / OFFERS_COUNT:8.0f} B/offer ({text_bytes:.0f} B of description)"
+    )
+    print(f"as_dict rows:      {(after_rows - after_offers) / OFFERS_COUNT:8.0f} B/offer")
+    print(f"without the text:  {(after_offers - before) / OFFERS_COUNT - text_bytes:8.0f} B/offer")
+    assert len(rows) == OFFERS_COUNT
+
+
+if __name__ == "__main__":
+    main()
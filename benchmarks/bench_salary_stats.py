@@ -0,0 +1,98 @@
+"""
+Salary statistics of synthetic offers, at the offer count of the full sitemap and ten times more. Compared with the
+same scores, percentiles and medians computed offer by offer with `bisect` and `statistics`.
+
+    python -m benchmarks.bench_salary_stats
+"""
+
+import bisect
+import dataclasses
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from src.constants import SALARY_PERIODS_PER_MONTH, SALARY_RATES_TO_PLN
+from src.jjit_board_parser import JJITBoardParser
+from src.models import JobOffer
+from src.salary_stats import compute_salary_stats
+from src.utils import get_offers_html
+
+OFFERS_COUNTS = (10_000, 100_000)
+CITIES = ["Warszawa", "Kraków", "Wrocław", "Gdańsk", "Poznań", "Łódź", "Katowice", "Gdynia", "Lublin", "Szczecin"]
+SALARIES = [
+    (None, None, None, None),
+    (15000, 25000, "PLN", "MONTH"),
+    (120, 180, "PLN", "HOUR"),
+    (5000, 7000, "EUR", "MONTH"),
+]
+
+
+def python_salary_stats(
+    offers: list[JobOffer],
+) -> tuple[list[float], list[float], dict[str, float], dict[str, float]]:
+    by_technology: dict[str, list[float]] = defaultdict(list)
+    by_city: dict[str, list[float]] = defaultdict(list)
+    salaries = []
+    for offer in offers:
+        if offer.salary_min is None or offer.salary_max is None:
+            continue
+        salary = (
+            (offer.salary_min + offer.salary_max)
+            / 2
+            * SALARY_RATES_TO_PLN[offer.salary_currency or ""]
+            * SALARY_PERIODS_PER_MONTH[offer.salary_per or ""]
+        )
+        salaries.append(salary)
+        by_city[offer.location_city].append(salary)
+        for entry in offer.tech_stack:
+            by_technology[entry.technology].append(salary)
+    sorted_salaries = sorted(salaries)
+    scores = [
+        100 * (bisect.bisect_left(sorted_salaries, s) + bisect.bisect_right(sorted_salaries, s) - 1) / 2 / len(salaries)
+        for s in salaries
+    ]
+    return (
+        scores,
+        statistics.quantiles(salaries, n=10),
+        {technology: statistics.median(s) for technology, s in by_technology.items()},
+        {city: statistics.median(s) for city, s in by_city.items()},
+    )
+
+
+def main() -> None:
+    random.seed(0)
+    parsed = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+    for offers_count in OFFERS_COUNTS:
+        offers = []
+        for _ in range(offers_count):
+            salary_min, salary_max, currency, per = random.choice(SALARIES)
+            scale = random.uniform(0.5, 2)
+            offers.append(
+                dataclasses.replace(
+                    random.choice(parsed),
+                    location_city=random.choice(CITIES),
+                    salary_min=int(salary_min * scale) if salary_min else None,
+                    salary_max=int(salary_max * scale) if salary_max else None,
+                    salary_currency=currency,
+                    salary_per=per,
+                )
+            )
+
+        start = time.perf_counter()
+        python_salary_stats(offers)
+        python_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = compute_salary_stats(offers)
+        numpy_elapsed = time.perf_counter() - start
+
+        print(
+            f"{offers_count:>7} offers ({stats.offers_with_salary} with salary): "
+            f"statistics {python_elapsed * 1000:7.1f} ms, numpy {numpy_elapsed * 1000:6.1f} ms "
+            f"({python_elapsed / numpy_elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
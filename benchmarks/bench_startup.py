@@ -0,0 +1,63 @@
+"""
+Start-up time of the CLI: wall time of whole commands on top of a bare interpreter, and the slowest top-level imports
+reported by `-X importtime` (modules imported by the bare interpreter are left out). Commands working only with the
+caches should stay well under 100 ms.
+
+    python -m benchmarks.bench_startup
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = (["--help"], ["cache", "stats"], ["report", "--help"])
+RUNS = 10
+SLOWEST_IMPORTS = 5
+HEAVY_MODULES = ("aiohttp", "bs4", "pydantic", "jinja2", "fake_useragent")
+
+
+def wall_time(args: list[str]) -> float:
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def imports_of(args: list[str]) -> dict[str, tuple[int, bool]]:
+    """
+    Cumulative import time in microseconds of every module imported by the command, and whether the command imported
+    it directly.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], check=True, capture_output=True, text=True
+    ).stderr
+    imports = {}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, module = line.split("|")
+        imports[module.strip()] = (int(cumulative), not module.startswith("  "))
+    return imports
+
+
+def main() -> None:
+    bare = wall_time(["-c", "pass"])
+    interpreter_imports = imports_of(["-c", "pass"])
+    print(f"{'bare interpreter':<22} {bare * 1000:6.1f} ms")
+    for command in COMMANDS:
+        args = ["-m", "src.cli", *command]
+        imports = {m: i for m, i in imports_of(args).items() if m not in interpreter_imports}
+        top_level = {module: us for module, (us, is_top_level) in imports.items() if is_top_level}
+        slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:SLOWEST_IMPORTS]
+        heavy = [m for m in HEAVY_MODULES if m in imports]
+        print(
+            f"{'jobs ' + ' '.join(command):<22} {(wall_time(args) - bare) * 1000:6.1f} ms on top, "
+            f"imports {sum(top_level.values()) / 1000:.1f} ms: "
+            + ", ".join(f"{module} {us / 1000:.1f}" for module, us in slowest)
+            + (f" (heavy: {', '.join(heavy)})" if heavy else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Local stand-in for justjoin.it: a board of N synthesized offers whose pages are served from `sample_responses/`, with
+configurable latency and throttling.
+
+    python -m benchmarks.mock_server --offers 1000 --latency 0.05 --error-rate 0.02 --retry-after 1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from src.constants import SINGLE_JOB_CLASS_NAME, SINGLE_JOB_TAG_NAME
+from src.utils import open_html
+
+OFFER_PAGES = ("single_offer_rust", "single_offer_rust2", "single_offer_multiple_cities")
+BOARD_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True, slots=True)
+class MockServerConfig:
+    offers_count: int
+    latency: float = 0.0  # seconds, every response is delayed by latency +/- 50%
+    error_rate: float = 0.0  # share of offer responses which fail with one of `error_statuses`
+    error_statuses: tuple[int, ...] = (429, 503)
+    retry_after: int | None = None  # sent with the errors
+
+
+def create_app(config: MockServerConfig) -> web.Application:
+    offer_pages = [open_html(name) for name in OFFER_PAGES]
+    slugs = [f"benchmark-company-offer-{i}-python" for i in range(config.offers_count)]
+
+    async def delay() -> None:
+        if config.latency:
+            await asyncio.sleep(random.uniform(config.latency * 0.5, config.latency * 1.5))
+
+    async def board(request: web.Request) -> web.Response:
+        await delay()
+        return web.Response(text=_render_board(slugs[:BOARD_PAGE_SIZE], len(slugs)), content_type="text/html")
+
+    async def board_page(request: web.Request) -> web.Response:
+        await delay()
+        start = int(request.query["from"])
+        page = slugs[start : start + int(request.query["itemsCount"])]
+        return web.json_response({"data": [{"slug": slug} for slug in page], "meta": {"totalItems": len(slugs)}})
+
+    async def offer(request: web.Request) -> web.Response:
+        await delay()
+        if random.random() < config.error_rate:
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else None
+            return web.Response(status=random.choice(config.error_statuses), headers=headers)
+        offer_number = int(request.match_info["slug"].split("-")[-2])
+        return web.Response(text=offer_pages[offer_number % len(offer_pages)], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/job-offers/all-locations/{language}", board)
+    app.router.add_get("/api/candidate-api/offers", board_page)
+    app.router.add_get("/job-offer/{slug}", offer)
+    return app
+
+
+def _render_board(slugs: list[str], total_items: int) -> str:
+    """
+    Only what the board parser reads: offer cards and the listing state embedded in the page.
+    """
+    tag = SINGLE_JOB_TAG_NAME
+    cards = "\n".join(
+        f'<{tag} class="{SINGLE_JOB_CLASS_NAME}" href="/job-offer/{slug}">{slug}</{tag}>' for slug in slugs
+    )
+    listing_state = json.dumps({"totalItems": total_items, "pageParams": [{"from": 0, "itemsCount": BOARD_PAGE_SIZE}]})
+    return f"<html><body>\n{cards}\n<script>{listing_state.replace(' ', '')}</script>\n</body></html>"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=None)
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    config = MockServerConfig(
+        offers_count=args.offers, latency=args.latency, error_rate=args.error_rate, retry_after=args.retry_after
+    )
+    web.run_app(create_app(config), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
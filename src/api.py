@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import typing
+from datetime import datetime, timedelta
+
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from pydantic import BaseModel, field_validator
+
+from src.constants import API_REFRESH_INTERVAL, OFFER_STORE_PATH, PROFILES_PATH
+from src.criteria import LocationCriteria
+from src.generate import open_parser
+from src.metrics import REGISTRY
+from src.models import JobOffer, ProgrammingLanguage
+from src.offer_index import LEVEL_OF_ADVANCEMENT_RANKS, OfferIndex
+from src.offer_store import OfferStore
+from src.profiles import Profile, load_profiles
+from src.salary_stats import compute_salary_stats
+from src.scheduler import Scheduler
+from src.utils import prepare_jinja_env
+
+
+class OfferQuery(BaseModel):
+    language: ProgrammingLanguage | None = None
+    keywords: list[str] = []
+    all_technologies: list[str] = []
+    any_technologies: list[str] = []
+    min_level: str | None = None
+    location_criteria: list[LocationCriteria] = []
+
+    @field_validator("min_level")
+    @classmethod
+    def check_min_level(cls, min_level: str | None) -> str | None:
+        if min_level is not None and min_level.casefold() not in LEVEL_OF_ADVANCEMENT_RANKS:
+            raise ValueError(f"unknown level, expected one of: {', '.join(LEVEL_OF_ADVANCEMENT_RANKS)}")
+        return min_level
+
+    @classmethod
+    def from_profile(cls, profile: Profile) -> "OfferQuery":
+        return cls(
+            language=profile.language,
+            all_technologies=profile.include_skills,
+            location_criteria=profile.location_criteria,
+        )
+
+
+class OffersService:
+    """
+    Answers queries from the offer index, which is refreshed in the background by crawling boards of the profiles.
+    Only offers which satisfied location criteria of some profile are fully parsed, so only those are indexed.
+    """
+
+    def __init__(self, offer_index: OfferIndex, profiles: list[Profile], scheduler: Scheduler | None = None):
+        self.offer_index = offer_index
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.scheduler = scheduler
+        self.last_refresh: datetime | None = None
+        self._report_template = prepare_jinja_env("report.html")
+
+    def find_offers(self, query: OfferQuery) -> list[JobOffer]:
+        offers = self.offer_index.search(
+            keywords=query.keywords,
+            all_technologies=query.all_technologies,
+            any_technologies=query.any_technologies,
+            min_level=query.min_level,
+        )
+        if query.language:
+            offers = [o for o in offers if query.language.matches_offer_url(o.url)]
+        compiled_criteria = [c.compile() for c in query.location_criteria]
+        return [o for o in offers if o.matches_location_criteria(compiled_criteria)]
+
+    def render_report(self, offers: list[JobOffer]) -> str:
+        return self._report_template.render(
+            jobs=offers, salary_stats=compute_salary_stats(offers), report_date=datetime.now().strftime("%B %d, %Y")
+        )
+
+    @property
+    def is_refreshing(self) -> bool:
+        return self.scheduler is not None and self.scheduler.is_crawling
+
+    async def refresh(self) -> None:
+        """
+        Joins the crawl of profiles which are already being refreshed.
+        """
+        if self.scheduler is None:
+            return
+        await self.scheduler.run_profiles(list(self.profiles.values()))
+        self.last_refresh = datetime.now()
+
+    async def refresh_periodically(self, interval: timedelta) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Refreshing offers failed: {e!r}")
+            await asyncio.sleep(interval.total_seconds())
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> typing.AsyncIterator[None]:
+    """
+    The api client, caches and index live as long as the app. The index starts with offers saved by previous runs,
+    the first refresh adds those which were rejected by the location criteria of earlier crawls.
+    """
+    offer_store = OfferStore(OFFER_STORE_PATH)
+    offer_index = OfferIndex()
+    for offer in offer_store.find_offers(partial=True):
+        offer_index.add(offer)
+    try:
+        async with open_parser(offer_store, offer_index) as parser:
+            profiles = load_profiles(PROFILES_PATH)
+            service = OffersService(offer_index, profiles, Scheduler(parser, profiles))
+            app.state.service = service
+            refreshing = asyncio.create_task(service.refresh_periodically(API_REFRESH_INTERVAL))
+            try:
+                yield
+            finally:
+                refreshing.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await refreshing
+    finally:
+        offer_store.close()
+
+
+app = FastAPI(title="Jobs", lifespan=lifespan)
+
+
+def get_service(request: Request) -> OffersService:
+    return request.app.state.service
+
+
+ServiceDependency = typing.Annotated[OffersService, Depends(get_service)]
+
+
+@app.post("/offers")
+async def search_offers(query: OfferQuery, service: ServiceDependency) -> list[dict]:
+    return [offer.as_dict() for offer in service.find_offers(query)]
+
+
+@app.post("/report", response_class=HTMLResponse)
+async def search_report(query: OfferQuery, service: ServiceDependency) -> str:
+    return service.render_report(service.find_offers(query))
+
+
+@app.get("/profiles/{name}/offers")
+async def profile_offers(name: str, service: ServiceDependency) -> list[dict]:
+    return [offer.as_dict() for offer in service.find_offers(_get_profile_query(name, service))]
+
+
+@app.get("/profiles/{name}/report", response_class=HTMLResponse)
+async def profile_report(name: str, service: ServiceDependency) -> str:
+    return service.render_report(service.find_offers(_get_profile_query(name, service)))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """
+    Prometheus text exposition format.
+    """
+    return REGISTRY.to_prometheus()
+
+
+@app.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def refresh(service: ServiceDependency, background_tasks: BackgroundTasks) -> dict:
+    """
+    Crawl the boards now instead of waiting for the next scheduled refresh.
+    """
+    already_refreshing = service.is_refreshing
+    if not already_refreshing:
+        background_tasks.add_task(service.refresh)
+    return {"already_refreshing": already_refreshing, "last_refresh": service.last_refresh}
+
+
+def _get_profile_query(name: str, service: OffersService) -> OfferQuery:
+    if (profile := service.profiles.get(name)) is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Unknown profile {name}")
+    return OfferQuery.from_profile(profile)
@@ -0,0 +1,123 @@
+"""
+Command line interface, installed as `jobs`. Modules are imported inside the commands which need them, so commands
+working only with the caches don't pay for importing aiohttp, bs4, pydantic and jinja2.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from src.constants import PROFILES_PATH
+
+profiles_option = click.option(
+    "--profiles",
+    "profiles_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=PROFILES_PATH,
+    show_default=True,
+    help="TOML file with the profiles.",
+)
+archive_option = click.option(
+    "--archive/--no-archive",
+    default=None,
+    help="Append downloaded offer pages to the crawl archive, `ARCHIVE_CRAWLS` by default.",
+)
+
+
+@click.group()
+def main() -> None:
+    """
+    Crawl justjoin.it and generate reports of offers matching the profiles.
+    """
+
+
+@main.command()
+@profiles_option
+@archive_option
+def crawl(profiles_path: Path, archive: bool | None) -> None:
+    """
+    Crawl boards of the profiles into the offer store.
+    """
+    import asyncio
+
+    from src.constants import ARCHIVE_CRAWLS, OFFER_STORE_PATH
+    from src.generate import open_parser, print_metrics_summary
+    from src.offer_store import OfferStore
+    from src.profiles import load_profiles
+
+    async def crawl_profiles() -> dict[str, int]:
+        offer_store = OfferStore(OFFER_STORE_PATH)
+        try:
+            async with open_parser(offer_store, archive=ARCHIVE_CRAWLS if archive is None else archive) as parser:
+                jobs_per_profile = await parser.find_offers_for_profiles(load_profiles(profiles_path))
+        finally:
+            offer_store.close()
+        return {name: len(jobs) for name, jobs in jobs_per_profile.items()}
+
+    for name, count in asyncio.run(crawl_profiles()).items():
+        click.echo(f"{name}: {count} offers")
+    print_metrics_summary()
+
+
+@main.command()
+@profiles_option
+@archive_option
+@click.option(
+    "--from-store",
+    is_flag=True,
+    help="Generate the reports from the offer store, without crawling. Fails when offers rejected by the location "
+    "criteria of earlier crawls may match a profile.",
+)
+def report(profiles_path: Path, archive: bool | None, from_store: bool) -> None:
+    """
+    Generate one report per profile.
+    """
+    import asyncio
+
+    from src.constants import ARCHIVE_CRAWLS
+    from src.exceptions import IncompleteOfferStoreError
+    from src.generate import generate_batch
+    from src.models import DiscoveryMode
+
+    discovery = DiscoveryMode.STORE if from_store else DiscoveryMode.BOARD
+    try:
+        asyncio.run(generate_batch(profiles_path, discovery, ARCHIVE_CRAWLS if archive is None else archive))
+    except IncompleteOfferStoreError as e:
+        raise click.ClickException(str(e)) from e
+
+
+@main.group()
+def cache() -> None:
+    """
+    Inspect the caches.
+    """
+
+
+@cache.command()
+def stats() -> None:
+    """
+    Entries and size of the response cache, and size of the other caches on disk.
+    """
+    from src.constants import CACHE_DIR, OFFERS_CACHE_MAX_BYTES, OFFERS_CACHE_PATH
+    from src.custom_cache import read_storage_stats
+
+    if storage_stats := read_storage_stats(OFFERS_CACHE_PATH, datetime.now()):
+        click.echo(f"responses:        {storage_stats.entries} entries, {storage_stats.expired} expired")
+        click.echo(
+            f"response bodies:  {_format_bytes(storage_stats.total_bytes)} of {_format_bytes(OFFERS_CACHE_MAX_BYTES)}"
+        )
+    else:
+        click.echo("responses:        no cache")
+    if not CACHE_DIR.exists():
+        return
+    for path in sorted(p for p in CACHE_DIR.iterdir() if p.is_file()):
+        click.echo(f"{path.name + ':':<17} {_format_bytes(path.stat().st_size)} on disk")
+
+
+def _format_bytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+if __name__ == "__main__":
+    main()
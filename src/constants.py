@@ -1,2 +1,84 @@
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from yarl import URL
+
+JJIT_BASE_URL = URL("https://justjoin.it")
 SINGLE_JOB_CLASS_NAME = "offer-card"
 SINGLE_JOB_TAG_NAME = "a"
+# Cities as they appear in offer slugs, e.g. /job-offer/company-senior-python-developer-warszawa-python
+KNOWN_CITY_SLUGS = (
+    "warszawa",
+    "krakow",
+    "wroclaw",
+    "gdansk",
+    "gdynia",
+    "sopot",
+    "poznan",
+    "lodz",
+    "katowice",
+    "gliwice",
+    "szczecin",
+    "lublin",
+    "bialystok",
+    "bydgoszcz",
+    "torun",
+    "rzeszow",
+    "kielce",
+    "opole",
+    "olsztyn",
+    "czestochowa",
+    "radom",
+    "bielsko-biala",
+    "zielona-gora",
+)
+
+SITEMAP_PATH = Path(__file__).parent.parent / "active_jobs.xml"
+
+CONNECTION_LIMIT = 20
+CONNECTION_LIMIT_PER_HOST = 6
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept open for reuse
+DNS_CACHE_TTL = 300
+
+RATE_LIMIT_INITIAL_RATE = 2.0  # requests per second
+RATE_LIMIT_MAX_RATE = 20.0
+RATE_LIMIT_INITIAL_CONCURRENCY = 3
+RATE_LIMIT_MAX_CONCURRENCY = CONNECTION_LIMIT_PER_HOST
+RATE_LIMIT_FAST_RESPONSE = 1.5  # seconds, only faster responses let the limiter speed up
+RETRY_AFTER_MAX_WAIT = 60.0  # seconds, requests asked to wait longer by `Retry-After` give up instead
+
+PARSE_WORKERS = os.cpu_count() or 1  # processes parsing offer pages, 0 parses on the event loop
+PARSE_QUEUE_SIZE = 32  # responses waiting for parsing, fetching pauses when the queue is full
+MAX_PENDING_RESPONSES = 2 * CONNECTION_LIMIT_PER_HOST  # downloaded or in-flight offers not yet taken by the consumer
+
+CACHE_DIR = Path(__file__).parent.parent / ".cache"
+OFFERS_CACHE_PATH = CACHE_DIR / "offers_cache.sqlite"
+OFFERS_CACHE_CAPACITY = 500  # number of entries kept in memory
+OFFERS_CACHE_MEMORY_MAX_BYTES = 128 * 1024 * 1024  # budget for HTML kept in memory
+OFFERS_CACHE_MAX_BYTES = 512 * 1024 * 1024  # budget for the on-disk cache
+OFFERS_CACHE_TTL = timedelta(days=1)
+OFFERS_CACHE_TTL_JITTER = 0.25  # each entry lives TTL +/- 25%, so entries don't expire all at once
+CRAWL_INDEX_PATH = CACHE_DIR / "crawl_index.sqlite"
+PARSED_OFFERS_CACHE_PATH = CACHE_DIR / "parsed_offers.sqlite"
+USER_AGENTS_PATH = CACHE_DIR / "user_agents.txt"
+USER_AGENTS_POOL_SIZE = 20  # User-Agents picked from fake_useragent once, each client uses one of them
+
+DATA_DIR = Path(__file__).parent.parent / ".data"
+OFFER_STORE_PATH = DATA_DIR / "offers.sqlite"
+OFFER_STORE_BATCH_SIZE = 100  # offers written to the store in one transaction
+OFFER_LOCATION_MAX_AGE = timedelta(days=30)  # offers rejected by location and not seen since are assumed closed
+ARCHIVE_CRAWLS = False  # append every downloaded offer page to the crawl archive, for `src/reparse.py`
+CRAWL_ARCHIVE_PATH = DATA_DIR / "crawl_archive.bin"
+REPARSE_CHUNK_SIZE = 100  # archived pages sent to a parsing worker at once
+
+# salaries are compared as monthly amounts in PLN, offers in other currencies or periods are left out of the statistics
+SALARY_RATES_TO_PLN = {"PLN": 1.0, "EUR": 4.25, "USD": 3.65, "GBP": 4.9, "CHF": 4.55}  # update when rates drift
+SALARY_PERIODS_PER_MONTH = {"HOUR": 168.0, "DAY": 21.0, "WEEK": 4.33, "MONTH": 1.0, "YEAR": 1 / 12}
+SALARY_PERCENTILES = (10, 25, 50, 75, 90)
+SALARY_STATS_MIN_OFFERS = 3  # technologies and cities with fewer offers with a salary get no median
+SALARY_STATS_TOP = 10  # technologies, cities and offers listed in the salary section of reports
+
+PROFILES_PATH = Path(__file__).parent.parent / "profiles.toml"
+API_REFRESH_INTERVAL = timedelta(hours=1)  # how often the service crawls boards of the profiles
+FULL_CRAWL_INTERVAL = timedelta(days=7)  # scheduled crawls in between download only offers new on the boards
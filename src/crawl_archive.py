@@ -0,0 +1,144 @@
+import json
+import mmap
+import sqlite3
+import struct
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from yarl import URL
+
+from src.custom_cache import compress_html, decompress_html
+from src.models import WebsiteOkResponse
+
+RECORD_MAGIC = b"JOBA"
+# magic, length of the JSON metadata, length of the compressed body
+RECORD_HEADER = struct.Struct("<4sII")
+
+
+@dataclass(frozen=True, slots=True)
+class ArchivedPage:
+    url: URL
+    fetched_at: datetime
+    headers: dict[str, str]
+    html: str
+
+    def as_response(self) -> WebsiteOkResponse:
+        return WebsiteOkResponse(
+            html=self.html,
+            url=self.url,
+            etag=self.headers.get("ETag"),
+            last_modified=self.headers.get("Last-Modified"),
+        )
+
+
+class CrawlArchive:
+    """
+    Append-only file of every downloaded offer page (URL, fetch time, validator headers and compressed body), with an
+    offset index kept next to it in SQLite. Records are never rewritten, so the archive keeps the history of each offer.
+    The index is only a shortcut: records missing from it, e.g. after a crash, are indexed again by scanning the file.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._file = open(path, "ab")
+        self._connection = sqlite3.connect(path.with_name(f"{path.name}.index"))
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                offset INTEGER PRIMARY KEY,
+                length INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_url ON records (url);
+            """
+        )
+        self._index_unindexed_records()
+
+    def append(self, response: WebsiteOkResponse, fetched_at: datetime | None = None) -> None:
+        fetched_at = fetched_at or datetime.now()
+        headers: dict[str, str] = {}
+        if response.etag:
+            headers["ETag"] = response.etag
+        if response.last_modified:
+            headers["Last-Modified"] = response.last_modified
+        metadata = {"url": str(response.url), "fetched_at": fetched_at.isoformat(), "headers": headers}
+        record = _pack_record(json.dumps(metadata).encode(), compress_html(response.html))
+        offset = self._file.tell()
+        self._file.write(record)
+        self._file.flush()
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO records VALUES (?, ?, ?, ?)",
+                (offset, len(record), metadata["url"], metadata["fetched_at"]),
+            )
+
+    def latest_offsets(self) -> list[int]:
+        """
+        Offsets of the latest record of every URL, in the order they were written.
+        """
+        rows = self._connection.execute("SELECT MAX(offset) FROM records GROUP BY url ORDER BY 1")
+        return [offset for (offset,) in rows]
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self) -> None:
+        self._file.close()
+        self._connection.close()
+
+    def _index_unindexed_records(self) -> None:
+        """
+        A record cut off by a crash is dropped, the next one is appended in its place.
+        """
+        indexed_end = self._connection.execute("SELECT COALESCE(MAX(offset + length), 0) FROM records").fetchone()[0]
+        file_size = self._file.tell()
+        if indexed_end >= file_size:
+            return
+        with open(self.path, "rb") as archive, mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            rows = [
+                (offset, length, metadata["url"], metadata["fetched_at"])
+                for offset, length, metadata in _scan_records(buffer, indexed_end)
+            ]
+        with self._connection:
+            self._connection.executemany("INSERT INTO records VALUES (?, ?, ?, ?)", rows)
+        records_end = rows[-1][0] + rows[-1][1] if rows else indexed_end
+        if records_end < file_size:
+            self._file.truncate(records_end)
+            self._file.seek(records_end)
+
+
+def read_page(buffer: mmap.mmap | bytes, offset: int) -> ArchivedPage:
+    magic, metadata_length, body_length = RECORD_HEADER.unpack_from(buffer, offset)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"No archive record at offset {offset}")
+    metadata_start = offset + RECORD_HEADER.size
+    body_start = metadata_start + metadata_length
+    metadata = json.loads(buffer[metadata_start:body_start])
+    return ArchivedPage(
+        url=URL(metadata["url"]),
+        fetched_at=datetime.fromisoformat(metadata["fetched_at"]),
+        headers=metadata["headers"],
+        html=decompress_html(buffer[body_start : body_start + body_length]),
+    )
+
+
+def _pack_record(metadata: bytes, body: bytes) -> bytes:
+    return RECORD_HEADER.pack(RECORD_MAGIC, len(metadata), len(body)) + metadata + body
+
+
+def _scan_records(buffer: mmap.mmap, offset: int) -> typing.Iterator[tuple[int, int, dict]]:
+    """
+    Offset, length and metadata of complete records from `offset` on.
+    """
+    while offset + RECORD_HEADER.size <= len(buffer):
+        magic, metadata_length, body_length = RECORD_HEADER.unpack_from(buffer, offset)
+        length = RECORD_HEADER.size + metadata_length + body_length
+        if magic != RECORD_MAGIC or offset + length > len(buffer):
+            return
+        metadata_start = offset + RECORD_HEADER.size
+        yield offset, length, json.loads(buffer[metadata_start : metadata_start + metadata_length])
+        offset += length
@@ -0,0 +1,92 @@
+import sqlite3
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from yarl import URL
+
+from src.sitemap import SitemapEntry
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlDelta:
+    changed: list[URL]  # new offers and offers modified since they were crawled
+    unchanged: list[URL]
+    closed: list[URL]  # offers which disappeared from the sitemap during this update
+
+
+class CrawlIndex:
+    """
+    Remembers `lastmod` of every offer seen in the sitemap and the `lastmod` it had when it was successfully crawled.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_index (
+                url TEXT PRIMARY KEY,
+                lastmod TEXT NOT NULL,
+                crawled_lastmod TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                closed_at TEXT
+            );
+            CREATE TEMP TABLE current_sitemap (
+                url TEXT PRIMARY KEY,
+                lastmod TEXT NOT NULL
+            );
+            """
+        )
+
+    def update(self, entries: typing.Iterable[SitemapEntry]) -> CrawlDelta:
+        now = datetime.now().isoformat()
+        with self._connection:
+            self._connection.execute("DELETE FROM current_sitemap")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO current_sitemap VALUES (?, ?)",
+                ((str(e.url), e.lastmod.isoformat()) for e in entries),
+            )
+            closed = self._connection.execute(
+                """
+                UPDATE crawl_index SET closed_at = ?
+                WHERE closed_at IS NULL AND url NOT IN (SELECT url FROM current_sitemap)
+                RETURNING url
+                """,
+                (now,),
+            ).fetchall()
+            self._connection.execute(
+                """
+                INSERT INTO crawl_index (url, lastmod, first_seen, last_seen)
+                SELECT url, lastmod, ?, ? FROM current_sitemap WHERE true
+                ON CONFLICT (url) DO UPDATE
+                SET lastmod = excluded.lastmod, last_seen = excluded.last_seen, closed_at = NULL
+                """,
+                (now, now),
+            )
+            rows = self._connection.execute(
+                """
+                SELECT c.url, c.crawled_lastmod IS NULL OR c.crawled_lastmod < c.lastmod
+                FROM crawl_index c JOIN current_sitemap s ON s.url = c.url
+                ORDER BY c.url
+                """
+            )
+            changed: list[URL] = []
+            unchanged: list[URL] = []
+            for url, is_changed in rows:
+                (changed if is_changed else unchanged).append(URL(url))
+
+        return CrawlDelta(changed=changed, unchanged=unchanged, closed=[URL(url) for (url,) in closed])
+
+    def mark_crawled(self, url: URL) -> None:
+        with self._connection:
+            self._connection.execute("UPDATE crawl_index SET crawled_lastmod = lastmod WHERE url = ?", (str(url),))
+
+    def closed_offers(self) -> list[URL]:
+        rows = self._connection.execute("SELECT url FROM crawl_index WHERE closed_at IS NOT NULL")
+        return [URL(url) for (url,) in rows]
+
+    def close(self) -> None:
+        self._connection.close()
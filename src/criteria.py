@@ -1,3 +1,4 @@
+import unicodedata
 from collections.abc import Callable, Mapping
 from difflib import SequenceMatcher
 from enum import StrEnum
@@ -17,12 +18,16 @@ class LocationRule(StrEnum):
 
 RULES_MAPPING: Mapping[LocationRule, Callable] = {LocationRule.ALL: all, LocationRule.AT_LEAST_ONE: any}
 WORD_SIMILARITY_THRESHOLD = 0.75  # if words similarity score is less than this value, then words are not similar
+LETTERS_WITHOUT_DECOMPOSITION = str.maketrans({"ł": "l", "đ": "d", "ø": "o"})  # not handled by NFKD
 
 
 class LocationCriteria(BaseModel):
     keywords: list[LocationKeyword]
     rule: LocationRule
 
+    def compile(self) -> "CompiledLocationCriteria":
+        return CompiledLocationCriteria(self)
+
     def is_satisfied(self, remote_options: str, city: str) -> bool:
         keywords_matched = []
         for keyword in self.keywords:
@@ -35,8 +40,67 @@ class LocationCriteria(BaseModel):
         return RULES_MAPPING.get(self.rule)(keywords_matched)  # type: ignore[misc]
 
 
+class CompiledLocationCriteria:
+    """
+    `LocationCriteria` with keywords normalized once. Offers share a handful of distinct cities and remote options,
+    so results are memoized per distinct pair.
+    """
+
+    def __init__(self, criteria: LocationCriteria):
+        self._keywords = [
+            (normalize_word(k.form), normalize_word(k.city) if k.city else None) for k in criteria.keywords
+        ]
+        self._rule = RULES_MAPPING[criteria.rule]
+        self._results: dict[tuple[str, str], bool] = {}
+
+    def is_satisfied(self, remote_options: str, city: str) -> bool:
+        if (result := self._results.get((remote_options, city))) is None:
+            result = self._results[remote_options, city] = self._evaluate(
+                normalize_word(remote_options), normalize_word(city)
+            )
+        return result
+
+    def rules_out_city(self, city: str) -> bool:
+        """
+        True when no remote option could satisfy the criteria for an offer in this city.
+        """
+        city = normalize_word(city)
+        return not self._rule(
+            keyword_city is None or normalized_words_are_similar(keyword_city, city)
+            for _, keyword_city in self._keywords
+        )
+
+    def _evaluate(self, remote_options: str, city: str) -> bool:
+        return self._rule(
+            normalized_words_are_similar(form, remote_options)
+            and (keyword_city is None or normalized_words_are_similar(keyword_city, city))
+            for form, keyword_city in self._keywords
+        )
+
+
 def words_are_similar(w1: str, w2: str) -> bool:
     """
     Handle simple typos.
     """
     return SequenceMatcher(None, w1.lower(), w2.lower()).ratio() >= WORD_SIMILARITY_THRESHOLD
+
+
+def normalized_words_are_similar(w1: str, w2: str) -> bool:
+    """
+    Same as `words_are_similar` for words passed through `normalize_word`, with cheap checks first.
+    """
+    if w1 == w2:
+        return True
+    # ratio is 2 * matches / total length, and there can't be more matches than letters in the shorter word
+    if 2 * min(len(w1), len(w2)) / (len(w1) + len(w2)) < WORD_SIMILARITY_THRESHOLD:
+        return False
+    matcher = SequenceMatcher(None, w1, w2)
+    return matcher.quick_ratio() >= WORD_SIMILARITY_THRESHOLD and matcher.ratio() >= WORD_SIMILARITY_THRESHOLD
+
+
+def normalize_word(word: str) -> str:
+    """
+    Casefold and strip diacritics, e.g. "Wrocław" -> "wroclaw".
+    """
+    decomposed = unicodedata.normalize("NFKD", word.casefold().translate(LETTERS_WITHOUT_DECOMPOSITION))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
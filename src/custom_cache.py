@@ -1,98 +1,436 @@
-from dataclasses import dataclass
-from datetime import datetime
+import random
+import sqlite3
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
 
+from src.metrics import CACHE_EVICTIONS_TOTAL, CACHE_LOOKUPS_TOTAL
 
-@dataclass
+COMPRESSION_LEVEL = 3  # offer pages shrink ~5.5x, higher levels gain little and compress several times slower
+
+
+@dataclass(slots=True)
 class LRUCacheEntry:
+    """
+    The page is kept compressed in memory and in storage, and decompressed only when it's read.
+    """
+
     created_at: datetime
-    html_content: str
+    payload: bytes  # see `compress_html`
+    expires_at: datetime | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    url: str = ""  # key of the entry, so an evicted entry can be removed from the cache dict
+    size: int = field(init=False)
+
+    _older: Optional["LRUCacheEntry"] = field(default=None, repr=False, compare=False)
+    _newer: Optional["LRUCacheEntry"] = field(default=None, repr=False, compare=False)
 
-    _older: Optional["LRUCacheEntry"] = None
-    _newer: Optional["LRUCacheEntry"] = None
+    def __post_init__(self) -> None:
+        self.size = len(self.payload)
 
     @classmethod
-    def build(cls, html_content: str) -> "LRUCacheEntry":
+    def build(
+        cls,
+        html_content: str,
+        ttl: timedelta | None = None,
+        ttl_jitter: float = 0.0,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        url: str = "",
+    ) -> "LRUCacheEntry":
+        created_at = datetime.now()
         return cls(
-            created_at=datetime.now(),
-            html_content=html_content,
+            created_at=created_at,
+            payload=compress_html(html_content),
+            expires_at=_jittered_expiry(created_at, ttl, ttl_jitter),
+            etag=etag,
+            last_modified=last_modified,
+            url=url,
         )
 
+    @property
+    def html_content(self) -> str:
+        return decompress_html(self.payload)
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def is_expired(self, now: datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
 
 class DoublyLinkedList:
-    def __init__(self, capacity: int):
-        self.capacity = capacity
+    """
+    Entries from the oldest to the newest, linked through the entries themselves. All operations are O(1).
+    """
+
+    def __init__(self) -> None:
         self.newest: LRUCacheEntry | None = None
         self.oldest: LRUCacheEntry | None = None
         self.size = 0
+        self.total_bytes = 0
 
     def add_node(self, e: LRUCacheEntry) -> None:
+        e._older = self.newest
+        e._newer = None
         if self.newest is None:
-            self.newest = e
             self.oldest = e
-            self.size += 1
-        elif self.size == self.capacity:
-            self._remove_oldest_node()
-            self._add_newest_node(e)
         else:
-            self._add_newest_node(e)
-            self.size += 1
+            self.newest._newer = e
+        self.newest = e
+        self.size += 1
+        self.total_bytes += e.size
 
     def move_node_to_front(self, node: LRUCacheEntry) -> None:
-        older = node._older
-        newer = node._newer
-
-        if not newer:
+        if node is self.newest:
             return
+        self.remove_node(node)
+        self.add_node(node)
 
-        if not older:
-            new_oldest = node._newer
+    def remove_node(self, node: LRUCacheEntry) -> None:
+        if node._older:
+            node._older._newer = node._newer
+        else:
+            self.oldest = node._newer
+        if node._newer:
+            node._newer._older = node._older
+        else:
+            self.newest = node._older
+        node._older = None
+        node._newer = None
+        self.size -= 1
+        self.total_bytes -= node.size
 
-            node._newer._older = None
-            node._newer = None
+    def pop_oldest(self) -> LRUCacheEntry:
+        if (oldest := self.oldest) is None:
+            raise IndexError("pop from an empty list")
+        self.remove_node(oldest)
+        return oldest
 
-            node._older = self.newest
-            self.newest._newer = node
-            self.newest = node
 
-            self.oldest = new_oldest
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    entries: int
+    total_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
 
-        elif older:
-            node._newer._older = node._older
-            node._newer = None
 
-            node._older._newer = node._newer
-            node._older = None
+@dataclass(frozen=True, slots=True)
+class StorageStats:
+    entries: int
+    expired: int
+    total_bytes: int
 
-            node._older = self.newest
-            self.newest._newer = node
-            self.newest = node
 
-    def _add_newest_node(self, e: LRUCacheEntry) -> None:
-        self.newest._newer = e
-        e._older = self.newest
-        self.newest = e
+class SQLiteCacheStorage:
+    """
+    Persistent backend of the cache, one row per URL. Kept under `max_bytes` by dropping the least recently used rows.
+    Access times are kept in memory and written in one batch before evicting and on close, so cache hits don't write.
+    """
+
+    SCHEMA_VERSION = 3  # the cache is disposable, so a table with an older schema is simply recreated
+
+    def __init__(self, path: Path, max_bytes: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._accessed_at: dict[str, str] = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            self._connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS cache_entries;
+                PRAGMA user_version = {self.SCHEMA_VERSION};
+                """
+            )
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                url TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                expires_at TEXT,
+                accessed_at TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                payload BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at);
+            """
+        )
+        self.total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+
+    def get(self, url: str) -> LRUCacheEntry | None:
+        row = self._connection.execute(
+            "SELECT created_at, expires_at, etag, last_modified, payload FROM cache_entries WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.touch(url)
+        created_at, expires_at, etag, last_modified, payload = row
+        return LRUCacheEntry(
+            created_at=datetime.fromisoformat(created_at),
+            payload=payload,
+            expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+            etag=etag,
+            last_modified=last_modified,
+            url=url,
+        )
+
+    def save(self, url: str, e: LRUCacheEntry) -> None:
+        self._accessed_at.pop(url, None)
+        previous = self._connection.execute("SELECT size FROM cache_entries WHERE url = ?", (url,)).fetchone()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    e.created_at.isoformat(),
+                    e.expires_at.isoformat() if e.expires_at else None,
+                    datetime.now().isoformat(),
+                    e.size,
+                    e.etag,
+                    e.last_modified,
+                    e.payload,
+                ),
+            )
+        self.total_bytes += e.size - (previous[0] if previous else 0)
+        self.evict_to_budget()
 
-    def _remove_oldest_node(self) -> None:
-        newer = self.oldest._newer
-        self.oldest._newer = None
-        self.oldest = newer
-        self.oldest._older = None
+    def remove(self, url: str) -> None:
+        self._accessed_at.pop(url, None)
+        with self._connection:
+            removed = self._connection.execute(
+                "DELETE FROM cache_entries WHERE url = ? RETURNING size", (url,)
+            ).fetchone()
+        if removed:
+            self.total_bytes -= removed[0]
+
+    def update_expiry(self, url: str, expires_at: datetime | None) -> None:
+        self._accessed_at.pop(url, None)
+        with self._connection:
+            self._connection.execute(
+                "UPDATE cache_entries SET expires_at = ?, accessed_at = ? WHERE url = ?",
+                (expires_at.isoformat() if expires_at else None, datetime.now().isoformat(), url),
+            )
+
+    def touch(self, url: str) -> None:
+        self._accessed_at[url] = datetime.now().isoformat()
+
+    def flush_access_times(self) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE cache_entries SET accessed_at = ? WHERE url = ?",
+                ((accessed_at, url) for url, accessed_at in self._accessed_at.items()),
+            )
+        self._accessed_at.clear()
+
+    def remove_expired(self, now: datetime) -> int:
+        """
+        Expired entries with `ETag` or `Last-Modified` are kept, they can still be revalidated with a conditional
+        request.
+        """
+        with self._connection:
+            removed = self._connection.execute(
+                """
+                DELETE FROM cache_entries
+                WHERE expires_at IS NOT NULL AND expires_at <= ? AND etag IS NULL AND last_modified IS NULL
+                RETURNING size
+                """,
+                (now.isoformat(),),
+            ).fetchall()
+        self.total_bytes -= sum(size for (size,) in removed)
+        CACHE_EVICTIONS_TOTAL.inc(len(removed), layer="storage_expired")
+        return len(removed)
+
+    def evict_to_budget(self) -> int:
+        """
+        Remove the least recently used entries until the stored HTML fits into the byte budget.
+        """
+        if self.total_bytes <= self.max_bytes:
+            return 0
+        self.flush_access_times()
+        evicted = 0
+        rows = self._connection.execute("SELECT url, size FROM cache_entries ORDER BY accessed_at")
+        to_evict = []
+        for url, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            to_evict.append((url,))
+            self.total_bytes -= size
+            evicted += 1
+        with self._connection:
+            self._connection.executemany("DELETE FROM cache_entries WHERE url = ?", to_evict)
+        CACHE_EVICTIONS_TOTAL.inc(evicted, layer="storage")
+        return evicted
+
+    def close(self) -> None:
+        self.flush_access_times()
+        self._connection.close()
+
+
+def read_storage_stats(path: Path, now: datetime) -> StorageStats | None:
+    """
+    The storage is opened read-only, so nothing is created or recreated. None when there is no storage with the
+    current schema.
+    """
+    if not path.exists():
+        return None
+    connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SQLiteCacheStorage.SCHEMA_VERSION:
+            return None
+        entries, expired, total_bytes = connection.execute(
+            """
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE expires_at IS NOT NULL AND expires_at <= ?), COALESCE(SUM(size), 0)
+            FROM cache_entries
+            """,
+            (now.isoformat(),),
+        ).fetchone()
+    finally:
+        connection.close()
+    return StorageStats(entries=entries, expired=expired, total_bytes=total_bytes)
 
 
 class LRUCacheManager:
-    def __init__(self, capacity: int):
+    """
+    Keeps at most `capacity` entries and `max_bytes` of HTML in memory, evicting the least recently used ones. Entries
+    which expired and can't be revalidated are dropped when they are looked up.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl: timedelta | None = None,
+        ttl_jitter: float = 0.0,
+        storage: SQLiteCacheStorage | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
         self._cache_entries: dict[str, LRUCacheEntry] = {}
-        self._order = DoublyLinkedList(capacity)
+        self._order = DoublyLinkedList()
+        self._ttl = ttl
+        self._ttl_jitter = ttl_jitter
+        self._storage = storage
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        if self._storage is not None:
+            self._prevalidate_storage()
 
-    def put(self, url: str, html_content: str) -> None:
-        e = LRUCacheEntry.build(html_content)
-        self._cache_entries[url] = e
-        self._order.add_node(e)
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            entries=self._order.size,
+            total_bytes=self._order.total_bytes,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
+
+    def put(self, url: str, html_content: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        e = LRUCacheEntry.build(html_content, self._ttl, self._ttl_jitter, etag, last_modified, url)
+        self._add_to_memory(e)
+        if self._storage is not None:
+            self._storage.save(url, e)
 
     def get(self, url: str) -> LRUCacheEntry | None:
         cache_hit = self._cache_entries.get(url)
+        if cache_hit and self._drop_if_expired(cache_hit):
+            cache_hit = None
         if cache_hit:
+            self._hits += 1
+            CACHE_LOOKUPS_TOTAL.inc(result="memory_hit")
             self._order.move_node_to_front(cache_hit)
+            if self._storage is not None:
+                self._storage.touch(url)
             return cache_hit
+        if self._storage is not None and (stored := self._storage.get(url)):
+            if not self._drop_if_expired(stored):
+                self._hits += 1
+                CACHE_LOOKUPS_TOTAL.inc(result="storage_hit")
+                self._add_to_memory(stored)
+                return stored
+        self._misses += 1
+        CACHE_LOOKUPS_TOTAL.inc(result="miss")
         return None
+
+    def refresh(self, url: str) -> LRUCacheEntry | None:
+        """
+        Start a new TTL for an entry which the server confirmed to be up to date.
+        """
+        e = self.get(url)
+        if e is None:
+            return None
+        e.expires_at = _jittered_expiry(datetime.now(), self._ttl, self._ttl_jitter)
+        if self._storage is not None:
+            self._storage.update_expiry(url, e.expires_at)
+        return e
+
+    def invalidate(self, url: str) -> None:
+        if e := self._cache_entries.pop(url, None):
+            self._order.remove_node(e)
+        if self._storage is not None:
+            self._storage.remove(url)
+
+    def close(self) -> None:
+        if self._storage is not None:
+            self._storage.close()
+
+    def _add_to_memory(self, e: LRUCacheEntry) -> None:
+        """
+        Replaces the entry of the same URL. The new entry itself is evicted when it alone exceeds `max_bytes`.
+        """
+        if previous := self._cache_entries.get(e.url):
+            self._order.remove_node(previous)
+        self._cache_entries[e.url] = e
+        self._order.add_node(e)
+        while self._order.size > self.capacity or (
+            self.max_bytes is not None and self._order.total_bytes > self.max_bytes
+        ):
+            evicted = self._order.pop_oldest()
+            del self._cache_entries[evicted.url]
+            self._evictions += 1
+            CACHE_EVICTIONS_TOTAL.inc(layer="memory")
+
+    def _drop_if_expired(self, e: LRUCacheEntry) -> bool:
+        """
+        Expired entries with `ETag` or `Last-Modified` are kept, they can still be revalidated with a conditional
+        request.
+        """
+        if not e.is_expired(datetime.now()) or e.has_validators:
+            return False
+        self.invalidate(e.url)
+        self._expirations += 1
+        CACHE_EVICTIONS_TOTAL.inc(layer="memory_expired")
+        return True
+
+    def _prevalidate_storage(self) -> None:
+        """
+        Drop entries which outlived their (jittered) TTL and can't be revalidated, they are re-fetched during this run.
+        """
+        self._storage.remove_expired(datetime.now())  # type: ignore[union-attr]
+        self._storage.evict_to_budget()  # type: ignore[union-attr]
+
+
+def compress_html(html: str) -> bytes:
+    return zlib.compress(html.encode(), COMPRESSION_LEVEL)
+
+
+def decompress_html(payload: bytes) -> str:
+    return zlib.decompress(payload).decode()
+
+
+def _jittered_expiry(start: datetime, ttl: timedelta | None, ttl_jitter: float) -> datetime | None:
+    return start + ttl * random.uniform(1 - ttl_jitter, 1 + ttl_jitter) if ttl else None
@@ -4,10 +4,19 @@ class APIError(Exception):
         self.status = status
 
 
-class RetryableAPIError(APIError): ...
+class RetryableAPIError(APIError):
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None):
+        super().__init__(message, status)
+        self.retry_after = retry_after
 
 
 class JobOfferStructureError(Exception): ...
 
 
 class JustJoinITOfferStructureError(Exception): ...
+
+
+class SitemapStructureError(Exception): ...
+
+
+class IncompleteOfferStoreError(Exception): ...
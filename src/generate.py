@@ -1,14 +1,42 @@
 import asyncio
+import contextlib
+import json
+import sys
+import typing
 from datetime import datetime
+from pathlib import Path
 
+from src.constants import (
+    ARCHIVE_CRAWLS,
+    CRAWL_ARCHIVE_PATH,
+    CRAWL_INDEX_PATH,
+    OFFER_STORE_PATH,
+    OFFERS_CACHE_CAPACITY,
+    OFFERS_CACHE_MAX_BYTES,
+    OFFERS_CACHE_MEMORY_MAX_BYTES,
+    OFFERS_CACHE_PATH,
+    OFFERS_CACHE_TTL,
+    OFFERS_CACHE_TTL_JITTER,
+    PARSED_OFFERS_CACHE_PATH,
+    SITEMAP_PATH,
+)
+from src.crawl_archive import CrawlArchive
+from src.crawl_index import CrawlIndex
 from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.custom_cache import LRUCacheManager, SQLiteCacheStorage
 from src.jjit_api_client import JJITAPIClient
 from src.jjit_board_parser import JJITBoardParser
-from src.models import ProgrammingLanguage
-from src.utils import prepare_jinja_env, save_report
+from src.metrics import CRAWL_PHASE_SECONDS, REGISTRY
+from src.models import DiscoveryMode, JobOffer, ProgrammingLanguage
+from src.offer_index import OfferIndex
+from src.offer_store import OfferStore
+from src.parsed_offer_cache import ParsedOfferCache
+from src.profiles import load_profiles
+from src.salary_stats import SalaryColumns, compute_salary_stats
+from src.utils import iterate, prepare_jinja_env, save_report, save_report_stream
 
 
-async def generate(output_file_name: str):
+async def generate(output_file_name: str, discovery: DiscoveryMode = DiscoveryMode.BOARD):
     language = ProgrammingLanguage.PYTHON
     include_skills = ["Python", "Docker"]
     location_criteria = [
@@ -20,16 +48,129 @@ async def generate(output_file_name: str):
             rule=LocationRule.AT_LEAST_ONE,
         ),
     ]
-    jjit_api_client = JJITAPIClient()
-    parser = JJITBoardParser(jjit_api_client)
+    offer_store = OfferStore(OFFER_STORE_PATH)
+    try:
+        with CRAWL_PHASE_SECONDS.time(phase="run"):
+            if discovery == DiscoveryMode.STORE:
+                jobs = offer_store.find_offers(location_criteria, include_skills, language)
+                await stream_report(iterate(jobs), output_file_name)
+            else:
+                async with open_parser(offer_store) as parser:
+                    if discovery == DiscoveryMode.SITEMAP:
+                        crawl_index = CrawlIndex(CRAWL_INDEX_PATH)
+                        try:
+                            offers = parser.iter_offers_in_sitemap(
+                                SITEMAP_PATH, crawl_index, location_criteria, language
+                            )
+                            await stream_report(offers, output_file_name)
+                        finally:
+                            crawl_index.close()
+                    else:
+                        await stream_report(
+                            parser.iter_offers(include_skills, location_criteria, language), output_file_name
+                        )
+        offer_store.mark_reported(output_file_name)
+    finally:
+        offer_store.close()
+    print_metrics_summary()
 
-    jobs = await parser.find_offers(include_skills, location_criteria, language)
-    template = prepare_jinja_env("report.html")
-    report = template.render(jobs=jobs, report_date=datetime.now().strftime("%B %d, %Y"))
+
+async def generate_batch(
+    profiles_path: Path, discovery: DiscoveryMode = DiscoveryMode.BOARD, archive: bool = ARCHIVE_CRAWLS
+):
+    """
+    One report per profile, offers shared between the profiles are fetched and parsed once. With
+    `DiscoveryMode.STORE` the reports are generated from the offer store, without crawling.
+    """
+    profiles = load_profiles(profiles_path)
+    offer_store = OfferStore(OFFER_STORE_PATH)
+    try:
+        with CRAWL_PHASE_SECONDS.time(phase="run"):
+            if discovery == DiscoveryMode.STORE:
+                jobs_per_profile = {
+                    p.name: offer_store.find_offers(p.location_criteria, p.include_skills, p.language) for p in profiles
+                }
+            else:
+                async with open_parser(offer_store, archive=archive) as parser:
+                    jobs_per_profile = await parser.find_offers_for_profiles(profiles)
+
+        for profile in profiles:
+            render_report(jobs_per_profile[profile.name], profile.report_file_name)
+            offer_store.mark_reported(profile.report_file_name)
+    finally:
+        offer_store.close()
+    print_metrics_summary()
+
+
+@contextlib.asynccontextmanager
+async def open_parser(
+    offer_store: OfferStore | None = None, offer_index: OfferIndex | None = None, archive: bool = ARCHIVE_CRAWLS
+) -> typing.AsyncIterator[JJITBoardParser]:
+    cache = LRUCacheManager(
+        capacity=OFFERS_CACHE_CAPACITY,
+        ttl=OFFERS_CACHE_TTL,
+        ttl_jitter=OFFERS_CACHE_TTL_JITTER,
+        storage=SQLiteCacheStorage(OFFERS_CACHE_PATH, max_bytes=OFFERS_CACHE_MAX_BYTES),
+        max_bytes=OFFERS_CACHE_MEMORY_MAX_BYTES,
+    )
+    parsed_offer_cache = ParsedOfferCache(PARSED_OFFERS_CACHE_PATH, JJITBoardParser.PARSER_VERSION)
+    crawl_archive = CrawlArchive(CRAWL_ARCHIVE_PATH) if archive else None
+    try:
+        async with JJITAPIClient(cache=cache, archive=crawl_archive) as jjit_api_client:
+            parser = JJITBoardParser(
+                jjit_api_client, parsed_offer_cache=parsed_offer_cache, offer_store=offer_store, offer_index=offer_index
+            )
+            try:
+                yield parser
+            finally:
+                parser.close()
+    finally:
+        if crawl_archive is not None:
+            crawl_archive.close()
+        parsed_offer_cache.close()
+        cache.close()
+
+
+def render_report(jobs: list[JobOffer], output_file_name: str) -> None:
+    with CRAWL_PHASE_SECONDS.time(phase="report"):
+        template = prepare_jinja_env("report.html")
+        report = template.render(
+            jobs=jobs, salary_stats=compute_salary_stats(jobs), report_date=datetime.now().strftime("%B %d, %Y")
+        )
 
     save_report(report, output_file_name)
     print(f"Report saved as {output_file_name}")
 
 
+async def stream_report(jobs: typing.AsyncIterable[JobOffer], output_file_name: str) -> None:
+    """
+    Offers are rendered straight from the iterator, the report never has all of them in memory. Only the columns read
+    by the salary statistics, which close the report, are kept.
+    """
+    rendered_jobs: list[SalaryColumns] = []
+
+    async def keep_rendered() -> typing.AsyncIterator[JobOffer]:
+        async for job in jobs:
+            rendered_jobs.append(SalaryColumns.of(job))
+            yield job
+
+    template = prepare_jinja_env("report_stream.html", enable_async=True)
+    chunks = template.generate_async(
+        jobs=keep_rendered(),
+        salary_stats=lambda: compute_salary_stats(rendered_jobs),
+        report_date=datetime.now().strftime("%B %d, %Y"),
+    )
+
+    await save_report_stream(chunks, output_file_name)
+    print(f"Report saved as {output_file_name}")
+
+
+def print_metrics_summary() -> None:
+    print(json.dumps(REGISTRY.summary(), indent=2))
+
+
 if __name__ == "__main__":
-    asyncio.run(generate("jobs_report.html"), debug=True)
+    if len(sys.argv) > 1:
+        asyncio.run(generate_batch(Path(sys.argv[1])), debug=True)
+    else:
+        asyncio.run(generate("jobs_report.html"), debug=True)
@@ -1,79 +1,341 @@
 import asyncio
 import random
+import time
+import types
 import typing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
 
 import aiohttp
-import fake_useragent
 from aiohttp.client_exceptions import ClientError, ServerDisconnectedError
-from tenacity import AsyncRetrying, RetryError, retry_if_exception_type, stop_after_attempt, wait_exponential
+from pydantic import ValidationError
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    RetryError,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 from yarl import URL
 
+from src.constants import (
+    CONNECTION_LIMIT,
+    CONNECTION_LIMIT_PER_HOST,
+    DNS_CACHE_TTL,
+    JJIT_BASE_URL,
+    KEEPALIVE_TIMEOUT,
+    MAX_PENDING_RESPONSES,
+    RATE_LIMIT_FAST_RESPONSE,
+    RATE_LIMIT_INITIAL_CONCURRENCY,
+    RATE_LIMIT_INITIAL_RATE,
+    RATE_LIMIT_MAX_CONCURRENCY,
+    RATE_LIMIT_MAX_RATE,
+    RETRY_AFTER_MAX_WAIT,
+    USER_AGENTS_PATH,
+    USER_AGENTS_POOL_SIZE,
+)
+from src.crawl_archive import CrawlArchive
+from src.custom_cache import LRUCacheEntry, LRUCacheManager
 from src.exceptions import APIError, RetryableAPIError
-from src.models import ProgrammingLanguage, WebsiteErrorResponse, WebsiteOkResponse
+from src.metrics import (
+    CRAWL_PHASE_SECONDS,
+    HTTP_CONNECTIONS_TOTAL,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_RESPONSES_TOTAL,
+    HTTP_RETRIES_TOTAL,
+    OFFER_FETCHES_TOTAL,
+)
+from src.models import (
+    JJITOffersPage,
+    ProgrammingLanguage,
+    WebsiteErrorResponse,
+    WebsiteNotModifiedResponse,
+    WebsiteOkResponse,
+)
+from src.rate_limiter import THROTTLING_STATUS_CODES, AdaptiveRateLimiter, parse_retry_after
+from src.utils import iterate
 
 RETRYABLE_ERROR_CODES = (408, 429, 502, 503, 504, 500)
 
 
+@dataclass(frozen=True, slots=True)
+class ConnectionPoolStats:
+    open_connections: int
+    idle_connections: int
+    created_connections: int
+    reused_connections: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        requests_count = self.created_connections + self.reused_connections
+        return self.reused_connections / requests_count if requests_count else 0.0
+
+
 class JJITAPIClient:
-    def __init__(self):
+    """
+    Owns a single connection pool shared by all requests, use as `async with JJITAPIClient() as client: ...`.
+    """
+
+    def __init__(
+        self,
+        cache: LRUCacheManager | None = None,
+        base_url: URL = JJIT_BASE_URL,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        archive: CrawlArchive | None = None,
+        user_agent: str | None = None,
+    ):
+        self._cache = cache
+        self._archive = archive
+        self.base_url = base_url
+        self._session: aiohttp.ClientSession | None = None
+        self._created_connections = 0
+        self._reused_connections = 0
         self._retry_scheme = AsyncRetrying(
             stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=2, min=2, max=8),
+            wait=_wait_retry_after_or(wait_exponential(multiplier=2, min=2, max=8)),
             retry=retry_if_exception_type((RetryableAPIError, ClientError, ServerDisconnectedError)),
+            before_sleep=_record_retry,
+        )
+        self._rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            initial_rate=RATE_LIMIT_INITIAL_RATE,
+            max_rate=RATE_LIMIT_MAX_RATE,
+            initial_concurrency=RATE_LIMIT_INITIAL_CONCURRENCY,
+            max_concurrency=RATE_LIMIT_MAX_CONCURRENCY,
+            fast_response_threshold=RATE_LIMIT_FAST_RESPONSE,
         )
-        self._semaphore = asyncio.Semaphore(3)
         self._session_headers = {
-            "User-Agent": fake_useragent.UserAgent().random,
+            "User-Agent": user_agent or random.choice(load_user_agents(USER_AGENTS_PATH)),
             "Accept": "*/*",
             "Accept-Encoding": "gzip, deflate, br, zstd",
             "Accept-Language": "en-US,en;q=0.9",
             "Content-Type": "text/plain;charset=UTF-8",
-            "Referer": "https://justjoin.it/",
+            "Referer": str(base_url.with_path("/")),
         }
 
-    async def fetch_multiple_urls(self, urls: list[URL]) -> typing.AsyncGenerator[WebsiteOkResponse]:
-        async with aiohttp.ClientSession(headers=self._session_headers) as session:
-            tasks = [asyncio.create_task(self._request_with_retry(session, url, random.uniform(1, 3))) for url in urls]
-            async for t in asyncio.as_completed(tasks):
-                result = await t
-                if isinstance(result, WebsiteOkResponse):
-                    yield result
-                else:
-                    print(f"There was error in response: {result}")
+    async def __aenter__(self) -> "JJITAPIClient":
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_request_end.append(self._on_request_end)
+        self._session = aiohttp.ClientSession(
+            headers=self._session_headers,
+            connector=aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            ),
+            trace_configs=[trace_config],
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise APIError("Session is not open, use the client as an async context manager")
+        return self._session
+
+    def pool_stats(self) -> ConnectionPoolStats:
+        """
+        Also exported as `HTTP_CONNECTIONS_TOTAL` and `HTTP_POOL_CONNECTIONS`, the latter updated after every request.
+        """
+        connector = self.session.connector
+        # aiohttp doesn't expose the pool state publicly
+        idle_connections = sum(len(c) for c in getattr(connector, "_conns", {}).values())
+        acquired_connections = len(getattr(connector, "_acquired", ()))
+        return ConnectionPoolStats(
+            open_connections=idle_connections + acquired_connections,
+            idle_connections=idle_connections,
+            created_connections=self._created_connections,
+            reused_connections=self._reused_connections,
+        )
+
+    async def fetch_multiple_urls(
+        self, urls: typing.Iterable[URL] | typing.AsyncIterable[URL]
+    ) -> typing.AsyncGenerator[WebsiteOkResponse]:
+        """
+        Fresh offers found in the cache are yielded right away, expired ones are revalidated with a conditional
+        request and only the remaining ones are downloaded. URLs may keep arriving while earlier ones are fetched. At
+        most `MAX_PENDING_RESPONSES` offers are requested ahead of the consumer, so a slow consumer slows fetching down.
+        """
+        results: asyncio.Queue[WebsiteOkResponse | WebsiteErrorResponse | WebsiteNotModifiedResponse | None]
+        results = asyncio.Queue()
+        pending = asyncio.Semaphore(MAX_PENDING_RESPONSES)
+
+        async def request(url: URL, stale: LRUCacheEntry | None) -> None:
+            await results.put(await self._request_with_retry(url, stale))
+
+        async def schedule() -> None:
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    async for url in iterate(urls):
+                        await pending.acquire()
+                        cache_hit = self._cache.get(str(url)) if self._cache else None
+                        if cache_hit and not cache_hit.is_expired(datetime.now()):
+                            OFFER_FETCHES_TOTAL.inc(result="cache")
+                            await results.put(WebsiteOkResponse(html=cache_hit.html_content, url=url))
+                        else:
+                            tg.create_task(request(url, cache_hit if cache_hit and cache_hit.has_validators else None))
+            finally:
+                await results.put(None)
+
+        scheduler = asyncio.create_task(schedule())
+        try:
+            while (result := await results.get()) is not None:
+                try:
+                    if isinstance(result, WebsiteNotModifiedResponse):
+                        OFFER_FETCHES_TOTAL.inc(result="not_modified")
+                        if self._cache and (refreshed := self._cache.refresh(str(result.url))):
+                            yield WebsiteOkResponse(html=refreshed.html_content, url=result.url)
+                            continue
+                        # The cached entry was evicted while the request was in flight
+                        result = await self._request_with_retry(result.url)
+                    if isinstance(result, WebsiteOkResponse):
+                        OFFER_FETCHES_TOTAL.inc(result="downloaded")
+                        if self._cache:
+                            self._cache.put(str(result.url), result.html, result.etag, result.last_modified)
+                        if self._archive is not None:
+                            self._archive.append(result)
+                        yield result
+                    else:
+                        OFFER_FETCHES_TOTAL.inc(result="error")
+                        print(f"There was error in response: {result}")
+                finally:
+                    pending.release()
+            await scheduler
+        finally:
+            scheduler.cancel()
 
     async def fetch_base_board(self, language: ProgrammingLanguage, include_skills: list[str]) -> WebsiteOkResponse:
-        url = URL.build(
-            scheme="https",
-            host="justjoin.it",
-            path=f"/job-offers/all-locations/{language.lower()}",
-            query=_get_query_string_from_criteria(include_skills),
+        url = self.base_url.with_path(f"/job-offers/all-locations/{language.lower()}").with_query(
+            _get_query_string_from_criteria(include_skills)
         )
-        r = await self._fetch_single_url(url)
+        with CRAWL_PHASE_SECONDS.time(phase="board_first_page"):
+            r = await self._fetch_single_url(url, kind="board")
         if isinstance(r, WebsiteErrorResponse):
             raise APIError("Fetching the board was unsuccessful")
         return r
 
+    async def fetch_board_pages(
+        self, language: ProgrammingLanguage, include_skills: list[str], cursors: list[int], items_count: int
+    ) -> typing.AsyncGenerator[JJITOffersPage]:
+        """
+        Further pages of the board, requested concurrently from the JSON endpoint behind the infinite scroll. Pages are
+        yielded in the order they arrive, pages which fail or don't have the expected shape are skipped. The endpoint
+        parameters are inferred, the board itself embeds numeric category ids and a cursor in its query state.
+        """
+        started_at = time.perf_counter()
+        tasks = [
+            asyncio.create_task(
+                self._request_with_retry(
+                    self._build_board_page_url(language, include_skills, c, items_count), kind="board_page"
+                )
+            )
+            for c in cursors
+        ]
+        async for t in asyncio.as_completed(tasks):
+            result = await t
+            if isinstance(result, WebsiteOkResponse):
+                try:
+                    page = JJITOffersPage.model_validate_json(result.html)
+                except ValidationError as e:
+                    print(f"Board page {result.url} had different structure than expected: {e}")
+                    continue
+                yield page
+            else:
+                print(f"There was error in response: {result}")
+        CRAWL_PHASE_SECONDS.observe(time.perf_counter() - started_at, phase="board_pages")
+
+    def invalidate_cache(self, urls: list[URL]) -> None:
+        if self._cache:
+            for url in urls:
+                self._cache.invalidate(str(url))
+
+    def _build_board_page_url(
+        self, language: ProgrammingLanguage, include_skills: list[str], cursor: int, items_count: int
+    ) -> URL:
+        query = f"from={cursor}&itemsCount={items_count}&categories={language.lower()}"
+        if skills_query := _get_query_string_from_criteria(include_skills):
+            query = f"{query}&{skills_query}"
+        return self.base_url.with_path("/api/candidate-api/offers").with_query(query)
+
     def build_url_for_individual_offer(self, offer_path: str) -> URL:
-        return URL.build(scheme="https", host="justjoin.it", path=f"{offer_path}")
+        return self.base_url.with_path(offer_path)
+
+    async def _fetch_single_url(self, url: URL, kind: str = "offer") -> WebsiteErrorResponse | WebsiteOkResponse:
+        return await self._request_with_retry(url, kind=kind)  # type: ignore[return-value]
+
+    async def _on_connection_created(self, *_: typing.Any) -> None:
+        self._created_connections += 1
+        HTTP_CONNECTIONS_TOTAL.inc(event="created")
 
-    async def _fetch_single_url(self, url: URL) -> WebsiteErrorResponse | WebsiteOkResponse:
-        async with aiohttp.ClientSession(headers=self._session_headers) as session:
-            return await self._request_with_retry(session, url)
+    async def _on_connection_reused(self, *_: typing.Any) -> None:
+        self._reused_connections += 1
+        HTTP_CONNECTIONS_TOTAL.inc(event="reused")
+
+    async def _on_request_end(self, *_: typing.Any) -> None:
+        stats = self.pool_stats()
+        HTTP_POOL_CONNECTIONS.set(stats.idle_connections, state="idle")
+        HTTP_POOL_CONNECTIONS.set(stats.open_connections, state="open")
 
     async def _request_with_retry(
-        self, session: aiohttp.ClientSession, url: URL, sleep: float = 0
-    ) -> WebsiteErrorResponse | WebsiteOkResponse:
-        await asyncio.sleep(sleep)  # Simulate human behavior
+        self, url: URL, stale: LRUCacheEntry | None = None, kind: str = "offer"
+    ) -> WebsiteErrorResponse | WebsiteOkResponse | WebsiteNotModifiedResponse:
+        """
+        With a stale cache entry the request is conditional, and 304 means the cached response is still valid. `kind`
+        only labels the metrics.
+        """
+        headers = _get_conditional_headers(stale) if stale else {}
         try:
-            async for attempt in self._retry_scheme:
+            async for attempt in self._retry_scheme.copy():
                 with attempt:
-                    async with self._semaphore:
-                        async with session.get(url) as response:
-                            if response.ok:
-                                return WebsiteOkResponse(html=await response.text(), url=url)
+                    async with self._rate_limiter.acquire():
+                        started_at = time.monotonic()
+                        async with self.session.get(url, headers=headers) as response:
+                            html = await response.text() if response.ok else None
+                            latency = time.monotonic() - started_at
+                            HTTP_REQUEST_SECONDS.observe(latency, kind=kind)
+                            HTTP_RESPONSES_TOTAL.inc(kind=kind, status=response.status)
+                            if response.status == 304:
+                                self._rate_limiter.record_success(latency)
+                                return WebsiteNotModifiedResponse(url=url)
+                            if html is not None:
+                                self._rate_limiter.record_success(latency)
+                                return WebsiteOkResponse(
+                                    html=html,
+                                    url=url,
+                                    etag=response.headers.get("ETag"),
+                                    last_modified=response.headers.get("Last-Modified"),
+                                )
                             else:
                                 if response.status in RETRYABLE_ERROR_CODES:
-                                    raise RetryableAPIError(message="", status=response.status)
+                                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                                    if retry_after is not None and retry_after > RETRY_AFTER_MAX_WAIT:
+                                        # Neither this request nor the whole limiter should wait that long
+                                        if response.status in THROTTLING_STATUS_CODES:
+                                            self._rate_limiter.record_throttled()
+                                        return WebsiteErrorResponse(
+                                            status=response.status,
+                                            url=url,
+                                            msg=f"Retry-After of {retry_after:g}s is longer than allowed",
+                                        )
+                                    if response.status in THROTTLING_STATUS_CODES:
+                                        self._rate_limiter.record_throttled(retry_after)
+                                    raise RetryableAPIError(message="", status=response.status, retry_after=retry_after)
                                 else:
                                     return WebsiteErrorResponse(
                                         status=response.status,
@@ -82,12 +344,59 @@ class JJITAPIClient:
                                     )
 
         except RetryError as e:
-            status = exc.status if (exc := e.last_attempt.exception()) else None  # type: ignore[attr-defined]
+            status = getattr(e.last_attempt.exception(), "status", None)
             return WebsiteErrorResponse(status=status, url=url, msg="Number of retries exceeded")
 
         return WebsiteErrorResponse(msg="Unexpected retry exhaustion", status=None, url=url)
 
 
+def load_user_agents(path: Path, pool_size: int = USER_AGENTS_POOL_SIZE) -> list[str]:
+    """
+    The pool is drawn from fake_useragent on the first run and read from `path` afterwards, loading the browser
+    database of fake_useragent takes longer than the rest of the client setup. An empty file is drawn again.
+    """
+    if path.exists() and (user_agents := [line for line in path.read_text().splitlines() if line.strip()]):
+        return user_agents
+    import fake_useragent
+
+    user_agent = fake_useragent.UserAgent()
+    user_agents = list(dict.fromkeys(user_agent.random for _ in range(pool_size)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(user_agents))
+    return user_agents
+
+
+def _get_conditional_headers(stale: LRUCacheEntry) -> dict[str, str]:
+    headers = {}
+    if stale.etag:
+        headers["If-None-Match"] = stale.etag
+    if stale.last_modified:
+        headers["If-Modified-Since"] = stale.last_modified
+    return headers
+
+
+def _record_retry(retry_state: RetryCallState) -> None:
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    HTTP_RETRIES_TOTAL.inc(status=getattr(exc, "status", None) or type(exc).__name__)
+
+
+def _wait_retry_after_or(
+    fallback: typing.Callable[[RetryCallState], float],
+) -> typing.Callable[[RetryCallState], float]:
+    """
+    Wait as long as the server asked for in `Retry-After`, at most `RETRY_AFTER_MAX_WAIT` as longer waits are not
+    retried, otherwise use the fallback strategy.
+    """
+
+    def wait(retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, RetryableAPIError) and exc.retry_after is not None:
+            return exc.retry_after
+        return fallback(retry_state)
+
+    return wait
+
+
 def _get_query_string_from_criteria(include_skills: list[str]) -> str:
     skills_strings = []
     for skill in include_skills:
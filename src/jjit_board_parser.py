@@ -1,44 +1,379 @@
+import asyncio
+import contextlib
+import hashlib
 import json
+import math
+import multiprocessing
+import re
+import typing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 from bs4 import BeautifulSoup
 from pydantic import ValidationError
 from yarl import URL
 
-from src.constants import SINGLE_JOB_CLASS_NAME, SINGLE_JOB_TAG_NAME
-from src.criteria import LocationCriteria
+from src.constants import (
+    KNOWN_CITY_SLUGS,
+    PARSE_QUEUE_SIZE,
+    PARSE_WORKERS,
+    SINGLE_JOB_CLASS_NAME,
+    SINGLE_JOB_TAG_NAME,
+)
+from src.crawl_index import CrawlIndex
+from src.criteria import CompiledLocationCriteria, LocationCriteria
 from src.exceptions import JustJoinITOfferStructureError
 from src.jjit_api_client import JJITAPIClient
-from src.models import JJITOffer, JobOffer, ProgrammingLanguage, TechStackEntry, WebsiteOkResponse
+from src.metrics import CRAWL_PHASE_SECONDS, CRITERIA_EVAL_SECONDS, OFFER_PARSE_SECONDS, PARSED_OFFER_CACHE_TOTAL
+from src.models import (
+    JJITOffer,
+    JJITOfferLocation,
+    JobOffer,
+    OfferLocation,
+    ProgrammingLanguage,
+    TechStackEntry,
+    WebsiteOkResponse,
+)
+from src.offer_extractors import DEFAULT_PARSER_BACKEND, OfferNodes, OfferSelectors, ParserBackend, get_offer_extractor
+from src.offer_index import OfferIndex
+from src.offer_store import OfferStore
+from src.parsed_offer_cache import ParsedOfferCache, hash_html
+from src.profiles import Profile
+from src.sitemap import iter_sitemap_entries
+from src.utils import iterate
+
+BOARD_TOTAL_ITEMS_PATTERN = re.compile(r'\\?"totalItems\\?":(\d+)')
+BOARD_PAGE_SIZE_PATTERN = re.compile(r'\\?"pageParams\\?":\[\{\\?"from\\?":\d+,\\?"itemsCount\\?":(\d+)')
+PARSER_REVISION = 1  # bump on changes of the parsing logic, changes of the selectors are picked up automatically
+
+
+def _get_parser_version(revision: int, selectors: OfferSelectors) -> str:
+    return hashlib.blake2b(f"{revision}:{selectors}".encode(), digest_size=8).hexdigest()
 
 
 class JJITBoardParser:
     CLASS_NAME_EXTRA_DATA = "MuiStack-root mui-aa3a55"
     CLASS_NAME_TECHNOLOGIES = "MuiTypography-root MuiTypography-subtitle2 mui-p733mp"
     CLASS_NAME_LEVELS_OF_ADVANCEMENT = "MuiTypography-root MuiTypography-subtitle4 mui-1xcqefb"
+    SELECTORS = OfferSelectors(CLASS_NAME_EXTRA_DATA, CLASS_NAME_TECHNOLOGIES, CLASS_NAME_LEVELS_OF_ADVANCEMENT)
+    PARSER_VERSION = _get_parser_version(PARSER_REVISION, SELECTORS)
 
-    def __init__(self, api_client: JJITAPIClient):
+    def __init__(
+        self,
+        api_client: JJITAPIClient,
+        parser_backend: ParserBackend = DEFAULT_PARSER_BACKEND,
+        parse_workers: int = PARSE_WORKERS,
+        parsed_offer_cache: ParsedOfferCache | None = None,
+        offer_store: OfferStore | None = None,
+        offer_index: OfferIndex | None = None,
+    ):
         self.api_client = api_client
+        self.parsed_offer_cache = parsed_offer_cache
+        self.offer_store = offer_store
+        self.offer_index = offer_index
+        self.parser_backend = parser_backend
+        self.parse_workers = parse_workers
+        self._executor: ProcessPoolExecutor | None = None
 
     async def find_offers(
         self,
         include_skills: list[str],
         location_criteria: list[LocationCriteria],
         language: ProgrammingLanguage,
-    ) -> list[dict]:
-        board_response_text = await self.api_client.fetch_base_board(language, include_skills)
-        urls = self._extract_urls_to_individual_jobs(board_response_text)
-
-        # TODO: Cache
-        # TODO: Handle pagination
-        # TODO: Test server for 100s of requests
-
-        matched_offers = []
-        async for offer_response in self.api_client.fetch_multiple_urls(urls):
-            parsed = self._parse_offer(offer_response)
-            if parsed.matches_location_criteria(location_criteria):
-                matched_offers.append(parsed.as_dict())
+    ) -> list[JobOffer]:
+        return [offer async for offer in self.iter_offers(include_skills, location_criteria, language)]
+
+    def iter_offers(
+        self,
+        include_skills: list[str],
+        location_criteria: list[LocationCriteria],
+        language: ProgrammingLanguage,
+    ) -> typing.AsyncGenerator[JobOffer]:
+        """
+        Matching offers are yielded as soon as they are parsed, nothing is collected.
+        """
+        return self._iter_matching_offers(self._discover_board_urls(language, include_skills), location_criteria)
+
+    async def _discover_board_urls(
+        self, language: ProgrammingLanguage, include_skills: list[str]
+    ) -> typing.AsyncGenerator[URL]:
+        """
+        Offers from the first board page are yielded before the remaining pages are requested (all of them at once),
+        so offers can be downloaded while the rest of the board is still loading.
+        """
+        board_response = await self.api_client.fetch_base_board(language, include_skills)
+        seen_urls = set()
+        for url in self._extract_urls_to_individual_jobs(board_response):
+            if url not in seen_urls:
+                seen_urls.add(url)
+                yield url
+
+        total_items, page_size = self._extract_pagination(board_response)
+        if total_items <= page_size:
+            return
+        cursors = [page * page_size for page in range(1, math.ceil(total_items / page_size))]
+        async for page in self.api_client.fetch_board_pages(language, include_skills, cursors, page_size):
+            for listed_offer in page.data:
+                url = self.api_client.build_url_for_individual_offer(f"/job-offer/{listed_offer.slug}")
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    yield url
+
+    async def find_offers_in_sitemap(
+        self,
+        sitemap_path: Path,
+        crawl_index: CrawlIndex,
+        location_criteria: list[LocationCriteria],
+        language: ProgrammingLanguage | None = None,
+    ) -> list[JobOffer]:
+        return [
+            offer async for offer in self.iter_offers_in_sitemap(sitemap_path, crawl_index, location_criteria, language)
+        ]
+
+    async def iter_offers_in_sitemap(
+        self,
+        sitemap_path: Path,
+        crawl_index: CrawlIndex,
+        location_criteria: list[LocationCriteria],
+        language: ProgrammingLanguage | None = None,
+    ) -> typing.AsyncGenerator[JobOffer]:
+        """
+        Discover offers through the sitemap instead of the board. Only offers which are new or changed since the last
+        crawl are downloaded. Unchanged ones are taken from the parsed offer cache or the offer store. Those which the
+        location pre-filter rejected are skipped when their stored location still doesn't match, and downloaded only
+        when nothing is known of them.
+        """
+        delta = crawl_index.update(iter_sitemap_entries(sitemap_path))
+        self.api_client.invalidate_cache(delta.changed + delta.closed)
+        changed, unchanged = delta.changed, delta.unchanged
+        if language:
+            changed = [url for url in changed if language.matches_offer_url(url)]
+            unchanged = [url for url in unchanged if language.matches_offer_url(url)]
+
+        known_offers = self._get_known_offers(unchanged)
+        compiled_criteria = [c.compile() for c in location_criteria]
+        for offer in known_offers:
+            if self.offer_store:
+                self.offer_store.add(offer)
+            if offer.matches_location_criteria(compiled_criteria):
+                yield offer
+
+        known_urls = {offer.url for offer in known_offers}
+        unknown = [url for url in unchanged if url not in known_urls]
+        if self.offer_store:
+            rejected_urls = {
+                location.url
+                for location in self.offer_store.get_locations(unknown)
+                if not location.may_match_location_criteria(compiled_criteria)
+            }
+            unknown = [url for url in unknown if url not in rejected_urls]
+        urls = changed + unknown
+        async for offer in self._iter_matching_offers(urls, location_criteria, crawl_index):
+            yield offer
+
+    def _get_known_offers(self, urls: list[URL]) -> list[JobOffer]:
+        """
+        Offers parsed by earlier crawls. The parsed offer cache goes first, it only has offers parsed by the current
+        parser version.
+        """
+        offers = [offer for url in urls if (offer := self._get_cached_offer(url))]
+        if self.offer_store:
+            found = {offer.url for offer in offers}
+            offers += self.offer_store.get_offers([url for url in urls if url not in found])
+        return offers
+
+    def _get_cached_offer(self, url: URL) -> JobOffer | None:
+        return self.parsed_offer_cache.get_latest(url) if self.parsed_offer_cache else None
+
+    async def find_offers_for_profiles(
+        self, profiles: list[Profile], incremental: bool = False
+    ) -> dict[str, list[JobOffer]]:
+        """
+        Every offer is fetched and parsed once, no matter how many profiles it was found for, and then checked against
+        criteria of each of these profiles. Boards are discovered before fetching starts, so each offer knows all
+        profiles interested in it.
+
+        The board doesn't tell when an offer changed. With `incremental` only offers new on the boards are downloaded,
+        the ones parsed by earlier crawls are taken from the parsed offer cache or the offer store, and the ones which
+        the location pre-filter rejected are skipped while their stored location can't match any interested profile.
+        """
+        profiles_by_board: dict[tuple[ProgrammingLanguage, tuple[str, ...]], list[Profile]] = defaultdict(list)
+        for profile in profiles:
+            profiles_by_board[profile.board_key].append(profile)
+
+        boards_urls = await asyncio.gather(
+            *(
+                _collect(self._discover_board_urls(language, list(include_skills)))
+                for language, include_skills in profiles_by_board
+            )
+        )
+        profiles_by_url: dict[URL, list[Profile]] = defaultdict(list)
+        for board_profiles, urls in zip(profiles_by_board.values(), boards_urls, strict=True):
+            for url in urls:
+                profiles_by_url[url].extend(board_profiles)
+
+        compiled_criteria = {p.name: [c.compile() for c in p.location_criteria] for p in profiles}
+        matched_offers: dict[str, list[JobOffer]] = {p.name: [] for p in profiles}
+
+        def collect(offer: JobOffer) -> None:
+            for profile in profiles_by_url[offer.url]:
+                with CRITERIA_EVAL_SECONDS.time():
+                    matches = offer.matches_location_criteria(compiled_criteria[profile.name])
+                if matches:
+                    matched_offers[profile.name].append(offer)
+
+        urls = list(profiles_by_url)
+        if incremental:
+            known_offers = self._get_known_offers(urls)
+            for offer in known_offers:
+                if self.offer_store:
+                    self.offer_store.add(offer)
+                if self.offer_index is not None:
+                    self.offer_index.add(offer)
+                collect(offer)
+            known_urls = {offer.url for offer in known_offers}
+            urls = [url for url in urls if url not in known_urls]
+            if self.offer_store:
+                rejected_urls = {
+                    location.url
+                    for location in self.offer_store.get_locations(urls)
+                    if not any(
+                        location.may_match_location_criteria(compiled_criteria[p.name])
+                        for p in profiles_by_url[location.url]
+                    )
+                }
+                urls = [url for url in urls if url not in rejected_urls]
+
+        await self._parse_offers(urls, lambda url: [compiled_criteria[p.name] for p in profiles_by_url[url]], collect)
         return matched_offers
 
+    async def _iter_matching_offers(
+        self,
+        urls: typing.Iterable[URL] | typing.AsyncIterable[URL],
+        location_criteria: list[LocationCriteria],
+        crawl_index: CrawlIndex | None = None,
+    ) -> typing.AsyncGenerator[JobOffer]:
+        """
+        Parsing runs in the background and hands matching offers over one by one. Closing the generator early cancels
+        the parsing.
+        """
+        compiled_criteria = [c.compile() for c in location_criteria]
+        matched_offers: asyncio.Queue[JobOffer | None] = asyncio.Queue()
+
+        def collect(offer: JobOffer) -> None:
+            with CRITERIA_EVAL_SECONDS.time():
+                matches = offer.matches_location_criteria(compiled_criteria)
+            if matches:
+                matched_offers.put_nowait(offer)
+
+        parsing = asyncio.create_task(self._parse_offers(urls, lambda _: [compiled_criteria], collect, crawl_index))
+        parsing.add_done_callback(lambda _: matched_offers.put_nowait(None))
+        try:
+            while (offer := await matched_offers.get()) is not None:
+                yield offer
+            await parsing
+        finally:
+            if not parsing.done():
+                parsing.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await parsing
+
+    async def _parse_offers(
+        self,
+        urls: typing.Iterable[URL] | typing.AsyncIterable[URL],
+        get_criteria_sets: typing.Callable[[URL], list[list[CompiledLocationCriteria]]],
+        collect: typing.Callable[[JobOffer], None],
+        crawl_index: CrawlIndex | None = None,
+    ) -> None:
+        """
+        Responses go through a bounded queue to parsing workers, so downloading and parsing overlap and the fetching
+        slows down when parsing can't keep up. Offers are filtered as early as possible: by the city in the URL before
+        fetching, and by the location fields before the rest of the offer is parsed. An offer survives when it may
+        satisfy any of the criteria sets returned for its URL. What is known of the rejected ones goes to the offer
+        store. Pages which can't be parsed are skipped, and not marked as crawled, so the next crawl tries them again.
+        """
+        queue: asyncio.Queue[WebsiteOkResponse | None] = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+        consumers_count = max(self.parse_workers, 1)
+
+        def reject(location: OfferLocation) -> None:
+            if self.offer_store:
+                self.offer_store.add_location(location)
+
+        async def fetch() -> None:
+            try:
+                filtered_urls = _filter_urls(urls, get_criteria_sets, reject)
+                async for offer_response in self.api_client.fetch_multiple_urls(filtered_urls):
+                    await queue.put(offer_response)
+            finally:
+                for _ in range(consumers_count):
+                    await queue.put(None)
+
+        async def parse() -> None:
+            while (offer_response := await queue.get()) is not None:
+                try:
+                    parsed = await self._get_parsed_offer(offer_response, get_criteria_sets(offer_response.url))
+                except JustJoinITOfferStructureError as e:
+                    print(f"Offer page {offer_response.url} had different structure than expected: {e}")
+                    continue
+                if crawl_index:
+                    crawl_index.mark_crawled(offer_response.url)
+                if isinstance(parsed, OfferLocation):
+                    reject(parsed)
+                else:
+                    if self.offer_store:
+                        self.offer_store.add(parsed)
+                    if self.offer_index is not None:
+                        self.offer_index.add(parsed)
+                    collect(parsed)
+
+        with CRAWL_PHASE_SECONDS.time(phase="offers"):
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(fetch())
+                for _ in range(consumers_count):
+                    tg.create_task(parse())
+
+    async def _get_parsed_offer(
+        self, offer: WebsiteOkResponse, criteria_sets: list[list[CompiledLocationCriteria]]
+    ) -> JobOffer | OfferLocation:
+        """
+        Only the location of offers rejected by location criteria before being fully parsed.
+        """
+        if not self.parsed_offer_cache:
+            return await self._parse_offer_in_executor(offer, criteria_sets)
+        html_hash = hash_html(offer.html)
+        if cached := self.parsed_offer_cache.get(offer.url, html_hash):
+            PARSED_OFFER_CACHE_TOTAL.inc(result="hit")
+            return cached
+        PARSED_OFFER_CACHE_TOTAL.inc(result="miss")
+        parsed = await self._parse_offer_in_executor(offer, criteria_sets)
+        if isinstance(parsed, JobOffer):
+            self.parsed_offer_cache.put(offer.url, html_hash, parsed)
+        return parsed
+
+    async def _parse_offer_in_executor(
+        self, offer: WebsiteOkResponse, criteria_sets: list[list[CompiledLocationCriteria]]
+    ) -> JobOffer | OfferLocation:
+        """
+        Parse time is measured here, so with worker processes it includes sending the page to the worker.
+        """
+        if not self.parse_workers:
+            with OFFER_PARSE_SECONDS.time():
+                return _parse_offer_html(offer.html, offer.url, self.parser_backend, criteria_sets)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+        with OFFER_PARSE_SECONDS.time():
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, _parse_offer_html, offer.html, offer.url, self.parser_backend, criteria_sets
+            )
+
+    def close(self) -> None:
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
     def _extract_urls_to_individual_jobs(self, website_response: WebsiteOkResponse) -> list[URL]:
         board_soup = BeautifulSoup(website_response.html, features="html.parser")
         offers_tags = board_soup.find_all(SINGLE_JOB_TAG_NAME, {"class": SINGLE_JOB_CLASS_NAME})
@@ -48,42 +383,67 @@ class JJITBoardParser:
             if (job_offer_path := str(t.get("href")))
         ]
 
+    @staticmethod
+    def _extract_pagination(website_response: WebsiteOkResponse) -> tuple[int, int]:
+        """
+        Total number of offers on the board and the page size, read from the listing state embedded in the board page.
+        """
+        total_items = BOARD_TOTAL_ITEMS_PATTERN.search(website_response.html)
+        page_size = BOARD_PAGE_SIZE_PATTERN.search(website_response.html)
+        if not total_items or not page_size:
+            return 0, 0
+        return int(total_items.group(1)), int(page_size.group(1))
+
     @classmethod
-    def _parse_offer(cls, offer: WebsiteOkResponse) -> JobOffer:
-        offer_soup = BeautifulSoup(offer.html, features="html.parser")
-        offer_data = script_tag.text if (script_tag := offer_soup.find("script", type="application/ld+json")) else None
-        if not offer_data:
+    def _parse_offer(cls, offer: WebsiteOkResponse, backend: ParserBackend = DEFAULT_PARSER_BACKEND) -> JobOffer:
+        offer_nodes = get_offer_extractor(backend, cls.SELECTORS).extract(offer.html)
+        if not offer_nodes.ld_json:
             raise JustJoinITOfferStructureError("Tag containing necessary info not found")
         try:
-            offer_data_json = JJITOffer(**json.loads(offer_data))
+            offer_data_json = JJITOffer(**json.loads(offer_nodes.ld_json))
         except ValidationError as e:
             raise JustJoinITOfferStructureError("HTML file had different structure than expected") from e
 
-        seniority, remote_options = cls._get_offer_extra_data(offer_soup)
-        partial_offer = JobOffer(
-            title=title.text if (title := offer_soup.find("title")) else "",
+        seniority, remote_options = cls._get_offer_extra_data(offer_nodes)
+        salary = offer_data_json.salary
+        return JobOffer(
+            title=offer_nodes.title or "",
             text=offer_data_json.description,
             location_city=offer_data_json.location.address.city,
             location_country=offer_data_json.location.address.country,
             seniority=seniority,
             remote_options=remote_options,
-            tech_stack=cls._get_tech_stack(offer_soup),
+            tech_stack=cls._get_tech_stack(offer_nodes),
             url=offer.url,
+            salary_min=salary.value.min if salary else None,
+            salary_max=salary.value.max if salary else None,
+            salary_currency=salary.currency if salary else None,
+            salary_per=salary.value.per if salary else None,
         )
-        if offer_data_json.salary:
-            partial_offer.salary_min = offer_data_json.salary.value.min
-            partial_offer.salary_max = offer_data_json.salary.value.max
-            partial_offer.salary_currency = offer_data_json.salary.currency
-            partial_offer.salary_per = offer_data_json.salary.value.per
 
-        return partial_offer
+    @classmethod
+    def _parse_offer_location(
+        cls, offer: WebsiteOkResponse, backend: ParserBackend = DEFAULT_PARSER_BACKEND
+    ) -> tuple[str, str]:
+        """
+        Remote work options and city, without parsing the rest of the offer.
+        """
+        offer_nodes = get_offer_extractor(backend, cls.SELECTORS).extract_location(offer.html)
+        if not offer_nodes.ld_json:
+            raise JustJoinITOfferStructureError("Tag containing necessary info not found")
+        try:
+            offer_location = JJITOfferLocation(**json.loads(offer_nodes.ld_json))
+        except ValidationError as e:
+            raise JustJoinITOfferStructureError("HTML file had different structure than expected") from e
+        _, remote_options = cls._get_offer_extra_data(offer_nodes)
+        return remote_options, offer_location.location.address.city
 
     @classmethod
-    def _get_offer_extra_data(cls, offer_soup: BeautifulSoup) -> tuple[str, str]:
+    def _get_offer_extra_data(cls, offer_nodes: OfferNodes) -> tuple[str, str]:
         """
         Contract type, experience level, remote work options.
         """
-        extra_data = offer_soup.find_all("div", {"class": cls.CLASS_NAME_EXTRA_DATA})
+        extra_data = offer_nodes.extra_data
         if len(extra_data) != 4:
             raise JustJoinITOfferStructureError(
                 "Job offer does not contain all of the expected fields."
@@ -91,19 +451,74 @@ class JJITBoardParser:
                 f"Fields in the response: {extra_data}."
             )
         time, contract, seniority, remote_options = extra_data
-        return seniority.text, remote_options.text
+        return seniority, remote_options
 
     @classmethod
-    def _get_tech_stack(cls, offer_soup: BeautifulSoup) -> list[TechStackEntry]:
-        technologies = offer_soup.find_all("h4", {"class": cls.CLASS_NAME_TECHNOLOGIES})
-        levels_of_advancement = offer_soup.find_all("span", {"class": cls.CLASS_NAME_LEVELS_OF_ADVANCEMENT})
+    def _get_tech_stack(cls, offer_nodes: OfferNodes) -> tuple[TechStackEntry, ...]:
+        technologies = offer_nodes.technologies
+        levels_of_advancement = offer_nodes.levels_of_advancement
         if not technologies or not levels_of_advancement:
             raise JustJoinITOfferStructureError(
                 f"Tech stack data missing. Technologies: {technologies}, levels of advancement: {levels_of_advancement}"
             )
         if len(technologies) != len(levels_of_advancement):
             raise JustJoinITOfferStructureError("Length of technologies list and level of advancement differ.")
-        return [
-            TechStackEntry(technology=label.text, level_of_advancement=level.text)
+        return tuple(
+            TechStackEntry(technology=label, level_of_advancement=level)
             for label, level in zip(technologies, levels_of_advancement, strict=True)
-        ]
+        )
+
+
+def _parse_offer_html(
+    html: str,
+    url: URL,
+    backend: ParserBackend,
+    criteria_sets: list[list[CompiledLocationCriteria]] | None = None,
+) -> JobOffer | OfferLocation:
+    """
+    Entry point of the parsing worker processes, only the html travels to the worker and the parsed offer back.
+    Offers which don't satisfy any of the criteria sets are rejected after parsing just the location fields.
+    """
+    offer = WebsiteOkResponse(html=html, url=url)
+    if criteria_sets:
+        remote_options, city = JJITBoardParser._parse_offer_location(offer, backend)
+        if not any(all(c.is_satisfied(remote_options, city) for c in cs) for cs in criteria_sets):
+            return OfferLocation(url=url, location_city=city, remote_options=remote_options)
+    return JJITBoardParser._parse_offer(offer, backend)
+
+
+async def _filter_urls(
+    urls: typing.Iterable[URL] | typing.AsyncIterable[URL],
+    get_criteria_sets: typing.Callable[[URL], list[list[CompiledLocationCriteria]]],
+    reject: typing.Callable[[OfferLocation], None],
+) -> typing.AsyncIterator[URL]:
+    async for url in iterate(urls):
+        city = _get_city_in_url(url)
+        if city and _city_rules_out_offer(city, get_criteria_sets(url)):
+            reject(OfferLocation(url=url, location_city=city))
+        else:
+            yield url
+
+
+async def _collect[T](items: typing.AsyncIterable[T]) -> list[T]:
+    return [item async for item in items]
+
+
+def _url_rules_out_offer(url: URL, criteria_sets: list[list[CompiledLocationCriteria]]) -> bool:
+    city = _get_city_in_url(url)
+    return city is not None and _city_rules_out_offer(city, criteria_sets)
+
+
+def _get_city_in_url(url: URL) -> str | None:
+    """
+    Offer slugs usually end with the city and the category, e.g. `...-developer-warszawa-python`.
+    """
+    slug = f"{url.path}-"
+    cities = [c for c in KNOWN_CITY_SLUGS if f"-{c}-" in slug]
+    if not cities:
+        return None
+    return max(cities, key=lambda c: slug.rfind(f"-{c}-"))
+
+
+def _city_rules_out_offer(city: str, criteria_sets: list[list[CompiledLocationCriteria]]) -> bool:
+    return all(any(c.rules_out_city(city) for c in criteria) for criteria in criteria_sets)
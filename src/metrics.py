@@ -0,0 +1,222 @@
+import bisect
+import contextlib
+import math
+import time
+import typing
+from collections import defaultdict
+
+type Labels = tuple[tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # seconds
+FAST_OPERATION_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1)
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str | int) -> None:
+        self._values[_labels_key(labels)] += amount
+
+    def value(self, **labels: str | int) -> float:
+        return self._values.get(_labels_key(labels), 0.0)
+
+    def reset(self) -> None:
+        self._values.clear()
+
+    def summary(self) -> list[dict]:
+        return [{**dict(labels), "value": value} for labels, value in sorted(self._values.items())]
+
+    def to_prometheus(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+            *(f"{self.name}{_format_labels(labels)} {value:g}" for labels, value in sorted(self._values.items())),
+        ]
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: str | int) -> None:
+        self._values[_labels_key(labels)] = value
+
+    def value(self, **labels: str | int) -> float:
+        return self._values.get(_labels_key(labels), 0.0)
+
+    def reset(self) -> None:
+        self._values.clear()
+
+    def summary(self) -> list[dict]:
+        return [{**dict(labels), "value": value} for labels, value in sorted(self._values.items())]
+
+    def to_prometheus(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            *(f"{self.name}{_format_labels(labels)} {value:g}" for labels, value in sorted(self._values.items())),
+        ]
+
+
+class HistogramSeries:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimated by linear interpolation inside the bucket the quantile falls into, like Prometheus does.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series: dict[Labels, HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str | int) -> None:
+        key = _labels_key(labels)
+        if (series := self._series.get(key)) is None:
+            series = self._series[key] = HistogramSeries(self.buckets)
+        series.observe(value)
+
+    @contextlib.contextmanager
+    def time(self, **labels: str | int) -> typing.Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def series(self, **labels: str | int) -> HistogramSeries | None:
+        return self._series.get(_labels_key(labels))
+
+    def reset(self) -> None:
+        self._series.clear()
+
+    def summary(self) -> list[dict]:
+        return [
+            {
+                **dict(labels),
+                "count": series.count,
+                "sum": series.sum,
+                "min": series.min,
+                "max": series.max,
+                **{f"p{round(q * 100)}": series.quantile(q) for q in SUMMARY_QUANTILES},
+            }
+            for labels, series in sorted(self._series.items())
+        ]
+
+    def to_prometheus(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for upper_bound, bucket_count in zip((*self.buckets, math.inf), series.bucket_counts, strict=True):
+                cumulative += bucket_count
+                bucket_labels = (*labels, ("le", "+Inf" if upper_bound == math.inf else f"{upper_bound:g}"))
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series.sum:g}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of the process, summarized as JSON after a run or exported in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._register(Gauge(name, documentation))  # type: ignore[return-value]
+
+    def histogram(self, name: str, documentation: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))  # type: ignore[return-value]
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def summary(self) -> dict[str, list[dict]]:
+        return {name: summary for name, metric in self._metrics.items() if (summary := metric.summary())}
+
+    def to_prometheus(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.to_prometheus()) + "\n"
+
+    def _register(self, metric: Counter | Gauge | Histogram) -> Counter | Gauge | Histogram:
+        return self._metrics.setdefault(metric.name, metric)
+
+
+def _labels_key(labels: dict[str, str | int]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped, strict=True)) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+CRAWL_PHASE_SECONDS = REGISTRY.histogram(
+    "jobs_crawl_phase_seconds", "Wall time of crawl phases, phases are pipelined so they overlap"
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram("jobs_http_request_seconds", "Latency of single HTTP requests by kind")
+HTTP_RESPONSES_TOTAL = REGISTRY.counter("jobs_http_responses_total", "HTTP responses by kind and status code")
+HTTP_RETRIES_TOTAL = REGISTRY.counter("jobs_http_retries_total", "Retried requests by status code or error")
+HTTP_CONNECTIONS_TOTAL = REGISTRY.counter(
+    "jobs_http_connections_total", "Connections taken from the pool by whether they were created or reused"
+)
+HTTP_POOL_CONNECTIONS = REGISTRY.gauge(
+    "jobs_http_pool_connections", "Connections held by the pool after the last request, idle or open"
+)
+RATE_LIMITER_WAIT_SECONDS = REGISTRY.histogram(
+    "jobs_rate_limiter_wait_seconds", "Time requests waited for a concurrency slot and a token"
+)
+OFFER_FETCHES_TOTAL = REGISTRY.counter(
+    "jobs_offer_fetches_total", "Offers by how they were obtained: cache, not modified, downloaded or error"
+)
+OFFER_PARSE_SECONDS = REGISTRY.histogram("jobs_offer_parse_seconds", "Time to parse one offer page")
+PARSED_OFFER_CACHE_TOTAL = REGISTRY.counter("jobs_parsed_offer_cache_total", "Parsed offer cache lookups by result")
+CRITERIA_EVAL_SECONDS = REGISTRY.histogram(
+    "jobs_criteria_eval_seconds", "Time to check an offer against location criteria", FAST_OPERATION_BUCKETS
+)
+CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "jobs_cache_lookups_total", "Response cache lookups: memory hits, storage hits and misses"
+)
+CACHE_EVICTIONS_TOTAL = REGISTRY.counter("jobs_cache_evictions_total", "Response cache entries evicted by layer")
@@ -1,15 +1,41 @@
-from .domain import JobOffer, ProgrammingLanguage, TechStackEntry, WebsiteErrorResponse, WebsiteOkResponse
-from .jjit_responses import JJITAddress, JJITLocation, JJITOffer, JJITSalary, JJITSalaryValue
+from .domain import (
+    DiscoveryMode,
+    JobOffer,
+    OfferLocation,
+    ProgrammingLanguage,
+    TechStackEntry,
+    WebsiteErrorResponse,
+    WebsiteNotModifiedResponse,
+    WebsiteOkResponse,
+)
+from .jjit_responses import (
+    JJITAddress,
+    JJITListedOffer,
+    JJITLocation,
+    JJITOffer,
+    JJITOfferLocation,
+    JJITOffersPage,
+    JJITOffersPageMeta,
+    JJITSalary,
+    JJITSalaryValue,
+)
 
 __all__ = [
+    "DiscoveryMode",
     "TechStackEntry",
     "WebsiteErrorResponse",
+    "WebsiteNotModifiedResponse",
     "WebsiteOkResponse",
     "ProgrammingLanguage",
     "JobOffer",
+    "OfferLocation",
     "JJITAddress",
+    "JJITListedOffer",
     "JJITLocation",
     "JJITOffer",
+    "JJITOfferLocation",
+    "JJITOffersPage",
+    "JJITOffersPageMeta",
     "JJITSalary",
     "JJITSalaryValue",
 ]
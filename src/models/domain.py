@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+import re
+import sys
+from dataclasses import dataclass, fields
 from enum import StrEnum
 
 from yarl import URL
 
-from src.criteria import LocationCriteria
+from src.criteria import CompiledLocationCriteria, LocationCriteria
+
+OFFER_ID_LENGTH = 8
+OFFER_ID_PATTERN = f"[0-9a-f]{{{OFFER_ID_LENGTH}}}"
 
 
 class ProgrammingLanguage(StrEnum):
@@ -12,6 +17,24 @@ class ProgrammingLanguage(StrEnum):
     ANALYTICS = "analytics"
     GO = "go"
 
+    def matches_offer_url(self, url: URL) -> bool:
+        """
+        Offer slugs end with the category of the offer, optionally followed by an id: `...-warszawa-python-1094e224`.
+        """
+        return re.search(rf"-{re.escape(self.value)}(-{OFFER_ID_PATTERN})?$", url.path) is not None
+
+    def offer_url_sql_patterns(self) -> tuple[str, str]:
+        """
+        `LIKE` and `GLOB` patterns matching the same URLs as `matches_offer_url`.
+        """
+        return f"%-{self.value}", f"*-{self.value}-{'[0-9a-f]' * OFFER_ID_LENGTH}"
+
+
+class DiscoveryMode(StrEnum):
+    BOARD = "board"
+    SITEMAP = "sitemap"
+    STORE = "store"  # offers saved by previous runs, nothing is crawled
+
 
 @dataclass(frozen=True, slots=True)
 class TechStackEntry:
@@ -25,10 +48,21 @@ class TechStackEntry:
         }
 
 
+# one instance of every distinct entry, they are few and repeat across offers
+_TECH_STACK_ENTRIES: dict[TechStackEntry, TechStackEntry] = {}
+
+
 @dataclass(frozen=True, slots=True)
 class WebsiteOkResponse:
     html: str
     url: URL
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class WebsiteNotModifiedResponse:
+    url: URL
 
 
 @dataclass(frozen=True, slots=True)
@@ -38,11 +72,33 @@ class WebsiteErrorResponse:
     status: int | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class OfferLocation:
+    """
+    What is known of an offer rejected by the location pre-filter. `remote_options` is None when the offer was ruled
+    out by the city in its URL, `location_city` is then the city slug.
+    """
+
+    url: URL
+    location_city: str
+    remote_options: str | None = None
+
+    def may_match_location_criteria(self, location_criteria: list[CompiledLocationCriteria]) -> bool:
+        if self.remote_options is None:
+            return not any(c.rules_out_city(self.location_city) for c in location_criteria)
+        return all(c.is_satisfied(self.remote_options, self.location_city) for c in location_criteria)
+
+
+@dataclass(slots=True)
 class JobOffer:
+    """
+    Offers are rendered into reports as they are, without conversion to dicts. Short strings which repeat across offers
+    (location, seniority, salary currency and period, tech stack entries) are shared between offers.
+    """
+
     title: str
     text: str
-    tech_stack: list[TechStackEntry]
+    tech_stack: tuple[TechStackEntry, ...]
     location_country: str
     location_city: str
     remote_options: str
@@ -53,7 +109,24 @@ class JobOffer:
     salary_currency: str | None = None
     salary_per: str | None = None
 
-    def matches_location_criteria(self, location_criteria: list[LocationCriteria]):
+    def __post_init__(self) -> None:
+        self.tech_stack = tuple(_TECH_STACK_ENTRIES.setdefault(entry, entry) for entry in self.tech_stack)
+        self.location_country = sys.intern(self.location_country)
+        self.location_city = sys.intern(self.location_city)
+        self.remote_options = sys.intern(self.remote_options)
+        self.seniority = sys.intern(self.seniority)
+        if self.salary_currency is not None:
+            self.salary_currency = sys.intern(self.salary_currency)
+        if self.salary_per is not None:
+            self.salary_per = sys.intern(self.salary_per)
+
+    def __reduce__(self) -> tuple:
+        """
+        Offers sent back by the parsing workers are built through `__init__`, so they share strings with other offers.
+        """
+        return JobOffer, tuple(getattr(self, f.name) for f in fields(self))
+
+    def matches_location_criteria(self, location_criteria: list[LocationCriteria] | list[CompiledLocationCriteria]):
         return all(c.is_satisfied(self.remote_options, self.location_city) for c in location_criteria)
 
     def as_dict(self) -> dict:
@@ -25,3 +25,24 @@ class JJITOffer(BaseModel):
     description: str
     salary: JJITSalary | None = Field(alias="baseSalary", default=None)
     location: JJITLocation = Field(alias="jobLocation")
+
+
+class JJITOfferLocation(BaseModel):
+    location: JJITLocation = Field(alias="jobLocation")
+
+
+class JJITListedOffer(BaseModel):
+    slug: str
+
+
+class JJITOffersPageMeta(BaseModel):
+    total_items: int = Field(alias="totalItems")
+
+
+class JJITOffersPage(BaseModel):
+    """
+    Page of the board listing, as served to the infinite scroll.
+    """
+
+    data: list[JJITListedOffer]
+    meta: JJITOffersPageMeta
@@ -0,0 +1,175 @@
+import typing
+from dataclasses import dataclass, field
+from enum import StrEnum
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+
+class ParserBackend(StrEnum):
+    BEAUTIFUL_SOUP = "beautifulsoup"
+    TARGETED = "targeted"
+
+
+DEFAULT_PARSER_BACKEND = ParserBackend.TARGETED
+
+
+@dataclass(frozen=True, slots=True)
+class OfferSelectors:
+    extra_data_class: str
+    technologies_class: str
+    levels_of_advancement_class: str
+
+
+@dataclass(slots=True)
+class OfferNodes:
+    """
+    Texts of the only nodes of the offer page which are needed to build `JobOffer`.
+    """
+
+    title: str | None = None
+    ld_json: str | None = None
+    extra_data: list[str] = field(default_factory=list)
+    technologies: list[str] = field(default_factory=list)
+    levels_of_advancement: list[str] = field(default_factory=list)
+
+
+class OfferExtractor(typing.Protocol):
+    def extract(self, html: str) -> OfferNodes: ...
+
+    def extract_location(self, html: str) -> OfferNodes:
+        """
+        Only the nodes needed to check location criteria: ld+json and the extra data.
+        """
+        ...
+
+
+class BeautifulSoupExtractor:
+    """
+    Builds the full document tree, slow but forgiving.
+    """
+
+    def __init__(self, selectors: OfferSelectors):
+        self.selectors = selectors
+
+    def extract(self, html: str) -> OfferNodes:
+        offer_soup = BeautifulSoup(html, features="html.parser")
+        return OfferNodes(
+            title=title.text if (title := offer_soup.find("title")) else None,
+            ld_json=script.text if (script := offer_soup.find("script", type="application/ld+json")) else None,
+            extra_data=[t.text for t in offer_soup.find_all("div", {"class": self.selectors.extra_data_class})],
+            technologies=[t.text for t in offer_soup.find_all("h4", {"class": self.selectors.technologies_class})],
+            levels_of_advancement=[
+                t.text for t in offer_soup.find_all("span", {"class": self.selectors.levels_of_advancement_class})
+            ],
+        )
+
+    def extract_location(self, html: str) -> OfferNodes:
+        return self.extract(html)
+
+
+class TargetedExtractor:
+    """
+    Collects texts of the needed nodes while tokenizing, without building a tree. Stops at the first script after the
+    tech stack, the rest of the page is Next.js payload.
+    """
+
+    def __init__(self, selectors: OfferSelectors):
+        self.selectors = selectors
+
+    def extract(self, html: str) -> OfferNodes:
+        return self._extract(html, location_only=False)
+
+    def extract_location(self, html: str) -> OfferNodes:
+        return self._extract(html, location_only=True)
+
+    def _extract(self, html: str, location_only: bool) -> OfferNodes:
+        parser = _TargetedHTMLParser(self.selectors, location_only)
+        try:
+            parser.feed(html)
+            parser.close()
+        except _AllNodesFoundError:
+            pass
+        return parser.nodes
+
+
+class _AllNodesFoundError(Exception): ...
+
+
+@dataclass(slots=True)
+class _Capture:
+    tag: str
+    target: list[str]
+    chunks: list[str] = field(default_factory=list)
+    depth: int = 1  # number of open tags with the same name, the capture ends when it drops to 0
+
+
+class _TargetedHTMLParser(HTMLParser):
+    def __init__(self, selectors: OfferSelectors, location_only: bool = False):
+        super().__init__()
+        self.nodes = OfferNodes()
+        self._location_only = location_only
+        self._captures: list[_Capture] = []
+        self._title: list[str] = []
+        self._ld_json: list[str] = []
+        self._targets = {
+            ("div", selectors.extra_data_class): self.nodes.extra_data,
+            ("h4", selectors.technologies_class): self.nodes.technologies,
+            ("span", selectors.levels_of_advancement_class): self.nodes.levels_of_advancement,
+        }
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._location_only and self._has_location_nodes():
+            raise _AllNodesFoundError
+        for capture in self._captures:
+            if capture.tag == tag:
+                capture.depth += 1
+
+        if tag == "script":
+            if self._has_all_nodes():
+                raise _AllNodesFoundError
+            if self.nodes.ld_json is None and ("type", "application/ld+json") in attrs:
+                self._captures.append(_Capture(tag, self._ld_json))
+        elif tag == "title" and self.nodes.title is None:
+            self._captures.append(_Capture(tag, self._title))
+        elif (target := self._targets.get((tag, dict(attrs).get("class") or ""))) is not None:
+            self._captures.append(_Capture(tag, target))
+
+    def handle_endtag(self, tag: str) -> None:
+        for capture in list(self._captures):
+            if capture.tag != tag:
+                continue
+            capture.depth -= 1
+            if capture.depth == 0:
+                self._captures.remove(capture)
+                self._finish(capture)
+
+    def handle_data(self, data: str) -> None:
+        for capture in self._captures:
+            capture.chunks.append(data)
+
+    def _finish(self, capture: _Capture) -> None:
+        text = "".join(capture.chunks)
+        if capture.target is self._title:
+            self.nodes.title = text
+        elif capture.target is self._ld_json:
+            self.nodes.ld_json = text
+        else:
+            capture.target.append(text)
+
+    def _has_location_nodes(self) -> bool:
+        return not self._captures and self.nodes.ld_json is not None and len(self.nodes.extra_data) == 4
+
+    def _has_all_nodes(self) -> bool:
+        return (
+            self._has_location_nodes()
+            and self.nodes.title is not None
+            and len(self.nodes.technologies) > 0
+            and len(self.nodes.technologies) == len(self.nodes.levels_of_advancement)
+        )
+
+
+def get_offer_extractor(backend: ParserBackend, selectors: OfferSelectors) -> OfferExtractor:
+    if backend == ParserBackend.BEAUTIFUL_SOUP:
+        return BeautifulSoupExtractor(selectors)
+    return TargetedExtractor(selectors)
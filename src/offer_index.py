@@ -0,0 +1,118 @@
+import re
+from collections import defaultdict
+
+from yarl import URL
+
+from src.criteria import normalize_word
+from src.models import JobOffer
+
+TOKEN_PATTERN = re.compile(r"[\w+#.\-]+")  # keeps "c++", "c#", "node.js" and "ci-cd" whole
+TOKEN_PUNCTUATION = ".-"  # stripped from both ends of a token, e.g. "end." -> "end"
+LEVEL_OF_ADVANCEMENT_RANKS = {
+    "nice to have": 1,
+    "junior": 2,
+    "regular": 3,
+    "advanced": 4,
+    "master": 5,
+    "expert": 5,
+    # language requirements
+    "a1": 2,
+    "a2": 2,
+    "b1": 3,
+    "b2": 3,
+    "c1": 4,
+    "c2": 5,
+    "native": 5,
+}
+
+
+class OfferIndex:
+    """
+    Inverted index over offers held in memory: description and title tokens, technologies, and technologies by the
+    lowest level of advancement they satisfy (an offer requiring "advanced" is listed under each level up to it).
+    Posting lists are sets of offer ids, so queries are set intersections which start from the shortest list.
+    """
+
+    def __init__(self) -> None:
+        self._offers: list[JobOffer | None] = []
+        self._offer_ids: dict[URL, int] = {}
+        self._tokens: dict[str, set[int]] = defaultdict(set)
+        self._technologies: dict[str, set[int]] = defaultdict(set)
+        self._technologies_by_min_level: dict[tuple[str, int], set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._offer_ids)
+
+    def add(self, offer: JobOffer) -> None:
+        """
+        An offer added again replaces its previous version.
+        """
+        if (offer_id := self._offer_ids.get(offer.url)) is not None:
+            self._update_postings(offer_id, self._offers[offer_id], discard=True)  # type: ignore[arg-type]
+            self._offers[offer_id] = offer
+        else:
+            offer_id = self._offer_ids[offer.url] = len(self._offers)
+            self._offers.append(offer)
+        self._update_postings(offer_id, offer)
+
+    def remove(self, url: URL) -> None:
+        if (offer_id := self._offer_ids.pop(url, None)) is not None:
+            self._update_postings(offer_id, self._offers[offer_id], discard=True)  # type: ignore[arg-type]
+            self._offers[offer_id] = None
+
+    def search(
+        self,
+        keywords: list[str] | None = None,
+        all_technologies: list[str] | None = None,
+        any_technologies: list[str] | None = None,
+        min_level: str | None = None,
+    ) -> list[JobOffer]:
+        """
+        Offers mentioning every keyword, requiring every technology of `all_technologies` and at least one of
+        `any_technologies`. With `min_level` the technologies count only when required at least at this level.
+        Keywords and technologies are matched regardless of case and diacritics.
+        """
+        min_rank = LEVEL_OF_ADVANCEMENT_RANKS[min_level.casefold()] if min_level else None
+        required: list[set[int]] = [self._tokens.get(token, set()) for k in keywords or [] for token in tokenize(k)]
+        required.extend(self._technology_postings(t, min_rank) for t in all_technologies or [])
+        if any_technologies:
+            required.append(set().union(*(self._technology_postings(t, min_rank) for t in any_technologies)))
+        if not required:
+            return [offer for offer in self._offers if offer is not None]
+
+        required.sort(key=len)
+        if not required[0]:
+            return []
+        offer_ids = required[0].intersection(*required[1:])
+        return [self._offers[offer_id] for offer_id in sorted(offer_ids)]  # type: ignore[misc]
+
+    def _technology_postings(self, technology: str, min_rank: int | None) -> set[int]:
+        technology = normalize_word(technology)
+        if min_rank is None:
+            return self._technologies.get(technology, set())
+        return self._technologies_by_min_level.get((technology, min_rank), set())
+
+    def _update_postings(self, offer_id: int, offer: JobOffer, discard: bool = False) -> None:
+        postings = [
+            *(self._tokens[token] for token in tokenize(f"{offer.title} {offer.text}")),
+            *(self._technologies[normalize_word(t.technology)] for t in offer.tech_stack),
+            *(
+                self._technologies_by_min_level[normalize_word(t.technology), min_rank]
+                for t in offer.tech_stack
+                for min_rank in range(1, LEVEL_OF_ADVANCEMENT_RANKS.get(t.level_of_advancement.casefold(), 0) + 1)
+            ),
+        ]
+        for posting in postings:
+            if discard:
+                posting.discard(offer_id)
+            else:
+                posting.add(offer_id)
+
+
+def tokenize(text: str) -> set[str]:
+    """
+    Only the distinct tokens which aren't plain ASCII need normalizing.
+    """
+    tokens = {t.strip(TOKEN_PUNCTUATION) for t in set(TOKEN_PATTERN.findall(text.casefold()))}
+    tokens.discard("")
+    return {t if t.isascii() else normalize_word(t) for t in tokens}
@@ -0,0 +1,315 @@
+import json
+import sqlite3
+import typing
+from datetime import datetime
+from pathlib import Path
+
+from yarl import URL
+
+from src.constants import OFFER_LOCATION_MAX_AGE, OFFER_STORE_BATCH_SIZE
+from src.criteria import CompiledLocationCriteria, LocationCriteria
+from src.exceptions import IncompleteOfferStoreError
+from src.models import JobOffer, OfferLocation, ProgrammingLanguage, TechStackEntry
+
+OFFER_COLUMNS = (
+    "url",
+    "title",
+    "text",
+    "location_country",
+    "location_city",
+    "remote_options",
+    "seniority",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "salary_per",
+)
+
+
+class OfferStore:
+    """
+    Every parsed offer with the time it was first and last seen. Offers are buffered and written in batches, reports
+    can be generated from the store without crawling. Offers rejected by the location pre-filter of a crawl are kept
+    only with their location, queries which they may match are refused.
+    """
+
+    def __init__(self, path: Path, batch_size: int = OFFER_STORE_BATCH_SIZE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pending: list[tuple[JobOffer, datetime | None]] = []
+        self._pending_locations: list[OfferLocation] = []
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS offers (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                text TEXT NOT NULL,
+                location_country TEXT NOT NULL,
+                location_city TEXT NOT NULL,
+                remote_options TEXT NOT NULL,
+                seniority TEXT NOT NULL,
+                salary_min INTEGER,
+                salary_max INTEGER,
+                salary_currency TEXT,
+                salary_per TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS offer_technologies (
+                url TEXT NOT NULL REFERENCES offers (url) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                technology TEXT NOT NULL,
+                level_of_advancement TEXT NOT NULL,
+                PRIMARY KEY (url, position)
+            );
+            CREATE TABLE IF NOT EXISTS offer_locations (
+                url TEXT PRIMARY KEY,
+                location_city TEXT NOT NULL,
+                remote_options TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS reports (
+                name TEXT PRIMARY KEY,
+                generated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS offers_location ON offers (location_city, remote_options);
+            CREATE INDEX IF NOT EXISTS offers_remote_options ON offers (remote_options);
+            CREATE INDEX IF NOT EXISTS offers_seniority ON offers (seniority);
+            CREATE INDEX IF NOT EXISTS offers_salary ON offers (salary_max, salary_min);
+            CREATE INDEX IF NOT EXISTS offers_first_seen ON offers (first_seen);
+            CREATE INDEX IF NOT EXISTS offer_technologies_technology ON offer_technologies (technology COLLATE NOCASE);
+            """
+        )
+
+    def add(self, offer: JobOffer, seen_at: datetime | None = None) -> None:
+        """
+        `seen_at` of offers parsed from archived pages, by default the offer is seen when the batch is flushed.
+        """
+        self._pending.append((offer, seen_at))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_location(self, location: OfferLocation) -> None:
+        """
+        An offer rejected by the location pre-filter, ignored when the store has the parsed offer.
+        """
+        self._pending_locations.append(location)
+        if len(self._pending_locations) >= self.batch_size:
+            self.flush()
+
+    def flush(self, seen_at: datetime | None = None) -> None:
+        if not self._pending and not self._pending_locations:
+            return
+        seen_at_iso = (seen_at or datetime.now()).isoformat()
+        pending, self._pending = self._pending, []
+        locations, self._pending_locations = self._pending_locations, []
+        offers = [o for o, _ in pending]
+        seen = [(s.isoformat(),) * 2 if s else (seen_at_iso, seen_at_iso) for _, s in pending]
+        urls = [(str(o.url),) for o in offers]
+        with self._connection:
+            self._connection.executemany(
+                """
+                INSERT INTO offer_locations SELECT ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM offers WHERE url = ?)
+                ON CONFLICT (url) DO UPDATE
+                SET location_city = excluded.location_city, remote_options = excluded.remote_options,
+                    last_seen = excluded.last_seen
+                """,
+                ((*_location_row(location), seen_at_iso, seen_at_iso, str(location.url)) for location in locations),
+            )
+            self._connection.executemany(
+                f"""
+                INSERT INTO offers ({", ".join(OFFER_COLUMNS)}, first_seen, last_seen)
+                VALUES ({", ".join("?" * len(OFFER_COLUMNS))}, ?, ?)
+                ON CONFLICT (url) DO UPDATE
+                SET {", ".join(f"{c} = excluded.{c}" for c in OFFER_COLUMNS[1:])},
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen)
+                """,
+                ((*_offer_row(o), *offer_seen) for o, offer_seen in zip(offers, seen, strict=True)),
+            )
+            self._connection.executemany("DELETE FROM offer_technologies WHERE url = ?", urls)
+            self._connection.executemany(
+                "INSERT INTO offer_technologies VALUES (?, ?, ?, ?)",
+                (
+                    (str(o.url), position, t.technology, t.level_of_advancement)
+                    for o in offers
+                    for position, t in enumerate(o.tech_stack)
+                ),
+            )
+            self._connection.executemany("DELETE FROM offer_locations WHERE url = ?", urls)
+
+    def find_offers(
+        self,
+        location_criteria: list[LocationCriteria] | list[CompiledLocationCriteria] | None = None,
+        include_skills: list[str] | None = None,
+        language: ProgrammingLanguage | None = None,
+        seniority: str | None = None,
+        min_salary: int | None = None,
+        seen_since: datetime | None = None,
+        partial: bool = False,
+    ) -> list[JobOffer]:
+        """
+        Location criteria are fuzzy, so they are checked against the distinct (city, remote option) pairs in the store,
+        and only offers from the matching pairs are loaded. Offers have to list all `include_skills`.
+
+        Raises `IncompleteOfferStoreError` when offers which were only located may match the query, they have to be
+        crawled with criteria which accept them first. With `partial` only the parsed offers are returned instead.
+        """
+        self.flush()
+        if not partial and (unparsed := self._count_unparsed_matches(location_criteria, language, seen_since)):
+            raise IncompleteOfferStoreError(
+                f"{unparsed} offers which may match were rejected by the location criteria of earlier crawls and "
+                "are not in the store, crawl with these criteria first"
+            )
+        conditions: list[str] = []
+        parameters: list[str | int] = []
+        if location_criteria is not None:
+            locations = self._matching_locations(location_criteria)
+            if not locations:
+                return []
+            conditions.append(f"(location_city, remote_options) IN (VALUES {', '.join(['(?, ?)'] * len(locations))})")
+            parameters.extend(value for location in locations for value in location)
+        for skill in include_skills or []:
+            conditions.append("url IN (SELECT url FROM offer_technologies WHERE technology = ? COLLATE NOCASE)")
+            parameters.append(skill)
+        if language is not None:
+            conditions.append("(url LIKE ? OR url GLOB ?)")
+            parameters.extend(language.offer_url_sql_patterns())
+        if seniority is not None:
+            conditions.append("seniority = ?")
+            parameters.append(seniority)
+        if min_salary is not None:
+            conditions.append("salary_max >= ?")
+            parameters.append(min_salary)
+        if seen_since is not None:
+            conditions.append("first_seen > ?")
+            parameters.append(seen_since.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection.execute(
+            f"SELECT {', '.join(OFFER_COLUMNS)} FROM offers {where} ORDER BY first_seen, url", parameters
+        ).fetchall()
+        return self._build_offers(rows)
+
+    def get_offers(self, urls: list[URL]) -> list[JobOffer]:
+        self.flush()
+        rows = self._connection.execute(
+            f"SELECT {', '.join(OFFER_COLUMNS)} FROM offers WHERE url IN (SELECT value FROM json_each(?))",
+            (json.dumps([str(url) for url in urls]),),
+        ).fetchall()
+        return self._build_offers(rows)
+
+    def get_locations(self, urls: list[URL]) -> list[OfferLocation]:
+        self.flush()
+        rows = self._connection.execute(
+            """
+            SELECT url, location_city, remote_options FROM offer_locations
+            WHERE url IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps([str(url) for url in urls]),),
+        )
+        return [OfferLocation(URL(url), city, remote_options) for url, city, remote_options in rows]
+
+    def find_new_offers(self, report_name: str, **filters: typing.Any) -> list[JobOffer]:
+        """
+        Offers first seen after the report was last generated, all of them if it never was.
+        """
+        return self.find_offers(seen_since=self.last_report_time(report_name), **filters)
+
+    def last_report_time(self, report_name: str) -> datetime | None:
+        row = self._connection.execute("SELECT generated_at FROM reports WHERE name = ?", (report_name,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def mark_reported(self, report_name: str, generated_at: datetime | None = None) -> None:
+        self.flush()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?)",
+                (report_name, (generated_at or datetime.now()).isoformat()),
+            )
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def _matching_locations(
+        self, location_criteria: list[LocationCriteria] | list[CompiledLocationCriteria]
+    ) -> list[tuple[str, str]]:
+        compiled_criteria = [c.compile() if isinstance(c, LocationCriteria) else c for c in location_criteria]
+        return [
+            (city, remote_options)
+            for city, remote_options in self._connection.execute(
+                "SELECT DISTINCT location_city, remote_options FROM offers"
+            )
+            if all(c.is_satisfied(remote_options, city) for c in compiled_criteria)
+        ]
+
+    def _count_unparsed_matches(
+        self,
+        location_criteria: list[LocationCriteria] | list[CompiledLocationCriteria] | None,
+        language: ProgrammingLanguage | None,
+        seen_since: datetime | None,
+    ) -> int:
+        """
+        Locations not seen for `OFFER_LOCATION_MAX_AGE` are left out, so closed offers don't block queries forever.
+        """
+        conditions = ["last_seen > ?"]
+        parameters = [(datetime.now() - OFFER_LOCATION_MAX_AGE).isoformat()]
+        if language is not None:
+            conditions.append("(url LIKE ? OR url GLOB ?)")
+            parameters.extend(language.offer_url_sql_patterns())
+        if seen_since is not None:
+            conditions.append("first_seen > ?")
+            parameters.append(seen_since.isoformat())
+        rows = self._connection.execute(
+            f"SELECT url, location_city, remote_options FROM offer_locations WHERE {' AND '.join(conditions)}",
+            parameters,
+        ).fetchall()
+        if location_criteria is None:
+            return len(rows)
+        compiled_criteria = [c.compile() if isinstance(c, LocationCriteria) else c for c in location_criteria]
+        locations = (OfferLocation(URL(url), city, remote_options) for url, city, remote_options in rows)
+        return sum(location.may_match_location_criteria(compiled_criteria) for location in locations)
+
+    def _build_offers(self, rows: list[tuple]) -> list[JobOffer]:
+        tech_stacks: dict[str, list[TechStackEntry]] = {row[0]: [] for row in rows}
+        for url, technology, level_of_advancement in self._connection.execute(
+            """
+            SELECT url, technology, level_of_advancement FROM offer_technologies
+            WHERE url IN (SELECT value FROM json_each(?))
+            ORDER BY url, position
+            """,
+            (json.dumps(list(tech_stacks)),),
+        ):
+            tech_stacks[url].append(TechStackEntry(technology, level_of_advancement))
+        return [
+            JobOffer(
+                **dict(zip(OFFER_COLUMNS, row, strict=True))
+                | {"url": URL(row[0]), "tech_stack": tuple(tech_stacks[row[0]])}
+            )
+            for row in rows
+        ]
+
+
+def _offer_row(offer: JobOffer) -> tuple:
+    return (
+        str(offer.url),
+        offer.title,
+        offer.text,
+        offer.location_country,
+        offer.location_city,
+        offer.remote_options,
+        offer.seniority,
+        offer.salary_min,
+        offer.salary_max,
+        offer.salary_currency,
+        offer.salary_per,
+    )
+
+
+def _location_row(location: OfferLocation) -> tuple:
+    return str(location.url), location.location_city, location.remote_options
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+
+from yarl import URL
+
+from src.models import JobOffer, TechStackEntry
+
+
+class ParsedOfferCache:
+    """
+    Parsed offers keyed by URL and hash of the page they were parsed from. Entries written by a different parser
+    version are dropped on startup.
+    """
+
+    def __init__(self, path: Path, parser_version: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.parser_version = parser_version
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parsed_offers (
+                url TEXT PRIMARY KEY,
+                html_hash TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                offer TEXT NOT NULL
+            )
+            """
+        )
+        with self._connection:
+            self._connection.execute("DELETE FROM parsed_offers WHERE parser_version != ?", (parser_version,))
+
+    def get(self, url: URL, html_hash: str) -> JobOffer | None:
+        row = self._connection.execute(
+            "SELECT offer FROM parsed_offers WHERE url = ? AND html_hash = ? AND parser_version = ?",
+            (str(url), html_hash, self.parser_version),
+        ).fetchone()
+        return _deserialize_offer(row[0]) if row else None
+
+    def get_latest(self, url: URL) -> JobOffer | None:
+        """
+        The offer parsed from the latest page downloaded from `url`, whatever its hash.
+        """
+        row = self._connection.execute(
+            "SELECT offer FROM parsed_offers WHERE url = ? AND parser_version = ?", (str(url), self.parser_version)
+        ).fetchone()
+        return _deserialize_offer(row[0]) if row else None
+
+    def put(self, url: URL, html_hash: str, offer: JobOffer) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO parsed_offers VALUES (?, ?, ?, ?)",
+                (str(url), html_hash, self.parser_version, _serialize_offer(offer)),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def hash_html(html: str) -> str:
+    return hashlib.blake2b(html.encode(), digest_size=16).hexdigest()
+
+
+def _serialize_offer(offer: JobOffer) -> str:
+    return json.dumps({**asdict(offer), "url": str(offer.url)}, separators=(",", ":"), ensure_ascii=False)
+
+
+def _deserialize_offer(serialized: str) -> JobOffer:
+    data = json.loads(serialized)
+    return JobOffer(
+        **{
+            **data,
+            "url": URL(data["url"]),
+            "tech_stack": tuple(TechStackEntry(**t) for t in data["tech_stack"]),
+        }
+    )
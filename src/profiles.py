@@ -0,0 +1,58 @@
+import tomllib
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from src.criteria import LocationCriteria
+from src.models import ProgrammingLanguage
+
+
+class Schedule(BaseModel):
+    """
+    Run every `every` (e.g. "PT6H", "P1D", "P7D"), starting at the time of day `at` when given. Runs missed while the
+    scheduler wasn't running are skipped, like in cron.
+    """
+
+    every: timedelta
+    at: time | None = None
+
+    def next_run(self, now: datetime, last_run: datetime | None = None) -> datetime:
+        if last_run is None:
+            if self.at is None:
+                return now
+            next_run = datetime.combine(now.date(), self.at)
+            return next_run if next_run >= now else next_run + timedelta(days=1)
+        next_run = last_run + self.every
+        while next_run < now:
+            next_run += self.every
+        return next_run
+
+
+class Profile(BaseModel):
+    """
+    One saved search: the board to crawl and the criteria offers have to satisfy.
+    """
+
+    name: str
+    language: ProgrammingLanguage
+    include_skills: list[str] = []
+    location_criteria: list[LocationCriteria] = []
+    schedule: Schedule | None = None
+
+    @property
+    def board_key(self) -> tuple[ProgrammingLanguage, tuple[str, ...]]:
+        return self.language, tuple(self.include_skills)
+
+    @property
+    def report_file_name(self) -> str:
+        return f"{self.name}_report.html"
+
+
+class ProfilesConfig(BaseModel):
+    profiles: list[Profile]
+
+
+def load_profiles(path: Path) -> list[Profile]:
+    with open(path, "rb") as config_file:
+        return ProfilesConfig(**tomllib.load(config_file)).profiles
@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import time
+import typing
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from src.metrics import RATE_LIMITER_WAIT_SECONDS
+
+THROTTLING_STATUS_CODES = (429, 503)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with AIMD control of both the request rate and the number of requests in flight. Both grow
+    additively while the responses are fast and successful, and are halved when the server starts throttling.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float,
+        max_rate: float,
+        initial_concurrency: int,
+        max_concurrency: int,
+        fast_response_threshold: float,
+        min_rate: float = 0.2,
+        rate_increase: float = 0.25,
+    ):
+        self.rate = initial_rate  # requests per second
+        self.concurrency = float(initial_concurrency)
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.max_concurrency = max_concurrency
+        self.rate_increase = rate_increase
+        self.fast_response_threshold = fast_response_threshold
+
+        self._in_flight = 0
+        self._slot_released = asyncio.Condition()
+        self._tokens = 1.0
+        self._tokens_updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease_at = 0.0
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> typing.AsyncIterator[None]:
+        waiting_since = time.perf_counter()
+        async with self._slot_released:
+            await self._slot_released.wait_for(lambda: self._in_flight < int(self.concurrency))
+            self._in_flight += 1
+        try:
+            await self._take_token()
+            RATE_LIMITER_WAIT_SECONDS.observe(time.perf_counter() - waiting_since)
+            yield
+        finally:
+            async with self._slot_released:
+                self._in_flight -= 1
+                self._slot_released.notify_all()
+
+    def record_success(self, latency: float) -> None:
+        if latency > self.fast_response_threshold:
+            return
+        self.rate = min(self.max_rate, self.rate + self.rate_increase)
+        self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+
+    def record_throttled(self, retry_after: float | None = None) -> None:
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        # Requests which were already in flight get throttled too, count them as a single decrease
+        if now - self._last_decrease_at < 1 / self.rate:
+            return
+        self._last_decrease_at = now
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.concurrency = max(1.0, self.concurrency / 2)
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._tokens = min(1.0, self._tokens + (now - self._tokens_updated_at) * self.rate)
+            self._tokens_updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    `Retry-After` is either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
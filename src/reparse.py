@@ -0,0 +1,106 @@
+import itertools
+import mmap
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.constants import (
+    CRAWL_ARCHIVE_PATH,
+    OFFER_STORE_PATH,
+    PARSE_WORKERS,
+    PARSED_OFFERS_CACHE_PATH,
+    REPARSE_CHUNK_SIZE,
+)
+from src.crawl_archive import CrawlArchive, read_page
+from src.exceptions import JustJoinITOfferStructureError
+from src.jjit_board_parser import JJITBoardParser
+from src.models import JobOffer
+from src.offer_store import OfferStore
+from src.parsed_offer_cache import ParsedOfferCache, hash_html
+
+
+@dataclass(frozen=True, slots=True)
+class ReparseResult:
+    records: int
+    parsed: int
+    failed: int
+    seconds: float
+
+
+def reparse(
+    archive: CrawlArchive,
+    offer_store: OfferStore,
+    parsed_offer_cache: ParsedOfferCache | None = None,
+    workers: int = PARSE_WORKERS,
+) -> ReparseResult:
+    """
+    Parse the latest archived page of every offer again with the current selectors, without touching the network.
+    Workers map the archive themselves, only offsets go to them and parsed offers come back.
+    """
+    started_at = time.perf_counter()
+    offsets = archive.latest_offsets()
+    chunks = [offsets[i : i + REPARSE_CHUNK_SIZE] for i in range(0, len(offsets), REPARSE_CHUNK_SIZE)]
+    parsed = failed = 0
+
+    def save(chunk_result: tuple[list[tuple[JobOffer, datetime, str]], int]) -> None:
+        nonlocal parsed, failed
+        offers, chunk_failed = chunk_result
+        for offer, fetched_at, html_hash in offers:
+            offer_store.add(offer, seen_at=fetched_at)
+            if parsed_offer_cache:
+                parsed_offer_cache.put(offer.url, html_hash, offer)
+        parsed += len(offers)
+        failed += chunk_failed
+
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as executor:
+            for chunk_result in executor.map(_parse_archived_pages, itertools.repeat(archive.path), chunks):
+                save(chunk_result)
+    else:
+        for chunk in chunks:
+            save(_parse_archived_pages(archive.path, chunk))
+    offer_store.flush()
+    return ReparseResult(records=len(offsets), parsed=parsed, failed=failed, seconds=time.perf_counter() - started_at)
+
+
+def _parse_archived_pages(archive_path: Path, offsets: list[int]) -> tuple[list[tuple[JobOffer, datetime, str]], int]:
+    """
+    Entry point of the parsing worker processes. Parsed offers with the time their page was fetched and its hash, and
+    the number of pages which couldn't be parsed.
+    """
+    offers = []
+    failed = 0
+    with open(archive_path, "rb") as archive, mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for offset in offsets:
+            page = read_page(buffer, offset)
+            try:
+                offer = JJITBoardParser._parse_offer(page.as_response())
+            except JustJoinITOfferStructureError as e:
+                print(f"Could not parse {page.url}: {e}")
+                failed += 1
+                continue
+            offers.append((offer, page.fetched_at, hash_html(page.html)))
+    return offers, failed
+
+
+def run_reparse(archive_path: Path) -> None:
+    archive = CrawlArchive(archive_path)
+    offer_store = OfferStore(OFFER_STORE_PATH)
+    parsed_offer_cache = ParsedOfferCache(PARSED_OFFERS_CACHE_PATH, JJITBoardParser.PARSER_VERSION)
+    try:
+        result = reparse(archive, offer_store, parsed_offer_cache)
+    finally:
+        parsed_offer_cache.close()
+        offer_store.close()
+        archive.close()
+    print(
+        f"Parsed {result.parsed} of {result.records} archived offers in {result.seconds:.1f} s, {result.failed} failed"
+    )
+
+
+if __name__ == "__main__":
+    run_reparse(Path(sys.argv[1]) if len(sys.argv) > 1 else CRAWL_ARCHIVE_PATH)
@@ -0,0 +1,217 @@
+import math
+import typing
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import chain, count
+from operator import attrgetter
+
+import numpy as np
+import numpy.typing as npt
+from yarl import URL
+
+from src.constants import (
+    SALARY_PERCENTILES,
+    SALARY_PERIODS_PER_MONTH,
+    SALARY_RATES_TO_PLN,
+    SALARY_STATS_MIN_OFFERS,
+    SALARY_STATS_TOP,
+)
+from src.models import JobOffer, TechStackEntry
+
+
+class OfferSalary(typing.Protocol):
+    """
+    What the statistics read from an offer, `title` and `url` only for the best paid ones.
+    """
+
+    @property
+    def title(self) -> str: ...
+    @property
+    def url(self) -> URL: ...
+    @property
+    def location_city(self) -> str: ...
+    @property
+    def tech_stack(self) -> tuple[TechStackEntry, ...]: ...
+    @property
+    def salary_min(self) -> int | None: ...
+    @property
+    def salary_max(self) -> int | None: ...
+    @property
+    def salary_currency(self) -> str | None: ...
+    @property
+    def salary_per(self) -> str | None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class SalaryColumns:
+    """
+    The part of an offer kept for the statistics of a streamed report, its strings are shared with the offer.
+    """
+
+    title: str
+    url: URL
+    location_city: str
+    tech_stack: tuple[TechStackEntry, ...]
+    salary_min: int | None
+    salary_max: int | None
+    salary_currency: str | None
+    salary_per: str | None
+
+    @classmethod
+    def of(cls, offer: JobOffer) -> "SalaryColumns":
+        return cls(
+            offer.title,
+            offer.url,
+            offer.location_city,
+            offer.tech_stack,
+            offer.salary_min,
+            offer.salary_max,
+            offer.salary_currency,
+            offer.salary_per,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class GroupMedian:
+    name: str
+    median: float  # monthly PLN
+    offers: int  # offers with a salary in the group
+
+
+@dataclass(frozen=True, slots=True)
+class SalaryStats:
+    """
+    Salaries as monthly amounts in PLN, the midpoint of the offered range. `scores` are aligned with the offers: the
+    percentile rank of the salary among the offers, from 0 for the lowest paid to 100 for the best paid, NaN for offers
+    without a comparable salary.
+    """
+
+    offers: int
+    offers_with_salary: int
+    percentiles: dict[int, float]
+    median_by_technology: list[GroupMedian]
+    median_by_city: list[GroupMedian]
+    best_paid: list[tuple[OfferSalary, float]]
+    scores: npt.NDArray[np.float64] = field(repr=False, compare=False)
+
+    def score(self, index: int) -> float | None:
+        """
+        Score of the offer at `index`, None when its salary isn't comparable.
+        """
+        score = float(self.scores[index])
+        return None if math.isnan(score) else score
+
+
+def compute_salary_stats(
+    offers: typing.Sequence[OfferSalary],
+    rates: dict[str, float] = SALARY_RATES_TO_PLN,
+    periods: dict[str, float] = SALARY_PERIODS_PER_MONTH,
+    min_offers: int = SALARY_STATS_MIN_OFFERS,
+    top: int = SALARY_STATS_TOP,
+) -> SalaryStats:
+    """
+    Offers are read once into arrays, with currencies, periods, cities and technologies as integer codes, everything
+    else is computed on the arrays. Offers with a currency or period missing from `rates` or `periods` are left out.
+    Technologies and cities with fewer than `min_offers` offers with a salary get no median, at most `top` of them and
+    of the best paid offers are kept.
+    """
+    # codes are given out in the order values first appear
+    units: defaultdict[tuple[str | None, str | None], int] = defaultdict(count().__next__)
+    cities: defaultdict[str, int] = defaultdict(count().__next__)
+    # None becomes NaN
+    columns = np.array(
+        [
+            (
+                o.salary_min,
+                o.salary_max,
+                units[o.salary_currency, o.salary_per],
+                cities[o.location_city],
+            )
+            for o in offers
+        ],
+        dtype=np.float64,
+    ).reshape(len(offers), 4)
+    salary_min, salary_max = columns[:, 0], columns[:, 1]
+    unit_codes, city_codes = columns[:, 2].astype(np.intp), columns[:, 3].astype(np.intp)
+    to_monthly_pln = np.array(
+        [rates.get(currency or "", np.nan) * periods.get(per or "", np.nan) for currency, per in units],
+        dtype=np.float64,
+    )
+    monthly = (salary_min + salary_max) / 2 * to_monthly_pln[unit_codes]
+
+    has_salary = ~np.isnan(monthly)
+    salaries = monthly[has_salary]
+    # salaries are sorted once, groups are then sorted by the position of the salary in `sorted_salaries`
+    order = np.argsort(salaries, kind="stable")
+    sorted_salaries = salaries[order]
+    salary_ranks = np.empty_like(order)
+    salary_ranks[order] = np.arange(len(order))
+
+    scores = np.full(len(offers), np.nan)
+    scores[has_salary] = _percentile_ranks(salaries, sorted_salaries)
+
+    # one code per tech stack entry of the offers with a salary, without a Python loop over the entries
+    technologies: defaultdict[str, int] = defaultdict(count().__next__)
+    tech_stacks = [offers[i].tech_stack for i in np.flatnonzero(has_salary).tolist()]
+    technology_codes = np.fromiter(
+        map(technologies.__getitem__, map(attrgetter("technology"), chain.from_iterable(tech_stacks))), dtype=np.intp
+    )
+    technology_ranks = np.repeat(
+        salary_ranks, np.fromiter(map(len, tech_stacks), dtype=np.intp, count=len(tech_stacks))
+    )
+
+    percentiles = np.percentile(sorted_salaries, SALARY_PERCENTILES).tolist() if len(salaries) else []
+    best_paid = np.flatnonzero(has_salary)[order[::-1][:top]]
+    return SalaryStats(
+        offers=len(offers),
+        offers_with_salary=len(salaries),
+        percentiles=dict(zip(SALARY_PERCENTILES, percentiles, strict=False)),
+        median_by_technology=_group_medians(
+            list(technologies), technology_codes, technology_ranks, sorted_salaries, min_offers, top
+        ),
+        median_by_city=_group_medians(
+            list(cities), city_codes[has_salary], salary_ranks, sorted_salaries, min_offers, top
+        ),
+        best_paid=[(offers[i], float(monthly[i])) for i in best_paid.tolist()],
+        scores=scores,
+    )
+
+
+def _percentile_ranks(
+    values: npt.NDArray[np.float64], sorted_values: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Equal values get the same rank, the average of the positions they take when sorted.
+    """
+    first = np.searchsorted(sorted_values, values, side="left")
+    last = np.searchsorted(sorted_values, values, side="right") - 1
+    return 100 * (first + last) / 2 / max(len(values) - 1, 1)
+
+
+def _group_medians(
+    names: list[str],
+    codes: npt.NDArray[np.intp],
+    ranks: npt.NDArray[np.intp],
+    sorted_salaries: npt.NDArray[np.float64],
+    min_offers: int,
+    top: int,
+) -> list[GroupMedian]:
+    """
+    Medians of all groups at once. Sorting (group, rank of the salary) as a single integer orders salaries by group and
+    by value, the middle of each group is then found from the group sizes.
+    """
+    counts = np.bincount(codes, minlength=len(names))
+    selected = np.flatnonzero(counts >= max(min_offers, 1))
+    if not len(selected):
+        return []
+    keys = np.sort(codes * len(sorted_salaries) + ranks)
+    grouped_salaries = sorted_salaries[keys % len(sorted_salaries)]
+    starts = (np.cumsum(counts) - counts)[selected]
+    medians = (
+        grouped_salaries[starts + (counts[selected] - 1) // 2] + grouped_salaries[starts + counts[selected] // 2]
+    ) / 2
+    by_median = np.argsort(-medians, kind="stable")[:top]
+    return [
+        GroupMedian(name=names[selected[i]], median=float(medians[i]), offers=int(counts[selected[i]]))
+        for i in by_median
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+import sys
+import typing
+from datetime import datetime
+from pathlib import Path
+
+from src.constants import FULL_CRAWL_INTERVAL, OFFER_STORE_PATH
+from src.generate import open_parser, render_report
+from src.jjit_board_parser import JJITBoardParser
+from src.models import JobOffer
+from src.offer_store import OfferStore
+from src.profiles import Profile, Schedule, load_profiles
+
+
+class Scheduler:
+    """
+    Runs profiles on their schedules with one warm parser (and so one client session and cache). Only one crawl runs at
+    a time: profiles requested while a crawl is running are queued and crawled together once it finishes, and a profile
+    requested while it is already queued or being crawled joins that run instead of starting another one.
+
+    Runs are incremental: offers seen by earlier crawls are reused and only offers new on the boards are downloaded.
+    Offers can change without changing their URL, so every profile is fully crawled again once `FULL_CRAWL_INTERVAL`
+    has passed since its last full crawl.
+    """
+
+    def __init__(
+        self,
+        parser: JJITBoardParser,
+        profiles: list[Profile],
+        on_run_finished: typing.Callable[[Profile, list[JobOffer]], None] | None = None,
+    ):
+        self.parser = parser
+        self.profiles = profiles
+        self.on_run_finished = on_run_finished
+        self._runs: dict[str, asyncio.Future[list[JobOffer]]] = {}
+        self._queued: dict[str, Profile] = {}
+        self._crawl_lock = asyncio.Lock()
+        self._crawl_task: asyncio.Task | None = None
+        self._full_crawls: dict[str, datetime] = {}
+
+    @property
+    def is_crawling(self) -> bool:
+        return self._crawl_lock.locked()
+
+    async def run(self) -> None:
+        async with asyncio.TaskGroup() as tg:
+            for profile in self.profiles:
+                if profile.schedule:
+                    tg.create_task(self._run_on_schedule(profile, profile.schedule))
+
+    async def run_profiles(self, profiles: list[Profile]) -> dict[str, list[JobOffer]]:
+        """
+        Matching offers of each profile, from the run it was coalesced into.
+        """
+        futures = {profile.name: self._request_run(profile) for profile in profiles}
+        return {name: await asyncio.shield(future) for name, future in futures.items()}
+
+    def _request_run(self, profile: Profile) -> asyncio.Future[list[JobOffer]]:
+        if (future := self._runs.get(profile.name)) is not None:
+            return future
+        future = self._runs[profile.name] = asyncio.get_running_loop().create_future()
+        self._queued[profile.name] = profile
+        if self._crawl_task is None or self._crawl_task.done():
+            self._crawl_task = asyncio.create_task(self._crawl_queued())
+        return future
+
+    async def _crawl_queued(self) -> None:
+        async with self._crawl_lock:
+            while self._queued:
+                profiles = list(self._queued.values())
+                self._queued.clear()
+                started_at = datetime.now()
+                incremental = all(
+                    started_at - self._full_crawls.get(p.name, datetime.min) < FULL_CRAWL_INTERVAL for p in profiles
+                )
+                try:
+                    jobs_per_profile = await self.parser.find_offers_for_profiles(profiles, incremental)
+                except Exception as e:
+                    for profile in profiles:
+                        self._runs.pop(profile.name).set_exception(e)
+                else:
+                    for profile in profiles:
+                        if not incremental:
+                            self._full_crawls[profile.name] = started_at
+                        self._runs.pop(profile.name).set_result(jobs_per_profile[profile.name])
+
+    async def _run_on_schedule(self, profile: Profile, schedule: Schedule) -> None:
+        last_run = None
+        while True:
+            last_run = schedule.next_run(datetime.now(), last_run)
+            await asyncio.sleep((last_run - datetime.now()).total_seconds())
+            try:
+                jobs = (await self.run_profiles([profile]))[profile.name]
+            except Exception as e:
+                print(f"Scheduled run of {profile.name} failed: {e!r}")
+                continue
+            if self.on_run_finished:
+                self.on_run_finished(profile, jobs)
+
+
+async def run_scheduler(profiles_path: Path) -> None:
+    offer_store = OfferStore(OFFER_STORE_PATH)
+
+    def save_report(profile: Profile, jobs: list[JobOffer]) -> None:
+        render_report(jobs, profile.report_file_name)
+        offer_store.mark_reported(profile.report_file_name)
+
+    try:
+        async with open_parser(offer_store) as parser:
+            await Scheduler(parser, load_profiles(profiles_path), on_run_finished=save_report).run()
+    finally:
+        offer_store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_scheduler(Path(sys.argv[1])))
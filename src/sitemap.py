@@ -0,0 +1,51 @@
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from xml.etree import ElementTree
+
+from yarl import URL
+
+from src.exceptions import SitemapStructureError
+
+SITEMAP_NAMESPACE = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+@dataclass(frozen=True, slots=True)
+class SitemapEntry:
+    url: URL
+    lastmod: datetime
+
+
+def iter_sitemap_entries(sitemap_path: Path) -> typing.Iterator[SitemapEntry]:
+    """
+    Stream `<url>` entries of the sitemap. Parsed elements are cleared right away, so memory usage does not depend
+    on the size of the file.
+    """
+    with open(sitemap_path, "rb") as sitemap_file:
+        _skip_preamble(sitemap_file)
+        root = None
+        for event, element in ElementTree.iterparse(sitemap_file, events=("start", "end")):
+            if root is None:
+                root = element
+            if event != "end" or element.tag != f"{SITEMAP_NAMESPACE}url":
+                continue
+
+            loc = element.findtext(f"{SITEMAP_NAMESPACE}loc")
+            lastmod = element.findtext(f"{SITEMAP_NAMESPACE}lastmod")
+            if not loc or not lastmod:
+                raise SitemapStructureError(f"Sitemap entry is missing <loc> or <lastmod>. Loc: {loc}")
+            yield SitemapEntry(url=URL(loc.strip()), lastmod=datetime.fromisoformat(lastmod.strip()))
+            root.clear()
+
+
+def _skip_preamble(sitemap_file: typing.BinaryIO) -> None:
+    """
+    Sitemaps saved from the browser start with a plain text note, so move to the first line that looks like XML.
+    """
+    position = sitemap_file.tell()
+    while line := sitemap_file.readline():
+        if line.lstrip().startswith(b"<"):
+            break
+        position = sitemap_file.tell()
+    sitemap_file.seek(position)
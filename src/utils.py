@@ -1,3 +1,5 @@
+import os
+import typing
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, Template
@@ -30,8 +32,10 @@ def get_offers_html() -> list[WebsiteOkResponse]:
     ]
 
 
-def prepare_jinja_env(template_filename: str) -> Template:
-    jinja_env = Environment(loader=FileSystemLoader(searchpath=Path(__file__).parent / "templates"))
+def prepare_jinja_env(template_filename: str, enable_async: bool = False) -> Template:
+    jinja_env = Environment(
+        loader=FileSystemLoader(searchpath=Path(__file__).parent / "templates"), enable_async=enable_async
+    )
     jinja_env.filters["format_number"] = format_number
     return jinja_env.get_template(template_filename)
 
@@ -46,3 +50,26 @@ def format_number(value: str) -> str:
 def save_report(report, output_filename: str) -> None:
     with open(output_filename, "w") as f:
         f.write(report)
+
+
+async def save_report_stream(chunks: typing.AsyncIterable[str], output_filename: str) -> None:
+    """
+    Chunks are written as they come, into a temporary file which replaces the report only once it is complete.
+    """
+    partial_filename = f"{output_filename}.partial"
+    with open(partial_filename, "w") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+    os.replace(partial_filename, output_filename)
+
+
+async def iterate[T](items: typing.Iterable[T] | typing.AsyncIterable[T]) -> typing.AsyncIterator[T]:
+    """
+    Iterate over sync and async iterables alike.
+    """
+    if isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
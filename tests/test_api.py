@@ -0,0 +1,65 @@
+from fastapi.testclient import TestClient
+
+from src.api import OffersService, app, get_service
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.jjit_board_parser import JJITBoardParser
+from src.models import ProgrammingLanguage
+from src.offer_index import OfferIndex
+from src.profiles import Profile
+from src.utils import get_offers_html
+
+PROFILE = Profile(
+    name="rust_warszawa",
+    language=ProgrammingLanguage.PYTHON,
+    include_skills=["Rust"],
+    location_criteria=[
+        LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="warszawa")], rule=LocationRule.ALL)
+    ],
+)
+
+
+def _create_client() -> TestClient:
+    offer_index = OfferIndex()
+    for response in get_offers_html():
+        offer_index.add(JJITBoardParser._parse_offer(response))
+    service = OffersService(offer_index, [PROFILE])
+    app.dependency_overrides[get_service] = lambda: service
+    return TestClient(app)  # not entered, so the lifespan crawling the boards doesn't run
+
+
+def test__search_offers():
+    client = _create_client()
+
+    response = client.post(
+        "/offers",
+        json={
+            "all_technologies": ["python"],
+            "min_level": "advanced",
+            "location_criteria": [{"keywords": [{"form": "hybrid", "city": "warszawa"}], "rule": "all"}],
+        },
+    )
+
+    assert response.status_code == 200
+    assert [offer["title"] for offer in response.json()] == ["Senior Software Engineer (Rust) - hyperexponential"]
+
+
+def test__unknown_min_level_is_rejected():
+    client = _create_client()
+
+    response = client.post("/offers", json={"all_technologies": ["python"], "min_level": "guru"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "min_level"]
+
+
+def test__profile_offers_and_report():
+    client = _create_client()
+
+    offers = client.get("/profiles/rust_warszawa/offers").json()
+    report = client.get("/profiles/rust_warszawa/report")
+
+    assert [offer["location_city"] for offer in offers] == ["Warszawa"]
+    assert report.headers["content-type"].startswith("text/html")
+    assert "Found <strong>1 position</strong>" in report.text
+    assert "<strong>1 of 1</strong> offers list a salary" in report.text
+    assert client.get("/profiles/unknown/offers").status_code == 404
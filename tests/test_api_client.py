@@ -0,0 +1,199 @@
+import asyncio
+import typing
+from datetime import datetime, timedelta
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from benchmarks.mock_server import MockServerConfig, create_app
+from src.constants import CONNECTION_LIMIT_PER_HOST, MAX_PENDING_RESPONSES
+from src.crawl_archive import CrawlArchive
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.custom_cache import LRUCacheEntry, LRUCacheManager
+from src.jjit_api_client import JJITAPIClient, load_user_agents
+from src.jjit_board_parser import JJITBoardParser
+from src.metrics import HTTP_CONNECTIONS_TOTAL, HTTP_POOL_CONNECTIONS, REGISTRY
+from src.models import (
+    JJITOffersPage,
+    ProgrammingLanguage,
+    WebsiteErrorResponse,
+    WebsiteNotModifiedResponse,
+    WebsiteOkResponse,
+)
+from src.rate_limiter import AdaptiveRateLimiter
+from src.utils import get_offers_html
+
+
+async def _run_with_mock_server(
+    config: MockServerConfig, test: typing.Callable[[URL, list[str]], typing.Awaitable[None]]
+) -> None:
+    requested_paths: list[str] = []
+
+    @web.middleware
+    async def record_request(request: web.Request, handler: typing.Callable) -> web.StreamResponse:
+        requested_paths.append(request.path)
+        return await handler(request)
+
+    app = create_app(config)
+    app.middlewares.append(record_request)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        await test(server.make_url(""), requested_paths)
+    finally:
+        await server.close()
+
+
+def _unlimited_rate_limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        initial_rate=1000, max_rate=1000, initial_concurrency=6, max_concurrency=6, fast_response_threshold=1.0
+    )
+
+
+def test__offers_are_found_on_mock_server():
+    location_criteria = [LocationCriteria(keywords=[LocationKeyword(form="hybrid")], rule=LocationRule.ALL)]
+
+    async def find_offers(base_url: URL, requested_paths: list[str]) -> None:
+        async with JJITAPIClient(
+            base_url=base_url, rate_limiter=_unlimited_rate_limiter(), user_agent="agent/1"
+        ) as client:
+            parser = JJITBoardParser(client, parse_workers=0)
+            offers = await parser.find_offers(["Python"], location_criteria, ProgrammingLanguage.PYTHON)
+
+        assert len(offers) == 3
+        assert requested_paths.count("/job-offers/all-locations/python") == 1
+
+    asyncio.run(_run_with_mock_server(MockServerConfig(offers_count=3), find_offers))
+
+
+def test__fetching_pauses_when_responses_are_not_consumed():
+    async def fetch_one(base_url: URL, requested_paths: list[str]) -> None:
+        urls = [base_url.with_path(f"/job-offer/benchmark-company-offer-{i}-python") for i in range(50)]
+        async with JJITAPIClient(
+            base_url=base_url, rate_limiter=_unlimited_rate_limiter(), user_agent="agent/1"
+        ) as client:
+            responses = client.fetch_multiple_urls(urls)
+            await anext(responses)
+            await asyncio.sleep(0.5)
+            await responses.aclose()
+
+        assert len(requested_paths) <= MAX_PENDING_RESPONSES + 1
+
+    asyncio.run(_run_with_mock_server(MockServerConfig(offers_count=50), fetch_one))
+
+
+def test__connections_are_reused_and_pool_stats_exported():
+    reused = HTTP_CONNECTIONS_TOTAL.value(event="reused")
+
+    async def fetch_all(base_url: URL, requested_paths: list[str]) -> None:
+        urls = [base_url.with_path(f"/job-offer/benchmark-company-offer-{i}-python") for i in range(20)]
+        async with JJITAPIClient(
+            base_url=base_url, rate_limiter=_unlimited_rate_limiter(), user_agent="agent/1"
+        ) as client:
+            assert len([r async for r in client.fetch_multiple_urls(urls)]) == 20
+            stats = client.pool_stats()
+
+        assert 1 <= stats.created_connections <= CONNECTION_LIMIT_PER_HOST
+        assert stats.created_connections + stats.reused_connections == 20
+        assert stats.reuse_ratio > 0.5
+        assert stats.open_connections == stats.idle_connections <= stats.created_connections
+        assert HTTP_CONNECTIONS_TOTAL.value(event="reused") == reused + stats.reused_connections
+        assert HTTP_POOL_CONNECTIONS.value(state="idle") >= 1
+        assert 'jobs_http_connections_total{event="reused"}' in REGISTRY.to_prometheus()
+
+    asyncio.run(_run_with_mock_server(MockServerConfig(offers_count=20), fetch_all))
+
+
+def test__long_retry_after_gives_up_instead_of_waiting():
+    async def fetch_one(base_url: URL, requested_paths: list[str]) -> None:
+        url = base_url.with_path("/job-offer/benchmark-company-offer-0-python")
+        async with JJITAPIClient(
+            base_url=base_url, rate_limiter=_unlimited_rate_limiter(), user_agent="agent/1"
+        ) as client:
+            response = await asyncio.wait_for(client._request_with_retry(url), timeout=5)
+
+        assert isinstance(response, WebsiteErrorResponse)
+        assert response.status in (429, 503)
+        assert requested_paths == [url.path]
+
+    config = MockServerConfig(offers_count=1, error_rate=1.0, retry_after=86400)
+    asyncio.run(_run_with_mock_server(config, fetch_one))
+
+
+def test__offer_evicted_during_revalidation_is_downloaded_again():
+    cache = LRUCacheManager(capacity=10, ttl=timedelta(days=1))
+    url = URL("https://justjoin.it/job-offer/company-offer-python")
+    cache.put(str(url), "old", etag='"v1"')
+    cache._cache_entries[str(url)].expires_at = datetime.now() - timedelta(seconds=1)
+    client = JJITAPIClient(cache=cache, user_agent="agent/1")
+    stale_requests = []
+
+    async def request_with_retry(url: URL, stale: LRUCacheEntry | None = None, kind: str = "offer"):
+        stale_requests.append(stale is not None)
+        if stale:
+            cache.invalidate(str(url))
+            return WebsiteNotModifiedResponse(url=url)
+        return WebsiteOkResponse(html="new", url=url)
+
+    client._request_with_retry = request_with_retry  # type: ignore[method-assign]
+
+    async def fetch() -> list[str]:
+        return [response.html async for response in client.fetch_multiple_urls([url])]
+
+    assert asyncio.run(fetch()) == ["new"]
+    assert stale_requests == [True, False]
+
+
+def test__board_pages_with_unexpected_shape_are_skipped():
+    client = JJITAPIClient(user_agent="agent/1")
+    page = '{"data": [{"slug": "company-offer-python"}], "meta": {"totalItems": 300}}'
+
+    async def request_with_retry(url: URL, stale: LRUCacheEntry | None = None, kind: str = "offer"):
+        return WebsiteOkResponse(html='{"data": "unexpected"}' if url.query["from"] == "100" else page, url=url)
+
+    client._request_with_retry = request_with_retry  # type: ignore[method-assign]
+
+    async def fetch() -> list[JJITOffersPage]:
+        return [page async for page in client.fetch_board_pages(ProgrammingLanguage.PYTHON, [], [100, 200], 100)]
+
+    assert len(asyncio.run(fetch())) == 1
+
+
+def test__downloaded_pages_go_to_an_empty_archive(tmp_path):
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    client = JJITAPIClient(archive=archive, user_agent="agent/1")
+    offers = get_offers_html()
+
+    async def request_with_retry(url: URL, stale: LRUCacheEntry | None = None, kind: str = "offer"):
+        return next(o for o in offers if o.url == url)
+
+    client._request_with_retry = request_with_retry  # type: ignore[method-assign]
+
+    async def fetch() -> None:
+        async for _ in client.fetch_multiple_urls([o.url for o in offers]):
+            pass
+
+    asyncio.run(fetch())
+
+    assert len(archive) == len(offers)
+
+
+def test__user_agents_are_picked_once_and_read_from_file_afterwards(tmp_path):
+    path = tmp_path / "user_agents.txt"
+
+    user_agents = load_user_agents(path, pool_size=5)
+    path.write_text("\n".join(["agent/1", *user_agents[1:]]))
+
+    assert 1 <= len(user_agents) <= 5
+    assert load_user_agents(path) == ["agent/1", *user_agents[1:]]
+
+
+def test__empty_user_agents_file_is_drawn_again(tmp_path):
+    path = tmp_path / "user_agents.txt"
+    path.write_text("")
+
+    user_agents = load_user_agents(path, pool_size=5)
+
+    assert 1 <= len(user_agents) <= 5
+    assert path.read_text().splitlines() == user_agents
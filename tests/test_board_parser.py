@@ -0,0 +1,222 @@
+import asyncio
+import pickle
+import typing
+from pathlib import Path
+
+from yarl import URL
+
+from src.crawl_index import CrawlIndex
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.jjit_board_parser import JJITBoardParser, _url_rules_out_offer
+from src.models import ProgrammingLanguage, WebsiteOkResponse
+from src.offer_store import OfferStore
+from src.parsed_offer_cache import ParsedOfferCache
+from src.profiles import Profile
+from src.utils import get_offers_html, open_html
+
+
+class FakeAPIClient:
+    def __init__(self, responses: list[WebsiteOkResponse]):
+        self._responses = {r.url: r for r in responses}
+        self.fetched_urls: list[URL] = []
+
+    async def fetch_multiple_urls(self, urls: typing.AsyncIterable[URL]) -> typing.AsyncGenerator[WebsiteOkResponse]:
+        async for url in urls:
+            self.fetched_urls.append(url)
+            yield self._responses[url]
+
+    def invalidate_cache(self, urls: list[URL]) -> None:
+        pass
+
+
+def _find_matching_urls(parse_workers: int) -> set[str]:
+    offers = get_offers_html()
+    parser = JJITBoardParser(FakeAPIClient(offers), parse_workers=parse_workers)  # type: ignore[arg-type]
+    location_criteria = [
+        LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="warszawa")], rule=LocationRule.ALL)
+    ]
+
+    async def find() -> set[str]:
+        return {str(o.url) async for o in parser._iter_matching_offers([o.url for o in offers], location_criteria)}
+
+    try:
+        return asyncio.run(find())
+    finally:
+        parser.close()
+
+
+def test__parsing_in_worker_processes_matches_inline_parsing():
+    assert _find_matching_urls(parse_workers=2) == _find_matching_urls(parse_workers=0)
+    assert len(_find_matching_urls(parse_workers=0)) > 0
+
+
+def test__offers_from_worker_processes_share_strings_and_tech_stack_entries():
+    offer = JJITBoardParser._parse_offer(get_offers_html()[0])
+    received = pickle.loads(pickle.dumps(offer))
+
+    assert received == offer
+    assert received.location_city is offer.location_city
+    assert received.seniority is offer.seniority
+    assert all(r is t for r, t in zip(received.tech_stack, offer.tech_stack, strict=True))
+
+
+def test__location_is_parsed_without_the_rest_of_the_offer():
+    for offer in get_offers_html():
+        parsed = JJITBoardParser._parse_offer(offer)
+
+        assert JJITBoardParser._parse_offer_location(offer) == (parsed.remote_options, parsed.location_city)
+
+
+def test__offers_are_ruled_out_by_city_in_url():
+    location_criteria = [
+        [
+            LocationCriteria(
+                keywords=[
+                    LocationKeyword(form="hybrid", city="wrocław"),
+                    LocationKeyword(form="office", city="gdansk"),
+                ],
+                rule=LocationRule.AT_LEAST_ONE,
+            ).compile()
+        ]
+    ]
+
+    assert _url_rules_out_offer(URL("https://justjoin.it/job-offer/acme-python-dev-warszawa-python"), location_criteria)
+    assert not _url_rules_out_offer(
+        URL("https://justjoin.it/job-offer/acme-python-dev-wroclaw-python"), location_criteria
+    )
+    assert not _url_rules_out_offer(URL("https://justjoin.it/job-offer/acme-python-dev"), location_criteria)
+
+
+def test__board_pagination_is_read_from_the_board_page():
+    board = WebsiteOkResponse(html=open_html("board_response_python"), url=URL("https://justjoin.it"))
+
+    assert JJITBoardParser._extract_pagination(board) == (391, 100)
+
+
+def test__offers_shared_by_profiles_are_fetched_once():
+    offers = get_offers_html()
+    api_client = FakeAPIClient(offers)
+    parser = JJITBoardParser(api_client, parse_workers=0)  # type: ignore[arg-type]
+    boards = {
+        (ProgrammingLanguage.PYTHON, ("Python",)): [o.url for o in offers],
+        (ProgrammingLanguage.PYTHON, ("Rust",)): [o.url for o in offers[:2]],
+    }
+
+    async def discover_board_urls(language: ProgrammingLanguage, include_skills: list[str]):
+        for url in boards[language, tuple(include_skills)]:
+            yield url
+
+    parser._discover_board_urls = discover_board_urls  # type: ignore[method-assign]
+    profiles = [
+        Profile(
+            name="warszawa",
+            language=ProgrammingLanguage.PYTHON,
+            include_skills=["Python"],
+            location_criteria=[
+                LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="warszawa")], rule=LocationRule.ALL)
+            ],
+        ),
+        Profile(name="rust", language=ProgrammingLanguage.PYTHON, include_skills=["Rust"]),
+    ]
+
+    matched = asyncio.run(parser.find_offers_for_profiles(profiles))
+
+    assert sorted(api_client.fetched_urls) == sorted(o.url for o in offers)
+    assert len(matched["warszawa"]) == 2
+    assert {o.url for o in matched["rust"]} == {o.url for o in offers[:2]}
+
+
+def test__offers_unchanged_in_sitemap_are_not_fetched_again(tmp_path: Path):
+    offers = get_offers_html()
+    sitemap_path = tmp_path / "sitemap.xml"
+    sitemap_path.write_text(
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(f"<url><loc>{o.url}</loc><lastmod>2025-12-24T12:00:32+00:00</lastmod></url>" for o in offers)
+        + "</urlset>"
+    )
+    api_client = FakeAPIClient(offers)
+    crawl_index = CrawlIndex(tmp_path / "crawl_index.sqlite")
+    parsed_offer_cache = ParsedOfferCache(tmp_path / "parsed.sqlite", JJITBoardParser.PARSER_VERSION)
+    parser = JJITBoardParser(api_client, parse_workers=0, parsed_offer_cache=parsed_offer_cache)  # type: ignore[arg-type]
+
+    async def find() -> set[URL]:
+        return {o.url async for o in parser.iter_offers_in_sitemap(sitemap_path, crawl_index, [])}
+
+    assert asyncio.run(find()) == {o.url for o in offers}
+    assert len(api_client.fetched_urls) == len(offers)
+
+    api_client.fetched_urls.clear()
+    assert asyncio.run(find()) == {o.url for o in offers}
+    assert api_client.fetched_urls == []
+
+
+def test__offers_rejected_by_location_are_not_fetched_again_while_unchanged(tmp_path: Path):
+    offers = get_offers_html()
+    sitemap_path = tmp_path / "sitemap.xml"
+    sitemap_path.write_text(
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(f"<url><loc>{o.url}</loc><lastmod>2025-12-24T12:00:32+00:00</lastmod></url>" for o in offers)
+        + "</urlset>"
+    )
+    api_client = FakeAPIClient(offers)
+    crawl_index = CrawlIndex(tmp_path / "crawl_index.sqlite")
+    offer_store = OfferStore(tmp_path / "offers.sqlite")
+    parser = JJITBoardParser(api_client, parse_workers=0, offer_store=offer_store)  # type: ignore[arg-type]
+    remote = [LocationCriteria(keywords=[LocationKeyword(form="remote")], rule=LocationRule.ALL)]
+
+    async def find(location_criteria: list[LocationCriteria]) -> set[URL]:
+        return {o.url async for o in parser.iter_offers_in_sitemap(sitemap_path, crawl_index, location_criteria)}
+
+    assert asyncio.run(find(remote)) == set()
+    assert len(api_client.fetched_urls) == len(offers)
+
+    api_client.fetched_urls.clear()
+    assert asyncio.run(find(remote)) == set()
+    assert api_client.fetched_urls == []
+
+    # stored locations which may match other criteria are downloaded again
+    assert asyncio.run(find([])) == {o.url for o in offers}
+    assert len(api_client.fetched_urls) == len(offers)
+
+
+def test__offer_pages_which_cannot_be_parsed_are_skipped(capsys):
+    offers = get_offers_html()
+    broken = WebsiteOkResponse(html="<html>broken</html>", url=URL("https://justjoin.it/job-offer/broken-python"))
+    parser = JJITBoardParser(FakeAPIClient([*offers, broken]), parse_workers=0)  # type: ignore[arg-type]
+
+    async def find() -> set[URL]:
+        return {o.url async for o in parser._iter_matching_offers([broken.url, *(o.url for o in offers)], [])}
+
+    assert asyncio.run(find()) == {o.url for o in offers}
+    assert str(broken.url) in capsys.readouterr().out
+
+
+def test__incremental_crawl_downloads_only_offers_new_on_the_board(tmp_path: Path):
+    offers = get_offers_html()
+    api_client = FakeAPIClient(offers)
+    parser = JJITBoardParser(api_client, parse_workers=0, offer_store=OfferStore(tmp_path / "offers.sqlite"))  # type: ignore[arg-type]
+    board_urls = [o.url for o in offers[:2]]
+
+    async def discover_board_urls(language: ProgrammingLanguage, include_skills: list[str]):
+        for url in board_urls:
+            yield url
+
+    parser._discover_board_urls = discover_board_urls  # type: ignore[method-assign]
+    profiles = [
+        Profile(name="all", language=ProgrammingLanguage.PYTHON),
+        Profile(
+            name="remote",
+            language=ProgrammingLanguage.PYTHON,
+            include_skills=["Rust"],
+            location_criteria=[LocationCriteria(keywords=[LocationKeyword(form="remote")], rule=LocationRule.ALL)],
+        ),
+    ]
+    asyncio.run(parser.find_offers_for_profiles(profiles))
+    api_client.fetched_urls.clear()
+    board_urls.append(offers[2].url)
+
+    matched = asyncio.run(parser.find_offers_for_profiles(profiles, incremental=True))
+
+    assert api_client.fetched_urls == [offers[2].url]
+    assert {o.url for o in matched["all"]} == {o.url for o in offers}
+    assert matched["remote"] == []
@@ -1,4 +1,7 @@
-from src.custom_cache import LRUCacheManager
+from datetime import datetime, timedelta
+
+from src.custom_cache import CacheStats, LRUCacheEntry, LRUCacheManager, SQLiteCacheStorage, compress_html
+from src.utils import get_offers_html
 
 
 def test__cache_happy_path():
@@ -97,3 +100,153 @@ def test__cache_hit_middle_node():
     assert cache_hit._older._older.html_content == "html4"
     assert cache_hit._older._older._older.html_content == "html2"
     assert cache_hit._older._older._older._older.html_content == "html1"
+
+
+def test__cache_put_existing_url_replaces_entry():
+    manager = LRUCacheManager(capacity=3)
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2")
+    manager.put("http://test-url-1", "html1-updated")
+
+    assert manager._order.size == 2
+    assert manager._order.total_bytes == len(compress_html("html2")) + len(compress_html("html1-updated"))
+    assert manager._order.newest.html_content == "html1-updated"
+    assert manager._order.newest._older is manager._order.oldest
+    assert manager._order.oldest.html_content == "html2"
+    assert manager.get("http://test-url-1").html_content == "html1-updated"
+
+
+def test__cache_eviction_removes_evicted_urls():
+    manager = LRUCacheManager(capacity=1)
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2")
+
+    assert manager.get("http://test-url-1") is None
+    assert manager.get("http://test-url-2").html_content == "html2"
+    assert list(manager._cache_entries) == ["http://test-url-2"]
+    assert manager.stats == CacheStats(
+        entries=1, total_bytes=len(compress_html("html2")), hits=1, misses=1, evictions=1, expirations=0
+    )
+
+
+def test__cache_evicts_least_recently_used_over_byte_budget():
+    entry_size = len(compress_html("html1"))
+    manager = LRUCacheManager(capacity=10, max_bytes=2 * entry_size)
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2")
+    manager.get("http://test-url-1")
+    manager.put("http://test-url-3", "html3")
+
+    assert manager._order.total_bytes == 2 * entry_size
+    assert set(manager._cache_entries) == {"http://test-url-1", "http://test-url-3"}
+
+    manager.put("http://test-url-4", "a page too large for the budget of two small pages")
+
+    assert manager._order.size == 0
+    assert manager._order.newest is None and manager._order.oldest is None
+
+
+def test__cache_drops_expired_entries_on_get():
+    manager = LRUCacheManager(capacity=3, ttl=timedelta(days=1))
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2", etag='"v2"')
+    for e in manager._cache_entries.values():
+        e.expires_at = datetime.now() - timedelta(seconds=1)
+
+    assert manager.get("http://test-url-1") is None
+    assert manager.get("http://test-url-2").etag == '"v2"'
+    assert manager.stats == CacheStats(
+        entries=1, total_bytes=len(compress_html("html2")), hits=1, misses=1, evictions=0, expirations=1
+    )
+
+
+def test__cache_keeps_pages_compressed():
+    html = get_offers_html()[0].html
+    manager = LRUCacheManager(capacity=3)
+    manager.put("http://test-url-1", html)
+
+    assert manager._order.total_bytes < len(html.encode()) / 4
+    assert manager.get("http://test-url-1").html_content == html
+
+
+def test__storage_entries_survive_restart(tmp_path):
+    manager = LRUCacheManager(capacity=3, storage=SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=1024))
+    manager.put("http://test-url-1", "html1")
+    manager.close()
+
+    manager = LRUCacheManager(capacity=3, storage=SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=1024))
+
+    assert manager.get("http://test-url-1").html_content == "html1"
+
+
+def test__storage_expired_entries_dropped_on_startup(tmp_path):
+    storage = SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=1024)
+    storage.save(
+        "http://test-url-1",
+        LRUCacheEntry(
+            created_at=datetime.now(), payload=compress_html("html1"), expires_at=datetime.now() - timedelta(hours=1)
+        ),
+    )
+    storage.save("http://test-url-2", LRUCacheEntry.build("html2", ttl=timedelta(days=1), ttl_jitter=0.25))
+
+    manager = LRUCacheManager(capacity=3, storage=storage)
+
+    assert manager.get("http://test-url-1") is None
+    assert manager.get("http://test-url-2").html_content == "html2"
+
+
+def test__storage_evicts_least_recently_used_over_byte_budget(tmp_path):
+    entry_size = len(compress_html("html1"))
+    storage = SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=2 * entry_size)
+    manager = LRUCacheManager(capacity=3, storage=storage)
+
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2")
+    storage.touch("http://test-url-1")
+    manager.put("http://test-url-3", "html3")
+
+    assert storage.total_bytes == 2 * entry_size
+    assert storage.get("http://test-url-2") is None
+    assert storage.get("http://test-url-1").html_content == "html1"
+
+
+def test__storage_keeps_expired_entries_which_can_be_revalidated(tmp_path):
+    storage = SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=1024)
+    storage.save(
+        "http://test-url-1",
+        LRUCacheEntry(
+            created_at=datetime.now(),
+            payload=compress_html("html1"),
+            expires_at=datetime.now() - timedelta(hours=1),
+            etag='"v1"',
+        ),
+    )
+
+    manager = LRUCacheManager(capacity=3, ttl=timedelta(days=1), storage=storage)
+    stale = manager.get("http://test-url-1")
+    refreshed = manager.refresh("http://test-url-1")
+
+    assert stale.etag == '"v1"'
+    assert not refreshed.is_expired(datetime.now())
+    assert not storage.get("http://test-url-1").is_expired(datetime.now())
+
+
+def test__cache_hits_write_access_times_in_one_batch(tmp_path):
+    entry_size = len(compress_html("html1"))
+    storage = SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=2 * entry_size)
+    manager = LRUCacheManager(capacity=3, storage=storage)
+    manager.put("http://test-url-1", "html1")
+    manager.put("http://test-url-2", "html2")
+    changes = storage._connection.total_changes
+
+    for _ in range(100):
+        manager.get("http://test-url-1")
+
+    assert storage._connection.total_changes == changes
+    manager.close()
+
+    storage = SQLiteCacheStorage(tmp_path / "cache.sqlite", max_bytes=2 * entry_size)
+    storage.save("http://test-url-3", LRUCacheEntry.build("html3"))
+
+    assert storage.get("http://test-url-2") is None
+    assert storage.get("http://test-url-1").html_content == "html1"
@@ -0,0 +1,76 @@
+import sqlite3
+import subprocess
+import sys
+from datetime import timedelta
+
+from click.testing import CliRunner
+from yarl import URL
+
+from src import constants, generate
+from src.cli import main
+from src.custom_cache import LRUCacheEntry, SQLiteCacheStorage
+from src.models import OfferLocation
+from src.offer_store import OfferStore
+
+
+def test__cache_stats_counts_stored_and_expired_responses(tmp_path, monkeypatch):
+    monkeypatch.setattr(constants, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(constants, "OFFERS_CACHE_PATH", tmp_path / "offers_cache.sqlite")
+    storage = SQLiteCacheStorage(tmp_path / "offers_cache.sqlite", max_bytes=1024 * 1024)
+    storage.save("http://test-url-1", LRUCacheEntry.build("html1", ttl=timedelta(days=1)))
+    storage.save("http://test-url-2", LRUCacheEntry.build("html2", ttl=timedelta(days=-1)))
+    storage.close()
+
+    result = CliRunner().invoke(main, ["cache", "stats"])
+
+    assert result.exit_code == 0, result.output
+    assert "2 entries, 1 expired" in result.output
+    assert "offers_cache.sqlite:" in result.output
+
+
+def test__cache_stats_without_cache_creates_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(constants, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(constants, "OFFERS_CACHE_PATH", tmp_path / "cache" / "offers_cache.sqlite")
+
+    result = CliRunner().invoke(main, ["cache", "stats"])
+
+    assert result.exit_code == 0, result.output
+    assert "no cache" in result.output
+    assert not (tmp_path / "cache").exists()
+
+
+def test__cache_stats_leaves_cache_with_other_schema_alone(tmp_path, monkeypatch):
+    path = tmp_path / "offers_cache.sqlite"
+    monkeypatch.setattr(constants, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(constants, "OFFERS_CACHE_PATH", path)
+    with sqlite3.connect(path) as connection:
+        connection.executescript("CREATE TABLE cache_entries (url TEXT); PRAGMA user_version = 1;")
+    connection.close()
+
+    result = CliRunner().invoke(main, ["cache", "stats"])
+
+    assert "no cache" in result.output
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT name FROM sqlite_master").fetchall() == [("cache_entries",)]
+    connection.close()
+
+
+def test__cache_stats_does_not_import_crawling_modules():
+    code = "import sys; from src.cli import main; main(['cache', 'stats'], standalone_mode=False); print(*sys.modules)"
+    modules = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+
+    assert not {"aiohttp", "bs4", "pydantic", "jinja2", "fake_useragent"} & set(modules)
+
+
+def test__report_from_store_fails_when_rejected_offers_may_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate, "OFFER_STORE_PATH", tmp_path / "offers.sqlite")
+    profiles_path = tmp_path / "profiles.toml"
+    profiles_path.write_text('[[profiles]]\nname = "python"\nlanguage = "python"\n')
+    offer_store = OfferStore(tmp_path / "offers.sqlite")
+    offer_store.add_location(OfferLocation(URL("https://justjoin.it/job-offer/acme-developer-krakow-python"), "krakow"))
+    offer_store.close()
+
+    result = CliRunner().invoke(main, ["report", "--profiles", str(profiles_path), "--from-store"])
+
+    assert result.exit_code == 1
+    assert "1 offers which may match were rejected" in result.output
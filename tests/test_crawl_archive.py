@@ -0,0 +1,65 @@
+import mmap
+from datetime import datetime, timedelta
+
+from src.crawl_archive import CrawlArchive, read_page
+from src.jjit_board_parser import JJITBoardParser
+from src.models import WebsiteOkResponse
+from src.offer_store import OfferStore
+from src.reparse import reparse
+from src.utils import get_offers_html
+
+
+def _read_pages(archive: CrawlArchive) -> list:
+    with open(archive.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return [read_page(buffer, offset) for offset in archive.latest_offsets()]
+
+
+def test__archive_keeps_latest_page_of_each_url(tmp_path):
+    offers = get_offers_html()
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    for offer in offers:
+        archive.append(offer, fetched_at=datetime.now() - timedelta(days=1))
+    archive.append(WebsiteOkResponse(html="<html>changed</html>", url=offers[0].url, etag='"v2"'))
+    archive.close()
+
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    pages = _read_pages(archive)
+
+    assert len(archive) == len(offers) + 1
+    assert [p.url for p in pages] == [o.url for o in offers[1:]] + [offers[0].url]
+    assert pages[0].html == offers[1].html
+    assert pages[-1].html == "<html>changed</html>"
+    assert pages[-1].as_response().etag == '"v2"'
+
+
+def test__archive_indexes_records_missing_from_index_and_drops_cut_off_record(tmp_path):
+    offers = get_offers_html()
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    archive.append(offers[0])
+    archive.append(offers[1])
+    archive.close()
+    (tmp_path / "archive.bin.index").unlink()
+    with open(tmp_path / "archive.bin", "ab") as f:
+        f.write(b"JOBA\x10\x00")
+
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    archive.append(offers[2])
+
+    assert [p.url for p in _read_pages(archive)] == [o.url for o in offers[:3]]
+
+
+def test__reparse_matches_parsing_of_fetched_offers(tmp_path):
+    offers = get_offers_html()
+    fetched_at = datetime.now() - timedelta(days=3)
+    archive = CrawlArchive(tmp_path / "archive.bin")
+    for offer in offers:
+        archive.append(offer, fetched_at=fetched_at)
+
+    for workers in (0, 2):
+        offer_store = OfferStore(tmp_path / f"offers_{workers}.sqlite")
+        result = reparse(archive, offer_store, workers=workers)
+
+        assert (result.records, result.parsed, result.failed) == (len(offers), len(offers), 0)
+        assert {o.url: o for o in offer_store.find_offers()} == {o.url: JJITBoardParser._parse_offer(o) for o in offers}
+        assert offer_store.find_offers(seen_since=fetched_at + timedelta(seconds=1)) == []
+        offer_store.close()
@@ -0,0 +1,41 @@
+import itertools
+
+import pytest
+
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule, normalize_word
+from src.jjit_board_parser import JJITBoardParser
+from src.utils import get_offers_html
+
+LOCATION_CRITERIA = [
+    LocationCriteria(
+        keywords=[LocationKeyword(form="hybrid", city="wroclaw"), LocationKeyword(form="remote")],
+        rule=LocationRule.AT_LEAST_ONE,
+    ),
+    LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="gdansk")], rule=LocationRule.ALL),
+    LocationCriteria(keywords=[LocationKeyword(form="hybird", city="Warszawa")], rule=LocationRule.ALL),
+    LocationCriteria(keywords=[LocationKeyword(form="remote"), LocationKeyword(form="hybrid")], rule=LocationRule.ALL),
+]
+CITIES = ["Gdańsk", "Warszawa", "Wrocław", "Kraków", "Łódź", "Poznań"]
+REMOTE_OPTIONS = ["Hybrid", "Remote", "Office", "Fully remote"]
+
+
+def test__compiled_criteria_match_sample_offers_like_original_ones():
+    offers = [JJITBoardParser._parse_offer(o) for o in get_offers_html()]
+
+    for criteria, offer in itertools.product(LOCATION_CRITERIA, offers):
+        assert criteria.compile().is_satisfied(offer.remote_options, offer.location_city) == criteria.is_satisfied(
+            offer.remote_options, offer.location_city
+        )
+
+
+@pytest.mark.parametrize("criteria", LOCATION_CRITERIA)
+def test__compiled_criteria_match_like_original_ones(criteria: LocationCriteria):
+    compiled = criteria.compile()
+
+    for remote_options, city in itertools.product(REMOTE_OPTIONS, CITIES):
+        assert compiled.is_satisfied(remote_options, city) == criteria.is_satisfied(remote_options, city)
+
+
+def test__normalize_word():
+    assert normalize_word("Wrocław") == "wroclaw"
+    assert normalize_word("ŁÓDŹ") == "lodz"
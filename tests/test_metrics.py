@@ -0,0 +1,41 @@
+from src.custom_cache import LRUCacheManager
+from src.metrics import CACHE_EVICTIONS_TOTAL, CACHE_LOOKUPS_TOTAL, MetricsRegistry
+
+
+def test__histogram_summary_and_prometheus_export():
+    registry = MetricsRegistry()
+    latency = registry.histogram("request_seconds", "Request latency", buckets=(0.1, 1.0))
+    retries = registry.counter("retries_total", "Retries")
+    for value in (0.05, 0.05, 0.5, 0.5, 2.0):
+        latency.observe(value, kind="offer")
+    retries.inc(status=429)
+    retries.inc(status=429)
+
+    summary = registry.summary()
+    exported = registry.to_prometheus().splitlines()
+
+    assert summary["retries_total"] == [{"status": "429", "value": 2.0}]
+    [offers_latency] = summary["request_seconds"]
+    assert offers_latency["count"] == 5
+    assert offers_latency["max"] == 2.0
+    assert 0.1 < offers_latency["p50"] < 1.0
+    assert 'request_seconds_bucket{kind="offer",le="0.1"} 2' in exported
+    assert 'request_seconds_bucket{kind="offer",le="+Inf"} 5' in exported
+    assert 'request_seconds_count{kind="offer"} 5' in exported
+    assert 'retries_total{status="429"} 2' in exported
+
+
+def test__cache_lookups_and_evictions_are_counted():
+    hits, misses = CACHE_LOOKUPS_TOTAL.value(result="memory_hit"), CACHE_LOOKUPS_TOTAL.value(result="miss")
+    evictions = CACHE_EVICTIONS_TOTAL.value(layer="memory")
+    cache = LRUCacheManager(capacity=2)
+
+    cache.put("https://justjoin.it/a", "a")
+    cache.get("https://justjoin.it/a")
+    cache.put("https://justjoin.it/b", "b")
+    cache.put("https://justjoin.it/c", "c")
+    cache.get("https://justjoin.it/d")
+
+    assert CACHE_LOOKUPS_TOTAL.value(result="memory_hit") == hits + 1
+    assert CACHE_LOOKUPS_TOTAL.value(result="miss") == misses + 1
+    assert CACHE_EVICTIONS_TOTAL.value(layer="memory") == evictions + 1
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pytest
+from yarl import URL
+
+from src.exceptions import JustJoinITOfferStructureError
+from src.jjit_board_parser import JJITBoardParser
+from src.models import WebsiteOkResponse
+from src.offer_extractors import ParserBackend
+
+SAMPLE_RESPONSES = sorted((Path(__file__).parent.parent / "sample_responses").glob("*.html"))
+
+
+def _parse(offer: WebsiteOkResponse, backend: ParserBackend):
+    try:
+        return JJITBoardParser._parse_offer(offer, backend)
+    except JustJoinITOfferStructureError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize("sample_response", SAMPLE_RESPONSES, ids=lambda p: p.name)
+def test__backends_produce_identical_offers(sample_response: Path):
+    offer = WebsiteOkResponse(html=sample_response.read_text(), url=URL("https://justjoin.it/job-offer/test"))
+
+    assert _parse(offer, ParserBackend.TARGETED) == _parse(offer, ParserBackend.BEAUTIFUL_SOUP)
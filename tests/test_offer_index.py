@@ -0,0 +1,53 @@
+import dataclasses
+
+from src.jjit_board_parser import JJITBoardParser
+from src.offer_index import OfferIndex
+from src.utils import get_offers_html
+
+
+def _build_index() -> tuple[OfferIndex, list[str]]:
+    offers = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+    index = OfferIndex()
+    for offer in offers:
+        index.add(offer)
+    return index, [offer.title for offer in offers]
+
+
+def _titles(offers) -> list[str]:
+    return [offer.title for offer in offers]
+
+
+def test__keyword_search():
+    index, (air_space, hyperexponential, grid_dynamics) = _build_index()
+
+    assert _titles(index.search(keywords=["dialogflow"])) == [grid_dynamics]
+    assert _titles(index.search(keywords=["SKIES"])) == [air_space]
+    assert _titles(index.search(keywords=["Warsaw", "contract of employment"])) == [hyperexponential]
+    assert index.search(keywords=["cobol"]) == []
+
+
+def test__technology_search():
+    index, (air_space, hyperexponential, grid_dynamics) = _build_index()
+
+    assert _titles(index.search(all_technologies=["python", "docker"])) == [air_space, hyperexponential]
+    assert _titles(index.search(any_technologies=["django", "node.js"])) == [air_space, grid_dynamics]
+    assert _titles(index.search(all_technologies=["Python"], min_level="advanced")) == [hyperexponential]
+    assert _titles(index.search(all_technologies=["Rust"], min_level="regular")) == [hyperexponential]
+    assert _titles(index.search(any_technologies=["english"], min_level="advanced")) == [air_space]
+
+
+def test__added_again_offer_replaces_previous_version():
+    index, (air_space, hyperexponential, _) = _build_index()
+    offer = index.search(keywords=["skies"])[0]
+
+    index.add(dataclasses.replace(offer, text="Build the Google Maps for the oceans", tech_stack=[]))
+
+    assert index.search(keywords=["skies"]) == []
+    assert _titles(index.search(keywords=["oceans"])) == [air_space]
+    assert _titles(index.search(all_technologies=["docker"])) == [hyperexponential]
+    assert len(index) == 3
+
+    index.remove(offer.url)
+
+    assert index.search(keywords=["oceans"]) == []
+    assert len(index) == 2
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from yarl import URL
+
+from src.criteria import LocationCriteria, LocationKeyword, LocationRule
+from src.exceptions import IncompleteOfferStoreError
+from src.jjit_board_parser import JJITBoardParser
+from src.models import OfferLocation, ProgrammingLanguage
+from src.offer_store import OfferStore
+from src.utils import get_offers_html
+
+
+def _parsed_offers():
+    return [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+
+
+def test__offers_round_trip(tmp_path: Path):
+    offers = _parsed_offers()
+    store = OfferStore(tmp_path / "offers.sqlite")
+    for offer in offers:
+        store.add(offer)
+    store.close()
+
+    store = OfferStore(tmp_path / "offers.sqlite")
+
+    assert sorted(store.find_offers(), key=lambda o: str(o.url)) == sorted(offers, key=lambda o: str(o.url))
+
+
+def test__find_offers_by_criteria(tmp_path: Path):
+    store = OfferStore(tmp_path / "offers.sqlite")
+    for offer in _parsed_offers():
+        store.add(offer)
+    warszawa = [LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="warszawa")], rule=LocationRule.ALL)]
+
+    assert {o.location_city for o in store.find_offers(warszawa)} == {"Warszawa"}
+    assert [o.title for o in store.find_offers(warszawa, include_skills=["python", "rust"])] == [
+        o.title for o in _parsed_offers()[1:2]
+    ]
+    assert {o.seniority for o in store.find_offers(seniority="Senior")} == {"Senior"}
+    assert [o.salary_max for o in store.find_offers(min_salary=36000)] == [37000]
+    # the first offer's slug ends with an offer id after the category
+    assert len(store.find_offers(language=ProgrammingLanguage.PYTHON)) == 3
+    assert store.find_offers(language=ProgrammingLanguage.GO) == []
+
+
+def test__new_offers_since_last_report(tmp_path: Path):
+    first_offer, *other_offers = _parsed_offers()
+    store = OfferStore(tmp_path / "offers.sqlite")
+    store.add(first_offer)
+    store.flush(seen_at=datetime.now() - timedelta(hours=1))
+
+    assert store.find_new_offers("report.html") == [first_offer]
+
+    store.mark_reported("report.html", generated_at=datetime.now() - timedelta(minutes=30))
+    for offer in [first_offer, *other_offers]:
+        store.add(offer)
+    store.flush()
+
+    assert {o.url for o in store.find_new_offers("report.html")} == {o.url for o in other_offers}
+
+
+def test__queries_which_rejected_offers_may_match_are_refused(tmp_path: Path):
+    gdansk, *warszawa = _parsed_offers()
+    store = OfferStore(tmp_path / "offers.sqlite")
+    for offer in warszawa:
+        store.add(offer)
+    store.add_location(OfferLocation(gdansk.url, gdansk.location_city, gdansk.remote_options))
+    store.add_location(
+        OfferLocation(URL("https://justjoin.it/job-offer/acme-python-developer-krakow-python"), "krakow")
+    )
+    warszawa_criteria = [
+        LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="warszawa")], rule=LocationRule.ALL)
+    ]
+    gdansk_criteria = [
+        LocationCriteria(keywords=[LocationKeyword(form="hybrid", city="gdansk")], rule=LocationRule.ALL)
+    ]
+
+    assert len(store.find_offers(warszawa_criteria)) == 2
+    assert {location.url for location in store.get_locations([o.url for o in _parsed_offers()])} == {gdansk.url}
+    with pytest.raises(IncompleteOfferStoreError):
+        store.find_offers(gdansk_criteria)
+    with pytest.raises(IncompleteOfferStoreError):
+        store.find_offers()
+
+    store.add(gdansk)
+    store.flush()
+
+    assert store.get_locations([gdansk.url]) == []
+    assert [o.url for o in store.find_offers(gdansk_criteria)] == [gdansk.url]
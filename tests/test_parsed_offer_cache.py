@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from src.jjit_board_parser import JJITBoardParser
+from src.parsed_offer_cache import ParsedOfferCache, hash_html
+from src.utils import get_offers_html
+
+
+def test__parsed_offer_round_trip(tmp_path: Path):
+    offer = get_offers_html()[0]
+    parsed = JJITBoardParser._parse_offer(offer)
+    cache = ParsedOfferCache(tmp_path / "parsed.sqlite", JJITBoardParser.PARSER_VERSION)
+
+    cache.put(offer.url, hash_html(offer.html), parsed)
+
+    assert cache.get(offer.url, hash_html(offer.html)) == parsed
+    assert cache.get(offer.url, hash_html(offer.html + " ")) is None
+
+
+def test__entries_of_other_parser_version_are_dropped(tmp_path: Path):
+    offer = get_offers_html()[0]
+    cache = ParsedOfferCache(tmp_path / "parsed.sqlite", "old-version")
+    cache.put(offer.url, hash_html(offer.html), JJITBoardParser._parse_offer(offer))
+    cache.close()
+
+    cache = ParsedOfferCache(tmp_path / "parsed.sqlite", JJITBoardParser.PARSER_VERSION)
+
+    assert cache.get(offer.url, hash_html(offer.html)) is None
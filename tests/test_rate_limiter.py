@@ -0,0 +1,57 @@
+import asyncio
+
+from src.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+def _limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        initial_rate=4.0, max_rate=10.0, initial_concurrency=2, max_concurrency=4, fast_response_threshold=1.0
+    )
+
+
+def test__limiter_speeds_up_on_fast_responses_only():
+    limiter = _limiter()
+
+    limiter.record_success(latency=5.0)
+    assert (limiter.rate, limiter.concurrency) == (4.0, 2.0)
+
+    for _ in range(100):
+        limiter.record_success(latency=0.1)
+    assert (limiter.rate, limiter.concurrency) == (10.0, 4.0)
+
+
+def test__limiter_halves_once_per_burst_of_throttled_responses():
+    limiter = _limiter()
+
+    limiter.record_throttled(retry_after=2)
+    limiter.record_throttled(retry_after=2)
+
+    assert (limiter.rate, limiter.concurrency) == (2.0, 1.0)
+
+
+def test__limiter_caps_requests_in_flight():
+    limiter = _limiter()
+    in_flight, max_in_flight = 0, 0
+
+    async def request() -> None:
+        nonlocal in_flight, max_in_flight
+        async with limiter.acquire():
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run() -> None:
+        limiter.rate = 1000.0
+        await asyncio.gather(*(request() for _ in range(10)))
+
+    asyncio.run(run())
+
+    assert max_in_flight == 2
+
+
+def test__retry_after_parsing():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
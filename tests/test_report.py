@@ -0,0 +1,78 @@
+import asyncio
+import re
+import typing
+
+from src import generate, salary_stats
+from src.generate import stream_report
+from src.jjit_board_parser import JJITBoardParser
+from src.models import JobOffer
+from src.salary_stats import SalaryColumns, SalaryStats
+from src.utils import get_offers_html, prepare_jinja_env
+
+
+def _job_cards(report: str) -> list[str]:
+    return [
+        " ".join(card.split()) for card in re.findall(r'<div class="job-card">.*?<div class="divider">', report, re.S)
+    ]
+
+
+async def _render_stream(offers: list[JobOffer]) -> str:
+    async def iter_offers() -> typing.AsyncGenerator[JobOffer]:
+        for offer in offers:
+            yield offer
+
+    template = prepare_jinja_env("report_stream.html", enable_async=True)
+    return "".join([chunk async for chunk in template.generate_async(jobs=iter_offers())])
+
+
+def test__streamed_report_renders_offers_like_the_full_report():
+    offers = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+
+    report = prepare_jinja_env("report.html").render(jobs=[offer.as_dict() for offer in offers])
+    streamed_report = asyncio.run(_render_stream(offers))
+
+    assert len(_job_cards(report)) == 3
+    assert _job_cards(streamed_report) == _job_cards(report)
+    assert "Found <strong>3 positions</strong>" in streamed_report
+
+
+def test__streamed_report_without_offers():
+    streamed_report = asyncio.run(_render_stream([]))
+
+    assert "No job offers available at this time." in streamed_report
+    assert "Found <strong>0 positions</strong>" in streamed_report
+
+
+def test__stream_report_closes_with_salary_stats(tmp_path):
+    offers = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+
+    async def iter_offers() -> typing.AsyncGenerator[JobOffer]:
+        for offer in offers:
+            yield offer
+
+    asyncio.run(stream_report(iter_offers(), str(tmp_path / "report.html")))
+    report = (tmp_path / "report.html").read_text()
+
+    assert len(_job_cards(report)) == 3
+    assert "<strong>2 of 3</strong> offers list a salary" in report
+    assert report.index("Found <strong>3 positions</strong>") < report.index('<div class="salary-stats">')
+
+
+def test__stream_report_keeps_only_salary_columns(tmp_path, monkeypatch):
+    offers = [JJITBoardParser._parse_offer(response) for response in get_offers_html()]
+    kept: list[list] = []
+
+    def compute_salary_stats(rendered_jobs: list) -> SalaryStats:
+        kept.append(rendered_jobs)
+        return salary_stats.compute_salary_stats(rendered_jobs)
+
+    monkeypatch.setattr(generate, "compute_salary_stats", compute_salary_stats)
+
+    async def iter_offers() -> typing.AsyncGenerator[JobOffer]:
+        for offer in offers:
+            yield offer
+
+    asyncio.run(stream_report(iter_offers(), str(tmp_path / "report.html")))
+
+    assert kept == [[SalaryColumns.of(offer) for offer in offers]]
+    assert not hasattr(kept[0][0], "text")
@@ -0,0 +1,78 @@
+import dataclasses
+import math
+import re
+import statistics
+
+from src.jjit_board_parser import JJITBoardParser
+from src.models import JobOffer, TechStackEntry
+from src.salary_stats import GroupMedian, compute_salary_stats
+from src.utils import get_offers_html, prepare_jinja_env
+
+RATES = {"PLN": 1.0, "EUR": 4.0}
+PERIODS = {"MONTH": 1.0, "HOUR": 160.0}
+
+
+def _offers() -> list[JobOffer]:
+    offer = JJITBoardParser._parse_offer(get_offers_html()[0])
+    python, rust = TechStackEntry("Python", "advanced"), TechStackEntry("Rust", "regular")
+    salaries = [
+        ("Gdańsk", (python,), 10000, 20000, "PLN", "MONTH"),  # 15000
+        ("Gdańsk", (python, rust), 5000, 7000, "EUR", "MONTH"),  # 24000
+        ("Warszawa", (python,), 100, 150, "PLN", "HOUR"),  # 20000
+        ("Warszawa", (rust,), 20000, 30000, "PLN", "MONTH"),  # 25000
+        ("Warszawa", (python,), 15000, 25000, "PLN", "MONTH"),  # 20000
+        ("Warszawa", (python, rust), None, None, None, None),
+        ("Warszawa", (python,), 5000, 7000, "USD", "MONTH"),  # currency without a rate
+    ]
+    return [
+        dataclasses.replace(
+            offer,
+            location_city=city,
+            tech_stack=tech_stack,
+            salary_min=salary_min,
+            salary_max=salary_max,
+            salary_currency=currency,
+            salary_per=per,
+        )
+        for city, tech_stack, salary_min, salary_max, currency, per in salaries
+    ]
+
+
+def test__salaries_normalized_to_monthly_pln_and_summarized():
+    offers = _offers()
+
+    stats = compute_salary_stats(offers, rates=RATES, periods=PERIODS, min_offers=2, top=3)
+
+    assert (stats.offers, stats.offers_with_salary) == (7, 5)
+    assert stats.percentiles[50] == statistics.median([15000, 24000, 20000, 25000, 20000])
+    assert stats.median_by_technology == [
+        GroupMedian(name="Rust", median=24500, offers=2),
+        GroupMedian(name="Python", median=20000, offers=4),
+    ]
+    assert stats.median_by_city == [
+        GroupMedian(name="Warszawa", median=20000, offers=3),
+        GroupMedian(name="Gdańsk", median=19500, offers=2),
+    ]
+    assert stats.best_paid == [(offers[3], 25000), (offers[1], 24000), (offers[4], 20000)]
+    assert stats.scores[:5].tolist() == [0, 75, 37.5, 100, 37.5]
+    assert all(math.isnan(score) for score in stats.scores[5:])
+
+
+def test__salary_stats_without_salaries():
+    stats = compute_salary_stats(_offers()[5:], rates=RATES, periods=PERIODS)
+
+    assert (stats.offers, stats.offers_with_salary) == (2, 0)
+    assert (stats.percentiles, stats.median_by_technology, stats.median_by_city, stats.best_paid) == ({}, [], [], [])
+    assert compute_salary_stats([]).offers == 0
+
+
+def test__report_renders_salary_section():
+    offers = _offers()
+
+    report = prepare_jinja_env("report.html").render(
+        jobs=offers, salary_stats=compute_salary_stats(offers, rates=RATES, periods=PERIODS, min_offers=2)
+    )
+
+    assert "<strong>5 of 7</strong> offers list a salary" in report
+    assert "Rust: 24,500 (2)" in report
+    assert re.findall(r"Better paid than (\d+)% of offers", report) == ["0", "75", "38", "100", "38"]
@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, time, timedelta
+
+from src import scheduler as scheduler_module
+from src.models import ProgrammingLanguage
+from src.profiles import Profile, Schedule
+from src.scheduler import Scheduler
+
+
+class FakeParser:
+    def __init__(self):
+        self.crawled: list[list[str]] = []
+        self.incremental: list[bool] = []
+        self.crawling = 0
+        self.max_crawling = 0
+
+    async def find_offers_for_profiles(self, profiles: list[Profile], incremental: bool) -> dict[str, list[dict]]:
+        self.crawled.append([p.name for p in profiles])
+        self.incremental.append(incremental)
+        self.crawling += 1
+        self.max_crawling = max(self.max_crawling, self.crawling)
+        await asyncio.sleep(0.01)
+        self.crawling -= 1
+        return {p.name: [{"title": f"{p.name} offer"}] for p in profiles}
+
+
+def _profile(name: str) -> Profile:
+    return Profile(name=name, language=ProgrammingLanguage.PYTHON)
+
+
+def test__overlapping_runs_are_coalesced():
+    a, b, c = _profile("a"), _profile("b"), _profile("c")
+    parser = FakeParser()
+    scheduler = Scheduler(parser, [a, b, c])  # type: ignore[arg-type]
+
+    async def run() -> list[dict[str, list[dict]]]:
+        first = asyncio.create_task(scheduler.run_profiles([a]))
+        await asyncio.sleep(0)  # the crawl of "a" starts
+        return await asyncio.gather(
+            first, scheduler.run_profiles([a]), scheduler.run_profiles([b]), scheduler.run_profiles([b, c])
+        )
+
+    results = asyncio.run(run())
+
+    assert parser.crawled == [["a"], ["b", "c"]]
+    assert parser.max_crawling == 1
+    assert results[0] == results[1] == {"a": [{"title": "a offer"}]}
+    assert results[3] == {"b": [{"title": "b offer"}], "c": [{"title": "c offer"}]}
+
+
+def test__runs_are_incremental_between_full_crawls(monkeypatch):
+    a, b = _profile("a"), _profile("b")
+    parser = FakeParser()
+    scheduler = Scheduler(parser, [a, b])  # type: ignore[arg-type]
+
+    async def run() -> None:
+        await scheduler.run_profiles([a])
+        await scheduler.run_profiles([a])
+        await scheduler.run_profiles([a, b])
+        monkeypatch.setattr(scheduler_module, "FULL_CRAWL_INTERVAL", timedelta(0))
+        await scheduler.run_profiles([a])
+
+    asyncio.run(run())
+
+    assert parser.incremental == [False, True, False, False]
+
+
+def test__schedule_next_run():
+    schedule = Schedule(every=timedelta(days=1), at=time(8, 0))
+    now = datetime(2026, 1, 5, 9, 30)
+
+    assert schedule.next_run(now) == datetime(2026, 1, 6, 8, 0)
+    assert schedule.next_run(datetime(2026, 1, 5, 7, 0)) == datetime(2026, 1, 5, 8, 0)
+    assert schedule.next_run(now, last_run=datetime(2026, 1, 5, 8, 0)) == datetime(2026, 1, 6, 8, 0)
+    assert schedule.next_run(now, last_run=datetime(2026, 1, 1, 8, 0)) == datetime(2026, 1, 6, 8, 0)
+    assert Schedule(every=timedelta(hours=6)).next_run(now) == now
@@ -0,0 +1,55 @@
+from datetime import datetime
+from pathlib import Path
+
+from yarl import URL
+
+from src.constants import SITEMAP_PATH
+from src.crawl_index import CrawlIndex
+from src.models import ProgrammingLanguage
+from src.sitemap import SitemapEntry, iter_sitemap_entries
+
+
+def _entry(slug: str, lastmod: str) -> SitemapEntry:
+    return SitemapEntry(url=URL(f"https://justjoin.it/job-offer/{slug}"), lastmod=datetime.fromisoformat(lastmod))
+
+
+def test__sitemap_is_streamed():
+    entries = list(iter_sitemap_entries(SITEMAP_PATH))
+
+    assert len(entries) == 8126
+    assert entries[0].url == URL("https://justjoin.it/job-offer/netcompany-junior-net-developer-warszawa-net")
+    assert entries[0].lastmod == datetime.fromisoformat("2025-12-24T12:00:32+00:00")
+
+
+def test__crawl_index_delta(tmp_path: Path):
+    crawl_index = CrawlIndex(tmp_path / "crawl_index.sqlite")
+    first_delta = crawl_index.update(
+        [_entry("offer-1", "2025-12-24T12:00:00+00:00"), _entry("offer-2", "2025-12-24T12:00:00+00:00")]
+    )
+    for url in first_delta.changed:
+        crawl_index.mark_crawled(url)
+
+    second_delta = crawl_index.update(
+        [_entry("offer-2", "2025-12-25T12:00:00+00:00"), _entry("offer-3", "2025-12-25T12:00:00+00:00")]
+    )
+
+    assert len(first_delta.changed) == 2
+    assert second_delta.changed == [
+        URL("https://justjoin.it/job-offer/offer-2"),
+        URL("https://justjoin.it/job-offer/offer-3"),
+    ]
+    assert second_delta.unchanged == []
+    assert second_delta.closed == [URL("https://justjoin.it/job-offer/offer-1")]
+    assert crawl_index.closed_offers() == [URL("https://justjoin.it/job-offer/offer-1")]
+
+
+def test__language_of_offer_is_read_from_slug():
+    urls = [entry.url for entry in iter_sitemap_entries(SITEMAP_PATH)]
+    python_urls = [url for url in urls if ProgrammingLanguage.PYTHON.matches_offer_url(url)]
+
+    assert len(python_urls) == 398
+    assert URL("https://justjoin.it/job-offer/asana-software-engineer-warszawa-javascript-72e94920") not in python_urls
+    assert ProgrammingLanguage.PYTHON.matches_offer_url(URL("https://justjoin.it/job-offer/x-gdansk-python-e10b493e"))
+    assert not ProgrammingLanguage.GO.matches_offer_url(
+        URL("https://justjoin.it/job-offer/senior-go-developer-warszawa-java")
+    )